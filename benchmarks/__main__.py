@@ -0,0 +1,5 @@
+import sys
+
+from .suite import main
+
+main(sys.argv[1:])
@@ -0,0 +1,77 @@
+"""
+Load-test `markovify.aio.AsyncText`: many concurrent clients each await a
+series of sentences, while a heartbeat task measures how late the event loop
+runs it (i.e., how long the loop is blocked). Compares calling
+`Text.make_sentence` directly in the event loop with `AsyncText`, with and
+without request batching, for several numbers of worker processes. Reports
+sentences per second and the worst and mean heartbeat lag.
+
+Usage: python -m benchmarks.bench_aio [path/to/corpus.txt]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import markovify
+from markovify.aio import AsyncText
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+CLIENTS = 50
+REQUESTS = 40
+HEARTBEAT = 0.005
+WORKERS = [1, 2, 4]
+
+
+async def heartbeat(lags):
+    loop = asyncio.get_event_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(loop.time() - start - HEARTBEAT)
+
+
+async def load_test(make_sentence):
+    lags = []
+    beat = asyncio.ensure_future(heartbeat(lags))
+
+    async def client():
+        for _ in range(REQUESTS):
+            await make_sentence()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(CLIENTS)))
+    elapsed = time.perf_counter() - start
+    beat.cancel()
+    lags = lags or [elapsed]  # The heartbeat never ran
+    return CLIENTS * REQUESTS / elapsed, max(lags), sum(lags) / len(lags)
+
+
+async def main(path):
+    with open(path, encoding="utf-8") as f:
+        model = markovify.Text(f.read())
+
+    print(f"{'mode':>18} {'sentences/s':>12} {'max lag ms':>11} {'mean lag ms':>12}")
+
+    async def blocking():
+        return model.make_sentence()
+
+    results = [("blocking", await load_test(blocking))]
+    for workers in WORKERS:
+        for max_batch in (1, markovify.aio.DEFAULT_MAX_BATCH):
+            name = f"{workers} workers, {'batched' if max_batch > 1 else 'single'}"
+            async with AsyncText(model, workers, max_batch) as service:
+                await service.make_sentence()  # Start the processes
+                results.append((name, await load_test(service.make_sentence)))
+    for name, (rate, max_lag, mean_lag) in results:
+        print(
+            f"{name:>18} {rate:>12.0f} {max_lag * 1e3:>11.1f} {mean_lag * 1e3:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.get_event_loop().run_until_complete(
+        main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS)
+    )
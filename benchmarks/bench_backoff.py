@@ -0,0 +1,71 @@
+"""
+Compare building a `markovify.Chain` for each state size from 1 to
+`state_size` with building one `markovify.BackoffChain`, which holds them
+all: the time taken, the memory the models take (measured with
+`tracemalloc`), and walks per second from the full model's states and, for
+the backoff chain, from states it hasn't seen.
+
+Usage: python -m benchmarks.bench_backoff [path/to/corpus.txt] [state_size]
+"""
+
+import itertools
+import os
+import sys
+import timeit
+import tracemalloc
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+WALKS = 2000
+REPEATS = 3
+
+
+def built(func):
+    """
+    Return the result of `func`, the fewest seconds it took in `REPEATS`
+    calls, and the bytes still allocated by it afterward (measured in one
+    more call).
+    """
+    seconds = min(timeit.repeat(func, number=1, repeat=REPEATS))
+    tracemalloc.start()
+    result = func()
+    nbytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, nbytes
+
+
+def main(path, state_size):
+    with open(path, encoding="utf-8") as f:
+        runs = markovify.Text(f.read()).parsed_sentences
+
+    chains, chains_seconds, chains_bytes = built(
+        lambda: [markovify.Chain(runs, size) for size in range(1, state_size + 1)]
+    )
+    backoff, backoff_seconds, backoff_bytes = built(
+        lambda: markovify.BackoffChain(runs, state_size)
+    )
+    # States of which only the last word was seen, so walks back off from them
+    unseen = itertools.cycle(("Zzz",) * (state_size - 1) + (run[0],) for run in runs)
+    seen_rate = WALKS / timeit.timeit(backoff.walk, number=WALKS)
+    unseen_rate = WALKS / timeit.timeit(
+        lambda: backoff.walk(next(unseen)), number=WALKS
+    )
+
+    print(f"{'models':>10} {'build s':>8} {'MB':>7} {'walk/s':>8} {'backoff/s':>10}")
+    print(
+        f"{'separate':>10} {chains_seconds:>8.3f} {chains_bytes / 1e6:>7.1f} "
+        f"{WALKS / timeit.timeit(chains[-1].walk, number=WALKS):>8.0f} {'-':>10}"
+    )
+    print(
+        f"{'backoff':>10} {backoff_seconds:>8.3f} {backoff_bytes / 1e6:>7.1f} "
+        f"{seen_rate:>8.0f} {unseen_rate:>10.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
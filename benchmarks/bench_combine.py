@@ -0,0 +1,72 @@
+"""
+Compare ways of combining many models built from parts of one corpus:
+`markovify.combine` into a new model, `combine(..., inplace=True)` into the
+first model, and `markovify.utils.combine_files` over saved models. Reports
+the time and peak memory allocated by each.
+
+Usage: python -m benchmarks.bench_combine [path/to/corpus.txt] [parts]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+DEFAULT_PARTS = 40
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def traced(func):
+    # Tracing slows allocation down, so this is timed separately
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(path, parts):
+    with open(path, encoding="utf-8") as f:
+        runs = markovify.Text(f.read()).parsed_sentences
+    size = -(-len(runs) // parts)
+    shards = [runs[i : i + size] for i in range(0, len(runs), size)]
+
+    def chains():
+        return [markovify.Chain(shard, 2) for shard in shards]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i, chain in enumerate(chains()):
+            paths.append(os.path.join(tmpdir, f"{i}.markovify"))
+            chain.save(paths[-1])
+        out = os.path.join(tmpdir, "combined.markovify")
+
+        print(f"{'method':>14} {'seconds':>8} {'peak MB':>8}")
+        for name, combine in [
+            ("combine", lambda models: markovify.combine(models)),
+            ("inplace", lambda models: markovify.combine(models, inplace=True)),
+            ("combine_files", lambda _: markovify.utils.combine_files(paths, out)),
+        ]:
+            # Combining in place modifies the models, so each run gets new ones
+            elapsed = timed(lambda: combine(chains()))
+            elapsed -= timed(chains)
+            models = chains()
+            peak = traced(lambda: combine(models))
+            print(f"{name:>14} {elapsed:>8.2f} {peak / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PARTS,
+    )
@@ -0,0 +1,47 @@
+"""
+Compare the memory footprint and generation speed of the default
+dict-of-dicts `markovify.Chain` model with its compact, array-backed form.
+
+Usage: python -m benchmarks.bench_compact [path/to/corpus.txt]
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+
+
+def traced(func):
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main(path):
+    with open(path, encoding="utf-8") as f:
+        runs = markovify.Text(f.read()).parsed_sentences
+
+    print(
+        f"{'state_size':>10} {'dict MB':>9} {'compact MB':>11} {'ratio':>6} "
+        f"{'dict walk/s':>12} {'compact walk/s':>15}"
+    )
+    for state_size in (1, 2, 3):
+        chain, dict_size = traced(lambda: markovify.Chain(runs, state_size))
+        compact, compact_size = traced(lambda: chain.compact())
+        dict_rate = 1000 / timeit.timeit(chain.walk, number=1000)
+        compact_rate = 1000 / timeit.timeit(compact.walk, number=1000)
+        print(
+            f"{state_size:>10} {dict_size / 1e6:>9.2f} {compact_size / 1e6:>11.2f} "
+            f"{dict_size / compact_size:>6.1f} {dict_rate:>12.0f} {compact_rate:>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS)
@@ -0,0 +1,98 @@
+"""
+Compare ways of generating sentences under tight length limits: walking
+whole sentences and then checking their length (as markovify used to), with
+walks abandoned as soon as they exceed the limit, and with walks that are
+also biased toward ending in time (`bias_end=True`). Reports, per strategy,
+the share of sentences generated successfully, the walks attempted, and the
+words generated (steps), per sentence requested.
+
+Usage: python -m benchmarks.bench_constrained [path/to/corpus.txt]
+"""
+
+import os
+import sys
+import time
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+SENTENCES = 1000
+LIMITS = [("max_words", 8), ("max_words", 12), ("max_chars", 50)]
+
+
+class Counter:
+    """
+    Wraps a chain's `walk` and `gen` to count the walks and steps taken.
+    """
+
+    def __init__(self, chain):
+        self.walks = 0
+        self.steps = 0
+        self.chain_gen = chain.gen
+        chain.gen = self.gen
+        chain.walk = self.walk
+
+    def gen(self, *args):
+        self.walks += 1
+        for word in self.chain_gen(*args):
+            self.steps += 1
+            yield word
+
+    def walk(self, init_state=None, max_steps=None, bias_end=False, rng=None):
+        run = list(self.gen(init_state, max_steps, bias_end, rng))
+        if max_steps is not None and len(run) > max_steps:
+            return None
+        return run
+
+
+def full_walks(model, limit, value):
+    # Walk whole sentences, then check them
+    for _ in range(markovify.text.DEFAULT_TRIES):
+        words = model.chain.walk()
+        sentence = model.word_join(words)
+        if limit == "max_words" and len(words) > value:
+            continue
+        if limit == "max_chars" and len(sentence) > value:
+            continue
+        if model.test_sentence_output(
+            words,
+            markovify.text.DEFAULT_MAX_OVERLAP_RATIO,
+            markovify.text.DEFAULT_MAX_OVERLAP_TOTAL,
+        ):
+            return sentence
+    return None
+
+
+def main(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    print(f"{'limit':>13} {'strategy':>10} {'success':>8} {'walks':>6} {'steps':>6}")
+    for limit, value in LIMITS:
+        strategies = [
+            ("full", lambda model: full_walks(model, limit, value)),
+            ("abort", lambda model: model.make_sentence(**{limit: value})),
+            (
+                "abort+bias",
+                lambda model: model.make_sentence(bias_end=True, **{limit: value}),
+            ),
+        ]
+        for name, make in strategies:
+            if limit == "max_chars" and name == "abort+bias":
+                continue  # The bias only applies to `max_words`
+            model = markovify.Text(text)
+            model.chain.expected_lengths()
+            counter = Counter(model.chain)
+            start = time.perf_counter()
+            made = sum(make(model) is not None for _ in range(SENTENCES))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{limit + '=' + str(value):>13} {name:>10} "
+                f"{made / SENTENCES:>8.0%} {counter.walks / SENTENCES:>6.1f} "
+                f"{counter.steps / SENTENCES:>6.1f} ({elapsed:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS)
@@ -0,0 +1,73 @@
+"""
+Compare exporting and importing a `markovify.Text` model as JSON all at
+once (`to_json`/`from_json`, with the string written to or read from a file)
+with streaming it (`write_json`/`read_json`), uncompressed and with gzip.
+Reports the time taken and the peak memory allocated by each.
+
+Usage: python -m benchmarks.bench_json [path/to/corpus.txt]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    # Tracing slows allocation down, so it gets a separate run
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def dump_whole(model, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(model.to_json())
+
+
+def load_whole(path):
+    with open(path, encoding="utf-8") as f:
+        return markovify.Text.from_json(f.read())
+
+
+def main(path):
+    with open(path, encoding="utf-8") as f:
+        model = markovify.Text(f.read())
+
+    print(f"{'method':>16} {'write s':>8} {'write MB':>9} {'read s':>7} {'read MB':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out = os.path.join(tmpdir, "model.json")
+        for name, dump, load in [
+            ("to/from_json", lambda: dump_whole(model, out), lambda: load_whole(out)),
+            (
+                "write/read_json",
+                lambda: model.write_json(out),
+                lambda: markovify.Text.read_json(out),
+            ),
+            (
+                "... with gzip",
+                lambda: model.write_json(out + ".gz"),
+                lambda: markovify.Text.read_json(out + ".gz"),
+            ),
+        ]:
+            write_seconds, write_peak = measure(dump)
+            read_seconds, read_peak = measure(load)
+            print(
+                f"{name:>16} {write_seconds:>8.2f} {write_peak / 1e6:>9.1f} "
+                f"{read_seconds:>7.2f} {read_peak / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS)
@@ -0,0 +1,54 @@
+"""
+Compare re-weighting the mix of two corpora by rebuilding a combined model
+with `markovify.combine` with re-weighting a `markovify.MixtureChain`, and
+the speed of generating from each. Reports the time taken to apply a new set
+of weights, and walks per second (from a cold cache, for the mixture, and
+then warm).
+
+Usage: python -m benchmarks.bench_mixture [path/to/corpus.txt path/to/corpus.txt]
+"""
+
+import os
+import sys
+import time
+import timeit
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPORA = [
+    os.path.join(HERE, "..", "test", "texts", name)
+    for name in ("sherlock.txt", "senate-bills.txt")
+]
+WALKS = 2000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(paths):
+    chains = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            chains.append(markovify.Text(f.read()).chain)
+    weights = [2] + [1] * (len(chains) - 1)
+
+    combined, combine_seconds = timed(lambda: markovify.combine(chains, weights))
+    mixture = markovify.MixtureChain(chains)
+    _, mixture_seconds = timed(lambda: mixture.set_weights(weights))
+
+    print(f"{'model':>8} {'reweight ms':>12} {'cold walk/s':>12} {'warm walk/s':>12}")
+    for name, chain, seconds in [
+        ("combine", combined, combine_seconds),
+        ("mixture", mixture, mixture_seconds),
+    ]:
+        cold = WALKS / timeit.timeit(chain.walk, number=WALKS)
+        warm = WALKS / timeit.timeit(chain.walk, number=WALKS)
+        print(f"{name:>8} {seconds * 1e3:>12.1f} {cold:>12.0f} {warm:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_CORPORA)
@@ -0,0 +1,79 @@
+"""
+Compare the per-sentence cost of `markovify.Text.test_sentence_output` using
+the overlap index (a suffix array) with the previous approach (a substring
+search of the entire rejoined text), as the corpus grows, along with the time
+to build the index and the memory it takes (compared with the rejoined
+text's).
+
+Usage: python -m benchmarks.bench_overlap [path/to/corpus.txt]
+"""
+
+import os
+import sys
+import time
+
+import markovify
+from markovify.overlap import OverlapIndex
+from markovify.text import (
+    DEFAULT_MAX_OVERLAP_RATIO,
+    DEFAULT_MAX_OVERLAP_TOTAL,
+    OVERLAP_DEPTH,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+SCALES = (1, 2, 4, 8)
+SENTENCES = 1000
+
+
+def substring_test(model, words):
+    overlap_ratio = round(DEFAULT_MAX_OVERLAP_RATIO * len(words))
+    overlap_max = min(DEFAULT_MAX_OVERLAP_TOTAL, overlap_ratio)
+    gram_count = max((len(words) - overlap_max), 1)
+    for i in range(gram_count):
+        if model.word_join(words[i : i + overlap_max + 1]) in model.rejoined_text:
+            return False
+    return True
+
+
+def main(path):
+    with open(path, encoding="utf-8") as f:
+        parsed = markovify.Text(f.read()).parsed_sentences
+
+    print(
+        f"{'words':>10} {'substring us':>13} {'index us':>9} {'index build s':>14}"
+        f" {'text MB':>8} {'index MB':>9}"
+    )
+    for scale in SCALES:
+        corpus = parsed * scale
+        start = time.perf_counter()
+        index = OverlapIndex(corpus, OVERLAP_DEPTH)
+        index.prepare()
+        build = time.perf_counter() - start
+
+        model = markovify.Text(None, parsed_sentences=corpus, overlap_index=index)
+        runs = model.chain.walk_many(SENTENCES)
+
+        start = time.perf_counter()
+        for words in runs:
+            substring_test(model, words)
+        substring = (time.perf_counter() - start) / SENTENCES * 1e6
+
+        start = time.perf_counter()
+        for words in runs:
+            model.test_sentence_output(
+                words, DEFAULT_MAX_OVERLAP_RATIO, DEFAULT_MAX_OVERLAP_TOTAL
+            )
+        indexed = (time.perf_counter() - start) / SENTENCES * 1e6
+
+        words = sum(map(len, corpus))
+        text_mb = len(model.rejoined_text.encode("utf-8")) / 1e6
+        index_mb = index.nbytes() / 1e6
+        print(
+            f"{words:>10} {substring:>13.1f} {indexed:>9.1f} {build:>14.2f}"
+            f" {text_mb:>8.1f} {index_mb:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS)
@@ -0,0 +1,58 @@
+"""
+Measure the tradeoff between size and fidelity made by `markovify.Chain.prune`
+at several settings: the number of states and transitions left, the size of
+the compacted model, the share of counts dropped, the divergence from the
+original model (see `markovify.utils.prune_report`), and the share of
+`make_sentence` calls that still succeed.
+
+Usage: python -m benchmarks.bench_prune [path/to/corpus.txt] [state_size]
+"""
+
+import os
+import sys
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+SENTENCES = 200
+
+SETTINGS = [
+    ("none", {}),
+    ("uint8", {"quantize": "uint8"}),
+    ("top_k=4", {"top_k": 4}),
+    ("top_k=1", {"top_k": 1}),
+    ("transitions>=2", {"min_transition_count": 2}),
+    ("states>=2", {"min_state_count": 2}),
+    ("states>=5", {"min_state_count": 5}),
+    ("states>=5,uint8", {"min_state_count": 5, "quantize": "uint8"}),
+]
+
+
+def main(path, state_size):
+    with open(path, encoding="utf-8") as f:
+        text_model = markovify.Text(f.read(), state_size=state_size)
+
+    print(
+        f"{'setting':>16} {'states':>7} {'trans':>7} {'KB':>7} "
+        f"{'dropped':>8} {'diverg':>7} {'success':>8}"
+    )
+    for name, kwargs in SETTINGS:
+        pruned = text_model.chain.prune(**kwargs)
+        report = markovify.utils.prune_report(text_model, pruned)
+        model = markovify.Text.from_chain(
+            pruned, parsed_sentences=text_model.parsed_sentences
+        )
+        made = sum(model.make_sentence(seed=i) is not None for i in range(SENTENCES))
+        print(
+            f"{name:>16} {report['states'][1]:>7} {report['transitions'][1]:>7} "
+            f"{report['nbytes'][1] / 1e3:>7.0f} {report['dropped_mass']:>8.3f} "
+            f"{report['divergence']:>7.3f} {made / SENTENCES:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+    )
@@ -0,0 +1,44 @@
+"""
+Compare the time `markovify.Chain.move` takes to draw the next word with the
+default ("bisect") and "alias" samplers, for states with varying numbers of
+possible next words.
+
+Usage: python -m benchmarks.bench_sampling
+"""
+
+import random
+import timeit
+
+import markovify
+from markovify.chain import BEGIN
+
+FANOUTS = (2, 10, 100, 1000, 10000, 100000)
+NUMBER = 100000
+
+
+def make_chain(fanout):
+    rng = random.Random(fanout)
+    corpus = [[str(i)] for i in range(fanout) for _ in range(rng.randint(1, 10))]
+    return markovify.Chain(corpus, 1)
+
+
+def main():
+    state = (BEGIN,)
+    print(f"{'fanout':>8} {'bisect us':>10} {'alias us':>9} {'uncompiled us':>14}")
+    for fanout in FANOUTS:
+        chain = make_chain(fanout)
+        mid_state = (str(fanout // 2),)
+        chain.model[mid_state] = dict(chain.model[state])
+        timings = []
+        for sampler in ("bisect", "alias"):
+            compiled = chain.compile(sampler=sampler)
+            seconds = timeit.timeit(lambda: compiled.move(state), number=NUMBER)
+            timings.append(seconds / NUMBER * 1e6)
+        number = max(10, NUMBER // fanout)
+        seconds = timeit.timeit(lambda: chain.move(mid_state), number=number)
+        timings.append(seconds / number * 1e6)
+        print(f"{fanout:>8} {timings[0]:>10.2f} {timings[1]:>9.2f} {timings[2]:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the ways of loading a saved `markovify.Text` model, compiled: from
+JSON (`from_json`, then `compile`), from markovify's binary format (`save`
+and `load`), and from a snapshot (`save(..., snapshot=True)` and `load`).
+Reports the file's size, the time taken to load it, and the time taken to
+generate the first sentences from it (which, unless the overlap index was
+loaded, includes building the index).
+
+Usage: python -m benchmarks.bench_snapshot [path/to/corpus.txt]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, "..", "test", "texts", "sherlock.txt")
+SENTENCES = 100
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return markovify.Text.from_json(f.read()).compile()
+
+
+def main(path):
+    with open(path, encoding="utf-8") as f:
+        text_model = markovify.Text(f.read())
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {
+            name: os.path.join(tmpdir, name) for name in ("json", "binary", "snapshot")
+        }
+        with open(paths["json"], "w", encoding="utf-8") as f:
+            f.write(text_model.to_json())
+        text_model.save(paths["binary"])
+        text_model.save(paths["snapshot"], snapshot=True)
+
+        first = f"first {SENTENCES} s"
+        print(f"{'format':>10} {'MB':>7} {'load s':>8} {first:>12}")
+        for name, load in [
+            ("json", load_json),
+            ("binary", markovify.Text.load),
+            ("snapshot", markovify.Text.load),
+        ]:
+            random.seed(0)
+            model, load_seconds = timed(lambda: load(paths[name]))
+            _, generate_seconds = timed(
+                lambda: [model.make_sentence() for _ in range(SENTENCES)]
+            )
+            size = os.path.getsize(paths[name]) / 1e6
+            print(
+                f"{name:>10} {size:>7.1f} {load_seconds:>8.3f} "
+                f"{generate_seconds:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS)
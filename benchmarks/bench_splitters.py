@@ -0,0 +1,116 @@
+"""
+Compare `markovify.splitters.split_into_sentences` and `split_many` with the
+previous implementation (reproduced below), checking that all of them split
+each corpus into exactly the same sentences, both as one text and line by line.
+
+Usage: python -m benchmarks.bench_splitters [path/to/corpus.txt ...]
+"""
+
+import itertools
+import os
+import re
+import sys
+import time
+
+from markovify import splitters
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPORA = [
+    os.path.join(HERE, "..", "test", "texts", name)
+    for name in ("sherlock.txt", "senate-bills.txt")
+]
+REPEAT = 5
+
+legacy_abbr_capped = sorted(splitters.abbr_capped)
+legacy_abbr_lowercase = sorted(splitters.abbr_lowercase)
+
+
+def legacy_is_abbreviation(dotted_word):
+    clipped = dotted_word[:-1]
+    if re.match(splitters.uppercase_letter_pat, clipped[0]):
+        if len(clipped) == 1:  # Initial
+            return True
+        elif clipped.lower() in legacy_abbr_capped:
+            return True
+        else:
+            return False
+    else:
+        if clipped in legacy_abbr_lowercase:
+            return True
+        else:
+            return False
+
+
+def legacy_is_sentence_ender(word):
+    if re.match(splitters.initialism_pat, word) is not None:
+        return False
+    if word[-1] in ["?", "!"]:
+        return True
+    if len(re.sub(r"[^A-Z]", "", word)) > 1:
+        return True
+    if word[-1] == "." and (not legacy_is_abbreviation(word)):
+        return True
+    return False
+
+
+def legacy_split_into_sentences(text):
+    potential_end_pat = re.compile(
+        r"".join(
+            [
+                r"([\w\.'’&\]\)]+[\.\?!])",  # A word that ends with punctuation
+                r"([‘’“”'\"\)\]]*)",  # Followed by optional quote/parens/etc
+                r"(\s+(?![a-z\-–—]))",  # Followed by whitespace + non-(lowercase/dash)
+            ]
+        ),
+        re.U,
+    )
+    dot_iter = re.finditer(potential_end_pat, text)
+    end_indices = [
+        (x.start() + len(x.group(1)) + len(x.group(2)))
+        for x in dot_iter
+        if legacy_is_sentence_ender(x.group(1))
+    ]
+    spans = zip([None] + end_indices, end_indices + [None])
+    sentences = [text[start:end].strip() for start, end in spans]
+    return sentences
+
+
+def timed(func, *args):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def split_lines(split, lines):
+    return list(itertools.chain.from_iterable(map(split, lines)))
+
+
+def main(paths):
+    print(f"{'corpus':>18} {'mode':>6} {'legacy ms':>10} {'new ms':>8} {'many ms':>8}")
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        lines = text.splitlines()
+        name = os.path.basename(path)
+
+        expected, legacy = timed(legacy_split_into_sentences, text)
+        actual, new = timed(splitters.split_into_sentences, text)
+        assert actual == expected, f"{name}: output differs"
+        print(f"{name:>18} {'text':>6} {legacy * 1e3:>10.1f} {new * 1e3:>8.1f}")
+
+        expected, legacy = timed(split_lines, legacy_split_into_sentences, lines)
+        actual, new = timed(split_lines, splitters.split_into_sentences, lines)
+        batch, many = timed(lambda: list(splitters.split_many(lines)))
+        assert actual == batch == expected, f"{name}: output differs"
+        print(
+            f"{name:>18} {'lines':>6} {legacy * 1e3:>10.1f} {new * 1e3:>8.1f} "
+            f"{many * 1e3:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_CORPORA)
@@ -0,0 +1,284 @@
+"""
+A suite of benchmarks of markovify's main operations (building, compiling,
+compacting, sampling, generating and testing sentences, combining, and
+serializing models), run against synthetic corpora of several sizes and the
+corpora bundled with the tests, at several state sizes.
+
+For each operation, it reports throughput (calls per second), latency
+percentiles, and the peak memory allocated by one call (measured separately,
+since tracing slows allocation down). Results can be written as JSON, and
+compared with those of an earlier run.
+
+Usage: python -m benchmarks [--quick] [--output results.json]
+       [--compare baseline.json] [--only substring]
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import markovify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEXTS = os.path.join(HERE, "..", "test", "texts")
+
+BUNDLED = ["sherlock.txt", "senate-bills.txt"]
+SYNTHETIC_SIZES = [1000, 10000, 50000]
+STATE_SIZES = [1, 2, 3]
+
+QUICK_BUNDLED = ["sherlock.txt"]
+QUICK_SYNTHETIC_SIZES = [1000]
+QUICK_STATE_SIZES = [2]
+
+SYNTHETIC_VOCAB = 5000
+# Each sample times enough calls to take at least this long
+SAMPLE_SECONDS = 0.005
+MIN_SAMPLES = 3
+MAX_SAMPLES = 200
+MIN_SECONDS = 0.5
+QUICK_MIN_SECONDS = 0.1
+PERCENTILES = (50, 90, 99)
+
+
+def synthetic_corpus(sentences, vocab=SYNTHETIC_VOCAB, seed=0):
+    """
+    Return a text of `sentences` sentences of 5-25 words, drawn from
+    `vocab` made-up words with Zipf-distributed frequencies.
+    """
+    rng = random.Random(seed)
+    words = ["w{}".format(i) for i in range(vocab)]
+    weights = [1 / (i + 1) for i in range(vocab)]
+    return " ".join(
+        " ".join(rng.choices(words, weights, k=rng.randint(5, 25))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def corpora(quick):
+    for size in QUICK_SYNTHETIC_SIZES if quick else SYNTHETIC_SIZES:
+        yield "synthetic-{}".format(size), synthetic_corpus(size)
+    for name in QUICK_BUNDLED if quick else BUNDLED:
+        with open(os.path.join(TEXTS, name), encoding="utf-8") as f:
+            yield os.path.splitext(name)[0], f.read()
+
+
+def time_calls(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def percentile(values, p):
+    # Nearest-rank percentile of sorted `values`
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+
+def measure(func, min_seconds):
+    """
+    Time `func` in samples of as many calls as take `SAMPLE_SECONDS`, until
+    at least `min_seconds` (and `MIN_SAMPLES` samples) have passed. Returns
+    a dict of the calls' throughput, latency percentiles (in milliseconds,
+    averaged over each sample's calls), and peak memory (in MB).
+    """
+    # Calibrating also warms up any caches, so its timings are discarded
+    number = 1
+    while time_calls(func, number) < SAMPLE_SECONDS:
+        number *= 2
+    samples = []
+    while len(samples) < MAX_SAMPLES and (
+        len(samples) < MIN_SAMPLES or sum(samples) < min_seconds
+    ):
+        samples.append(time_calls(func, number))
+    latencies = sorted(sample / number * 1e3 for sample in samples)
+    result = {
+        "calls": number * len(samples),
+        "samples": len(samples),
+        "throughput": number * len(samples) / sum(samples),
+    }
+    for p in PERCENTILES:
+        result["p{}_ms".format(p)] = percentile(latencies, p)
+    result["peak_mb"] = peak_memory(func) / 1e6
+    return result
+
+
+def operations(text, state_size):
+    """
+    Yield `(name, func)` for each operation to benchmark on `text` (a
+    corpus) with models of `state_size`. Everything the operations use is
+    built beforehand, outside of their timings.
+    """
+    rng = random.Random(0)
+    model = markovify.Text(text, state_size=state_size)
+    runs = model.parsed_sentences
+    chain = model.chain
+    compiled = chain.compile()
+    compacted = chain.compact()
+    states = itertools.cycle(rng.sample(list(chain.model), min(len(chain.model), 1000)))
+    outputs = itertools.cycle(
+        [model.chain.walk() for _ in range(200)] + rng.sample(runs, min(len(runs), 200))
+    )
+    halves = [
+        markovify.Chain(runs[: len(runs) // 2], state_size),
+        markovify.Chain(runs[len(runs) // 2 :], state_size),
+    ]
+    json_str = model.to_json()
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, "model.markovify")
+    model.save(path)
+    snapshot_path = os.path.join(tmpdir, "snapshot.markovify")
+    model.save(snapshot_path, snapshot=True)
+
+    yield "Text", lambda: markovify.Text(text, state_size=state_size)
+    yield "Text[compact_corpus]", lambda: markovify.Text(
+        text, state_size=state_size, compact_corpus=True
+    )
+    yield "Chain.build", lambda: markovify.Chain(runs, state_size)
+    yield "BackoffChain.build", lambda: markovify.BackoffChain(runs, state_size)
+    yield "Chain.compile", chain.compile
+    yield "Chain.compact", chain.compact
+    yield "Chain.move", lambda: chain.move(next(states))
+    yield "Chain.move[compiled]", lambda: compiled.move(next(states))
+    yield "Chain.move[compacted]", lambda: compacted.move(next(states))
+    yield "Chain.walk", chain.walk
+    yield "Text.make_sentence", model.make_sentence
+    yield "Text.test_sentence_output", lambda: model.test_sentence_output(
+        next(outputs), 0.7, 15
+    )
+    yield "combine", lambda: markovify.combine(halves)
+    yield "Text.to_json", model.to_json
+    yield "Text.from_json", lambda: markovify.Text.from_json(json_str)
+    yield "Text.save", lambda: model.save(path)
+    yield "Text.load", lambda: markovify.Text.load(path)
+    yield "Text.load[snapshot]", lambda: markovify.Text.load(snapshot_path)
+
+    os.remove(path)
+    os.remove(snapshot_path)
+    os.rmdir(tmpdir)
+
+
+def run(quick=False, only=None, log=None):
+    """
+    Run the suite, returning a list of result dicts (see `measure`), each
+    with the `corpus`, `state_size`, and `operation` measured.
+    """
+    min_seconds = QUICK_MIN_SECONDS if quick else MIN_SECONDS
+    results = []
+    for corpus, text in corpora(quick):
+        for state_size in QUICK_STATE_SIZES if quick else STATE_SIZES:
+            for name, func in operations(text, state_size):
+                if only and only not in name:
+                    continue
+                # Sentence generation is random, so fix it for each run
+                random.seed(0)
+                result = {"corpus": corpus, "state_size": state_size}
+                result["operation"] = name
+                result.update(measure(func, min_seconds))
+                results.append(result)
+                if log is not None:
+                    log(result)
+    return results
+
+
+def key(result):
+    return result["corpus"], result["state_size"], result["operation"]
+
+
+def format_result(result, baseline=None):
+    line = "{:<18} {:>2} {:<26} {:>11.1f} {:>9.3f} {:>9.3f} {:>9.3f} {:>8.2f}".format(
+        result["corpus"],
+        result["state_size"],
+        result["operation"],
+        result["throughput"],
+        result["p50_ms"],
+        result["p90_ms"],
+        result["p99_ms"],
+        result["peak_mb"],
+    )
+    if baseline is not None:
+        before = baseline.get(key(result))
+        if before is None:
+            line += " {:>8} {:>8}".format("-", "-")
+        else:
+            line += " {:>7.2f}x {:>7.2f}x".format(
+                result["throughput"] / before["throughput"],
+                result["peak_mb"] / before["peak_mb"] if before["peak_mb"] else 1,
+            )
+    return line
+
+
+def header(baseline=None):
+    line = "{:<18} {:>2} {:<26} {:>11} {:>9} {:>9} {:>9} {:>8}".format(
+        "corpus", "ss", "operation", "calls/s", "p50 ms", "p90 ms", "p99 ms", "peak MB"
+    )
+    if baseline is not None:
+        line += " {:>8} {:>8}".format("speed", "memory")
+    return line
+
+
+def metadata():
+    return {
+        "markovify": markovify.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Run a smaller set, for a quick check"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument(
+        "--compare",
+        help="A JSON file of earlier results, to report the ratios against",
+    )
+    parser.add_argument(
+        "--only", help="Only run operations whose names contain this string"
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {key(result): result for result in json.load(f)["results"]}
+
+    print(header(baseline))
+    results = run(
+        quick=args.quick,
+        only=args.only,
+        log=lambda result: print(format_result(result, baseline), flush=True),
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
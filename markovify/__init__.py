@@ -1,14 +1,19 @@
 __all__ = [
     "__version__",
     "Chain",
+    "MixtureChain",
+    "BackoffChain",
     "Text",
     "NewlineText",
     "split_into_sentences",
+    "split_many",
     "combine",
 ]
 
 from .__version__ import __version__
 from .chain import Chain
+from .mixture import MixtureChain
+from .backoff import BackoffChain
 from .text import Text, NewlineText
-from .splitters import split_into_sentences
+from .splitters import split_into_sentences, split_many
 from .utils import combine
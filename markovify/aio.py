@@ -0,0 +1,232 @@
+import asyncio
+import concurrent.futures
+import os
+import tempfile
+
+from .text import Text
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_PENDING = 1024
+
+# The model loaded by `init_worker`, in each of an `AsyncText`'s processes
+worker_text = None
+
+
+def init_worker(text_class, path):
+    """
+    Loads (by memory-mapping) the model saved at `path`, for `generate`.
+    """
+    global worker_text
+    worker_text = text_class.load(path)
+
+
+def generate(n, kwargs):
+    """
+    Makes `n` sentences with the worker's model, as a list.
+    """
+    if n == 1:
+        return [worker_text.make_sentence(**kwargs)]
+    return worker_text.make_sentences(n, **kwargs)
+
+
+class AsyncText:
+    """
+    Generates sentences from a `markovify.Text` without blocking an asyncio
+    event loop, by running generation in a pool of `workers` processes.
+
+    `model` is either a `markovify.Text` (or subclass), which is saved to a
+    temporary file as a snapshot, or the path of a model saved by
+    `Text.save`. Each process memory-maps that file (see `Text.load`), so
+    they all share one copy of the chain, which they don't parse. From a
+    snapshot, they share the overlap index too, and read the original
+    corpus without parsing it, though each keeps its own copy of the
+    corpus's word ids, and builds its own lookup of words to ids when it
+    first checks a sentence for overlap. (A model saved without
+    `snapshot=True` that retains its corpus is parsed, and indexed, by
+    every process.) As with `Text.save`, a subclass must be importable by
+    the worker processes, and anything a snapshot doesn't store, such as
+    `input_filters`, is not preserved.
+
+    Concurrent `make_sentence` calls with the same keyword arguments are
+    batched: whenever a process is free, the waiting requests (up to
+    `max_batch` of them) are sent to it together, as one `make_sentences`
+    call, which honours the same keyword arguments as `make_sentence`
+    (e.g. `max_chars` and `bias_end`). Requests with a `seed` are never
+    batched, so that they return the same sentence as
+    `Text.make_sentence(seed=...)`. (Pass `seed` rather than `rng`, which
+    can't be shared with the processes.)
+
+    At most `max_pending` requests wait for a process; beyond that, callers
+    of `make_sentence` wait to join the queue, and only two batches per
+    process are ever in flight, so a burst of requests can't exhaust memory.
+
+    Use as an async context manager, or call `close()` when done:
+
+        async with AsyncText(text_model, workers=4) as service:
+            sentence = await service.make_sentence(max_words=20)
+    """
+
+    def __init__(
+        self,
+        model,
+        workers=1,
+        max_batch=DEFAULT_MAX_BATCH,
+        max_pending=DEFAULT_MAX_PENDING,
+    ):
+        self.temp_path = None
+        if isinstance(model, (str, os.PathLike)):
+            text_class, path = Text, model
+        else:
+            fd, self.temp_path = tempfile.mkstemp(suffix=".markovify")
+            os.close(fd)
+            model.save(self.temp_path, snapshot=True)
+            text_class, path = type(model), self.temp_path
+
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(text_class, path)
+        )
+        self.queue = None
+        self.slots = None
+        self.dispatcher = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start(self):
+        # The queue and semaphore belong to the running event loop, so they
+        # are created on first use, rather than in `__init__`
+        if self.dispatcher is None:
+            self.queue = asyncio.Queue(self.max_pending)
+            self.slots = asyncio.Semaphore(2 * self.workers)
+            self.dispatcher = asyncio.ensure_future(self.dispatch())
+
+    async def close(self):
+        """
+        Stops the worker processes, failing any waiting requests, and deletes
+        the temporary copy of the model, if any.
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+            try:
+                await self.dispatcher
+            except asyncio.CancelledError:
+                pass
+            while not self.queue.empty():
+                _, future = self.queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("AsyncText was closed"))
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.executor.shutdown)
+        if self.temp_path is not None:
+            os.remove(self.temp_path)
+            self.temp_path = None
+
+    async def make_sentence(self, **kwargs):
+        """
+        Returns a sentence, as `Text.make_sentence(**kwargs)` would (i.e.,
+        None if none could be made).
+        """
+        if kwargs.get("rng") is not None:
+            raise ValueError("Pass `seed`, rather than `rng`, to AsyncText")
+        self.start()
+        future = asyncio.get_event_loop().create_future()
+        await self.queue.put((kwargs, future))
+        return await future
+
+    async def make_sentences(self, n, **kwargs):
+        """
+        Returns a list of `n` sentences, made in one process by
+        `Text.make_sentences(n, **kwargs)`.
+        """
+        if kwargs.get("rng") is not None:
+            raise ValueError("Pass `seed`, rather than `rng`, to AsyncText")
+        self.start()
+        async with self.slots:
+            return await self.run(n, kwargs)
+
+    async def sentences(self, n=None, **kwargs):
+        """
+        Yields `n` sentences (or, if `n` is None, sentences indefinitely), as
+        `Text.make_sentences(**kwargs)` would make them, in batches of
+        `max_batch`. The next batch is made while the current one is being
+        consumed.
+        """
+        batch_size = self.max_batch if n is None else min(n, self.max_batch)
+        remaining = n
+        pending = asyncio.ensure_future(self.make_sentences(batch_size, **kwargs))
+        try:
+            while pending is not None:
+                batch = await pending
+                pending = None
+                if remaining is not None:
+                    remaining -= len(batch)
+                    batch_size = min(remaining, self.max_batch)
+                if batch_size > 0:
+                    pending = asyncio.ensure_future(
+                        self.make_sentences(batch_size, **kwargs)
+                    )
+                for sentence in batch:
+                    yield sentence
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def run(self, n, kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, generate, n, kwargs)
+
+    async def dispatch(self):
+        """
+        Takes waiting `make_sentence` requests off the queue, in batches, and
+        sends each batch to the worker processes when one is free.
+        """
+        while True:
+            requests = [await self.queue.get()]
+            # Requests keep arriving while we wait for a process
+            await self.slots.acquire()
+            while len(requests) < self.max_batch and not self.queue.empty():
+                requests.append(self.queue.get_nowait())
+            for i, (kwargs, futures) in enumerate(self.group(requests)):
+                if i > 0:
+                    await self.slots.acquire()
+                asyncio.ensure_future(self.run_batch(kwargs, futures))
+
+    @staticmethod
+    def group(requests):
+        """
+        Groups `requests` (pairs of keyword arguments and futures) by their
+        keyword arguments, except that those with a `seed` are kept apart.
+        Returns a list of pairs of keyword arguments and lists of futures.
+        """
+        groups = []
+        for kwargs, future in requests:
+            if kwargs.get("seed") is None:
+                for group_kwargs, futures in groups:
+                    if group_kwargs == kwargs:
+                        futures.append(future)
+                        break
+                else:
+                    groups.append((kwargs, [future]))
+            else:
+                groups.append((kwargs, [future]))
+        return groups
+
+    async def run_batch(self, kwargs, futures):
+        try:
+            sentences = await self.run(len(futures), kwargs)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, sentence in zip(futures, sentences):
+                if not future.done():
+                    future.set_result(sentence)
+        finally:
+            self.slots.release()
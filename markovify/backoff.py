@@ -0,0 +1,317 @@
+from collections.abc import Mapping
+
+from . import parallel
+from .chain import BEGIN, DEFAULT_CACHE_SIZE, END, SAMPLERS, Chain
+
+
+class ContextTrie:
+    """
+    The transition counts of a model of `state_size`, stored as a trie of
+    its states, each read backward from its last word, which doubles as the
+    model of every smaller state size: the node at depth k on a state's path
+    is that of its last k words, and its counts are the sums of those of the
+    states below it.
+
+    Each inner node is a dict of its children, by word, and each leaf (the
+    node of a full state) is the state's `{next_item: count}` dict. Only the
+    leaves hold counts. Those of smaller states are summed on first use (as
+    they're only needed to back off), and kept in `self.sums`, which is
+    emptied when it reaches `DEFAULT_CACHE_SIZE` entries, or the counts
+    change.
+    """
+
+    def __init__(self, state_size):
+        self.state_size = state_size
+        self.root = {}
+        # The number of states of each size (the first entry is unused)
+        self.sizes = [0] * (state_size + 1)
+        self.sums = {}
+
+    def add(self, runs):
+        """
+        Count the transitions of `runs` (a list of lists, as passed to
+        `markovify.Chain`), in one pass.
+        """
+        state_size = self.state_size
+        root = self.root
+        sizes = self.sizes
+        for run in runs:
+            items = ([BEGIN] * state_size) + run + [END]
+            for i in range(state_size, len(items)):
+                node = root
+                for j in range(i - 1, i - state_size - 1, -1):
+                    child = node.get(items[j])
+                    if child is None:
+                        child = node[items[j]] = {}
+                        sizes[i - j] += 1
+                    node = child
+                follow = items[i]
+                node[follow] = node.get(follow, 0) + 1
+        self.sums = {}
+
+    def add_counts(self, state, next_dict):
+        """
+        Add `next_dict` (a `{next_item: count}` dict) to the counts of
+        `state`, a state of `self.state_size` words.
+        """
+        node = self.root
+        for depth, word in enumerate(reversed(state), 1):
+            child = node.get(word)
+            if child is None:
+                child = node[word] = {}
+                self.sizes[depth] += 1
+            node = child
+        for next_word, count in next_dict.items():
+            node[next_word] = node.get(next_word, 0) + count
+        self.sums = {}
+
+    def merge(self, other):
+        """
+        Add the counts of `other`, a trie of the same state size, to this one.
+        """
+        for state, next_dict in other.items(other.state_size):
+            self.add_counts(state, next_dict)
+
+    def copy(self):
+        """
+        Return a copy of the trie, which can be added to independently.
+        """
+
+        def copy_node(node, depth):
+            if depth == self.state_size:
+                return dict(node)
+            return {word: copy_node(child, depth + 1) for word, child in node.items()}
+
+        trie = type(self)(self.state_size)
+        trie.root = copy_node(self.root, 0)
+        trie.sizes = list(self.sizes)
+        return trie
+
+    def leaves(self, node, depth):
+        # The counts dicts below `node`, which is at `depth` (of the trie's
+        # inner nodes)
+        nodes = list(node.values())
+        for _ in range(depth + 1, self.state_size):
+            nodes = [child for node in nodes for child in node.values()]
+        return nodes
+
+    def counts(self, state, node):
+        """
+        Return the counts of `state`, whose node is `node`.
+        """
+        if len(state) == self.state_size:
+            return node
+        counts = self.sums.get(state)
+        if counts is None:
+            counts = {}
+            for leaf in self.leaves(node, len(state)):
+                for next_word, count in leaf.items():
+                    counts[next_word] = counts.get(next_word, 0) + count
+            if len(self.sums) >= DEFAULT_CACHE_SIZE:
+                self.sums.clear()
+            self.sums[state] = counts
+        return counts
+
+    def lookup(self, state):
+        """
+        Return the counts of `state` (of any size up to `self.state_size`),
+        or raise KeyError if it was never seen.
+        """
+        if not 0 < len(state) <= self.state_size:
+            raise KeyError(state)
+        node = self.root
+        try:
+            for word in reversed(state):
+                node = node[word]
+        except KeyError:
+            raise KeyError(state)
+        return self.counts(state, node)
+
+    def longest(self, state):
+        """
+        Return the longest suffix of `state` that was seen, and its counts.
+        Raises KeyError if not even its last word was seen.
+        """
+        node = self.root
+        size = 0
+        for word in reversed(state[-self.state_size :]):
+            child = node.get(word)
+            if child is None:
+                break
+            node = child
+            size += 1
+        if size == 0:
+            raise KeyError(state)
+        suffix = tuple(state[len(state) - size :])
+        return suffix, self.counts(suffix, node)
+
+    def items(self, size):
+        """
+        Yield each state of `size` words, with its counts, depth first.
+        """
+        level = [((), self.root)]
+        for _ in range(size - 1):
+            level = [
+                ((word,) + suffix, child)
+                for suffix, node in level
+                for word, child in node.items()
+            ]
+        for suffix, node in level:
+            for word, child in node.items():
+                state = (word,) + suffix
+                yield state, self.counts(state, child)
+
+
+class BackoffModel(Mapping):
+    """
+    A read-only view of the states of `state_size` words in a `ContextTrie`,
+    as an uncompiled model: a mapping of states to `{next_item: count}`
+    dicts.
+    """
+
+    def __init__(self, trie, state_size):
+        self.trie = trie
+        self.state_size = state_size
+
+    def __getitem__(self, state):
+        if len(state) != self.state_size:
+            raise KeyError(state)
+        return self.trie.lookup(state)
+
+    def __iter__(self):
+        return (state for state, _ in self.trie.items(self.state_size))
+
+    def __len__(self):
+        return self.trie.sizes[self.state_size]
+
+
+class BackoffChain(Chain):
+    """
+    A `markovify.Chain` that holds the models of every state size from 1 to
+    `state_size`, built in one pass over the corpus and stored together in a
+    `ContextTrie`, and that backs off to the largest smaller state it has
+    seen when asked to move from a state it hasn't (e.g., an `init_state`
+    that is not in the corpus). Once a run has backed off, each word it
+    yields is followed by a state seen with one more word, so within
+    `state_size` words, it is walking the full model again.
+
+    This costs much less than building a `markovify.Chain` for each state
+    size, and `at_size` views the trie as one of them. For states it has
+    seen, it samples exactly as a `markovify.Chain` of `state_size` would.
+
+    It can be updated (with `update`) and lazily compiled, but not compiled,
+    compacted, or pruned in place: those return a plain `markovify.Chain` of
+    the largest states, which is also what `to_json` and `save` store. Since
+    the smaller states' counts are sums of the largest ones', `from_json`,
+    `load`, and `from_chain` rebuild the trie from any such chain.
+    """
+
+    @property
+    def trie(self):
+        return self.model.trie
+
+    def build(self, corpus, state_size):
+        trie = ContextTrie(state_size)
+        trie.add(corpus)
+        return BackoffModel(trie, state_size)
+
+    def build_parallel(self, corpus, state_size, workers):
+        model = None
+        for partial in parallel.imap(
+            self.build, parallel.shards(corpus), workers, state_size
+        ):
+            if model is None:
+                model = partial
+            else:
+                model.trie.merge(partial.trie)
+        return model or self.build([], state_size)
+
+    def at_size(self, state_size):
+        """
+        Return a plain `markovify.Chain` of `state_size` (from 1 to
+        `self.state_size`) that shares this chain's trie.
+        """
+        if not 0 < state_size <= self.state_size:
+            raise ValueError(
+                "`state_size` should be from 1 to {}".format(self.state_size)
+            )
+        return Chain(None, state_size, model=BackoffModel(self.trie, state_size))
+
+    def backoff(self, state):
+        """
+        Return the longest suffix of `state` that the model has seen.
+        """
+        return self.trie.longest(state)[0]
+
+    def compiled_next(self, state):
+        try:
+            return super().compiled_next(state)
+        except KeyError:
+            _, next_dict = self.trie.longest(state)
+            return SAMPLERS[self.sampler or "bisect"](next_dict)
+
+    def next_weights(self, state):
+        try:
+            return self.model[state]
+        except KeyError:
+            return self.trie.longest(state)[1]
+
+    def update(self, runs):
+        """
+        Add the counts from `runs` to the models of every state size, in
+        place. See `markovify.Chain.update`.
+        """
+        self.trie.add(runs)
+        self.prefix_index = None
+        self.remaining_lengths = None
+        self.biased_next = {}
+        if self.cache is not None:
+            self.cache.clear()
+        self.precompute_begin_state()
+
+    def check_updatable(self):
+        raise ValueError("Not implemented for markovify.BackoffChain")
+
+    def compile(
+        self, inplace=False, sampler="bisect", lazy=False, cache_size=DEFAULT_CACHE_SIZE
+    ):
+        options = dict(sampler=sampler, lazy=lazy, cache_size=cache_size)
+        if not lazy:
+            if inplace:
+                raise ValueError("Not implemented for markovify.BackoffChain")
+            return super().compile(**options)
+        if inplace:
+            chain = self
+        else:
+            model = BackoffModel(self.trie.copy(), self.state_size)
+            chain = type(self)(None, self.state_size, model)
+        return Chain.compile(chain, inplace=True, **options)
+
+    def compact(self, inplace=False):
+        if inplace:
+            raise ValueError("Not implemented for markovify.BackoffChain")
+        return super().compact()
+
+    def prune(self, *args, inplace=False, **kwargs):
+        if inplace:
+            raise ValueError("Not implemented for markovify.BackoffChain")
+        return super().prune(*args, **kwargs)
+
+    @classmethod
+    def from_chain(cls, chain):
+        """
+        Build a `BackoffChain` from `chain`, a `markovify.Chain` of any form,
+        by adding each of its states' weights to the trie.
+        """
+        trie = ContextTrie(chain.state_size)
+        for state in chain.model:
+            trie.add_counts(state, chain.next_weights(state))
+        return cls(None, chain.state_size, BackoffModel(trie, chain.state_size))
+
+    @classmethod
+    def from_json(cls, json_thing):
+        return cls.from_chain(Chain.from_json(json_thing))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls.from_chain(Chain.load(path, mmap))
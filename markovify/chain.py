@@ -1,8 +1,10 @@
 import random
 import operator
 import bisect
+import collections
 import json
-import copy
+from . import jsonstream, parallel
+from .compact import CompactModel, read_model, write_model
 
 BEGIN = "___BEGIN__"
 END = "___END__"
@@ -27,13 +29,206 @@ def compile_next(next_dict):
     return [words, cff]
 
 
+def compile_alias(next_dict):
+    """
+    Build a Walker/Vose alias table, which lets `Chain.move` pick the next
+    word in constant time, regardless of how many words may follow a state.
+    Returns `[words, probs, aliases]`: to sample, pick a column `i` uniformly
+    at random, then return `words[i]` with probability `probs[i]`, and
+    otherwise `words[aliases[i]]`.
+    """
+    words = list(next_dict.keys())
+    n = len(words)
+    total = sum(next_dict.values())
+    scaled = [weight * n / total for weight in next_dict.values()]
+    probs = [1.0] * n
+    aliases = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    while small and large:
+        s = small.pop()
+        g = large.pop()
+        probs[s] = scaled[s]
+        aliases[s] = g
+        scaled[g] = (scaled[g] + scaled[s]) - 1
+        if scaled[g] < 1:
+            small.append(g)
+        else:
+            large.append(g)
+    return [words, probs, aliases]
+
+
+def decompile_next(compiled_next):
+    """
+    Reverse `compile_next`, recovering the `{word: count}` dict. For an alias
+    table built by `compile_alias`, recovers each word's probability instead.
+    """
+    if len(compiled_next) == 3:
+        words, probs, aliases = compiled_next
+        n = len(words)
+        weights = list(probs)
+        for i, alias in enumerate(aliases):
+            if alias != i:
+                weights[alias] += 1 - probs[i]
+        return {word: weight / n for word, weight in zip(words, weights)}
+    words, cff = compiled_next
+    return dict(zip(words, (b - a for a, b in zip([0] + cff, cff))))
+
+
+def merge_models(model, other, weight=1):
+    """
+    Add the (uncompiled) model `other`'s counts, multiplied by `weight`,
+    to `model`, in place.
+    """
+    for state, options in other.items():
+        current = model.get(state)
+        if current is None:
+            model[state] = current = {}
+        for next_word, count in options.items():
+            current[next_word] = current.get(next_word, 0) + (count * weight)
+    return model
+
+
+QUANTIZE_LEVELS = {
+    "uint8": 255,
+    "uint16": 65535,
+}
+
+
+def quantize_counts(next_dict, levels):
+    """
+    Rescale a state's counts to integers from 1 to `levels`, in proportion
+    to the largest, so that they can be stored in a fixed number of bits.
+    """
+    top = max(next_dict.values())
+    return {
+        next_word: max(1, round(count * levels / top))
+        for next_word, count in next_dict.items()
+    }
+
+
+def prune_model(
+    items,
+    state_size,
+    min_state_count=1,
+    min_transition_count=1,
+    top_k=None,
+    quantize=None,
+):
+    """
+    Build a smaller (uncompiled) model from `items`, the `(state, {next_item:
+    count})` pairs of a model, dropping:
+
+    - States whose counts total less than `min_state_count` (except the
+      state of all BEGINs).
+    - Transitions counted fewer than `min_transition_count` times, or not
+      among their state's `top_k` most frequent, except that each state
+      keeps at least its most frequent transition.
+    - Transitions into dropped states (since a walk couldn't continue from
+      them), and then any states left with no transitions, and so on.
+
+    If `quantize` is one of `QUANTIZE_LEVELS`, the remaining counts are then
+    rescaled by `quantize_counts`.
+    """
+    if quantize is not None and quantize not in QUANTIZE_LEVELS:
+        raise ValueError(
+            "`quantize` should be one of: " + ", ".join(sorted(QUANTIZE_LEVELS))
+        )
+    begin_state = tuple([BEGIN] * state_size)
+    pruned = {}
+    for state, next_dict in items:
+        if state != begin_state and sum(next_dict.values()) < min_state_count:
+            continue
+        ranked = sorted(next_dict, key=next_dict.__getitem__, reverse=True)
+        keep = set(
+            word for word in ranked[:top_k] if next_dict[word] >= min_transition_count
+        )
+        keep = keep or set(ranked[:1])
+        pruned[state] = {
+            word: count for word, count in next_dict.items() if word in keep
+        }
+
+    changed = True
+    while changed:
+        changed = False
+        for state in list(pruned):
+            next_dict = pruned[state]
+            for word in list(next_dict):
+                if word != END and (state[1:] + (word,)) not in pruned:
+                    del next_dict[word]
+            if not next_dict:
+                if state == begin_state:
+                    raise ValueError("Pruning would leave no way to begin a run")
+                del pruned[state]
+                changed = True
+
+    if quantize is not None:
+        levels = QUANTIZE_LEVELS[quantize]
+        for state, next_dict in pruned.items():
+            pruned[state] = quantize_counts(next_dict, levels)
+    return pruned
+
+
+SAMPLERS = {
+    "bisect": compile_next,
+    "alias": compile_alias,
+}
+
+DEFAULT_CACHE_SIZE = 100000
+EXPECTED_LENGTH_TOLERANCE = 0.01
+EXPECTED_LENGTH_MAX_ITERATIONS = 100
+
+
+class CompiledCache:
+    """
+    A size-bounded, least-recently-used cache of compiled states, which lets
+    `Chain.move` compile each state on first use rather than all at once.
+    Counts its `hits` and `misses`.
+    """
+
+    def __init__(self, sampler, maxsize=DEFAULT_CACHE_SIZE):
+        self.compile_state = SAMPLERS[sampler]
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model, state):
+        # Popping and reinserting (rather than `move_to_end`) keeps this safe
+        # for threads that share the cache
+        compiled_next = self.entries.pop(state, None)
+        if compiled_next is None:
+            self.misses += 1
+            compiled_next = self.compile_state(model[state])
+        else:
+            self.hits += 1
+        self.entries[state] = compiled_next
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return compiled_next
+
+    def discard(self, state):
+        self.entries.pop(state, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+
 class Chain:
     """
     A Markov chain representing processes that have both beginnings and ends.
     For example: Sentences.
     """
 
-    def __init__(self, corpus, state_size, model=None):
+    def __init__(self, corpus, state_size, model=None, workers=1):
         """
         `corpus`: A list of lists, where each outer list is a "run"
         of the process (e.g., a single sentence), and each inner list
@@ -43,27 +238,180 @@ class Chain:
 
         `state_size`: An integer indicating the number of items the model
         uses to represent its state. For text generation, 2 or 3 are typical.
+
+        `workers`: If greater than 1, the model is built by that many
+        processes, via `self.build_parallel`.
         """
         self.state_size = state_size
-        self.model = model or self.build(corpus, self.state_size)
+        if model:
+            self.model = model
+        elif workers > 1:
+            self.model = self.build_parallel(corpus, self.state_size, workers)
+        else:
+            self.model = self.build(corpus, self.state_size)
+        self.compacted = isinstance(self.model, CompactModel)
+        begin_state = tuple([BEGIN] * state_size)
         self.compiled = (len(self.model) > 0) and (
-            type(self.model[tuple([BEGIN] * state_size)]) == list
+            isinstance(self.model[begin_state], list)
         )
+        self.sampler = None
+        self.cache = None
+        self.prefix_index = None
+        self.remaining_lengths = None
+        self.biased_next = {}
+        self.stats = None
+        if self.compiled:
+            self.sampler = "alias" if len(self.model[begin_state]) == 3 else "bisect"
         if not self.compiled:
             self.precompute_begin_state()
 
-    def compile(self, inplace=False):
-        if self.compiled:
+    def compile(
+        self, inplace=False, sampler="bisect", lazy=False, cache_size=DEFAULT_CACHE_SIZE
+    ):
+        """
+        Precompute each state's sampling table, for faster generation.
+
+        `sampler` selects how `move` draws the next word:
+
+        - `"bisect"` (the default) stores each state's cumulative weights, and
+          draws by binary search, in O(log n) time for n possible next words.
+        - `"alias"` stores a Walker/Vose alias table per state, and draws in
+          O(1) time, which pays off for states with many possible next words.
+
+        If `lazy` is True, the model itself is left as is, and each state is
+        instead compiled the first time `move` visits it, and kept in a
+        `CompiledCache` of (at most) the `cache_size` most recently used
+        states. Since most states of a large model are rarely visited, this
+        gets much of the speed of compiling for a fraction of the memory.
+        (Unless `inplace`, the returned chain gets its own copy of the
+        uncompiled model, so that updating either chain leaves the other's
+        model, prefix index, and cache consistent.)
+        """
+        if sampler not in SAMPLERS:
+            raise ValueError(
+                "`sampler` should be one of: " + ", ".join(sorted(SAMPLERS))
+            )
+        if lazy:
+            if self.compiled:
+                raise ValueError("markovify.Chain is already compiled")
+            if inplace:
+                chain = self
+            else:
+                model = {state: dict(options) for state, options in self.model.items()}
+                chain = Chain(None, self.state_size, model=model)
+            chain.cache = CompiledCache(sampler, cache_size)
+            chain.sampler = sampler
+            return chain
+        if self.compiled and self.sampler == sampler:
             if inplace:
                 return self
-            return Chain(None, self.state_size, model=copy.deepcopy(self.model))
-        mdict = {
-            state: compile_next(next_dict) for (state, next_dict) in self.model.items()
-        }
+            # Compiled entries are never mutated, so can be safely shared.
+            return Chain(None, self.state_size, model=dict(self.model))
+        if self.compiled:
+            items = (
+                (state, decompile_next(compiled_next))
+                for (state, compiled_next) in self.model.items()
+            )
+        else:
+            items = self.model.items()
+        compile_state = SAMPLERS[sampler]
+        mdict = {state: compile_state(next_dict) for (state, next_dict) in items}
         if not inplace:
             return Chain(None, self.state_size, model=mdict)
         self.model = mdict
         self.compiled = True
+        self.compacted = False
+        self.sampler = sampler
+        self.cache = None
+        return self
+
+    def prune(
+        self,
+        min_state_count=1,
+        min_transition_count=1,
+        top_k=None,
+        quantize=None,
+        inplace=False,
+    ):
+        """
+        Shrink the model by dropping rare states and transitions, and
+        optionally quantizing its counts (`quantize="uint8"` or `"uint16"`).
+        See `prune_model` for the details, which guarantee that every walk
+        through the pruned model can continue until it reaches END.
+
+        The pruned model keeps the form of this one (compiled, lazily
+        compiled, or compacted). Since a quantized model's counts are small
+        integers, it takes less space when compacted. To measure the effect
+        of pruning, see `markovify.utils.prune_report`.
+
+        Chains compiled with the alias sampler keep only probabilities, not
+        counts, so they can't be pruned.
+        """
+        if self.compiled and self.sampler == "alias":
+            raise ValueError(
+                "Not implemented for markovify.Chain compiled with the alias sampler"
+            )
+        items = ((state, self.next_weights(state)) for state in self.model)
+        pruned = prune_model(
+            items,
+            self.state_size,
+            min_state_count,
+            min_transition_count,
+            top_k,
+            quantize,
+        )
+        if self.compacted:
+            model = CompactModel.from_dict(pruned)
+        elif self.compiled:
+            compile_state = SAMPLERS[self.sampler]
+            model = {
+                state: compile_state(next_dict) for state, next_dict in pruned.items()
+            }
+        else:
+            model = pruned
+        if not inplace:
+            chain = Chain(None, self.state_size, model=model)
+            if self.cache is not None:
+                chain.cache = CompiledCache(self.sampler, self.cache.maxsize)
+                chain.sampler = self.sampler
+            return chain
+        self.model = model
+        self.prefix_index = None
+        self.remaining_lengths = None
+        self.biased_next = {}
+        if self.cache is not None:
+            self.cache.clear()
+        if not self.compiled:
+            self.precompute_begin_state()
+        return self
+
+    def compact(self, inplace=False):
+        """
+        Convert the model to a `markovify.compact.CompactModel`, which interns
+        words to integer ids and stores transitions in contiguous arrays. This
+        uses a fraction of the memory of the dict-of-dicts model, at a small
+        cost in generation speed.
+        """
+        if self.compacted:
+            if inplace:
+                return self
+            return Chain(None, self.state_size, model=self.model)
+        if self.compiled:
+            source = {
+                state: decompile_next(compiled_next)
+                for (state, compiled_next) in self.model.items()
+            }
+        else:
+            source = self.model
+        cmodel = CompactModel.from_dict(source)
+        if not inplace:
+            return Chain(None, self.state_size, model=cmodel)
+        self.model = cmodel
+        self.compacted = True
+        self.compiled = False
+        self.sampler = None
+        self.cache = None
+        self.precompute_begin_state()
         return self
 
     def build(self, corpus, state_size):
@@ -93,6 +441,106 @@ class Chain:
                 model[state][follow] += 1
         return model
 
+    def build_parallel(self, corpus, state_size, workers):
+        """
+        Build the same model as `self.build`, but by splitting the corpus
+        into shards, building each shard's model in a pool of `workers`
+        processes, and merging the partial models (as `markovify.combine`
+        would, with equal weights) as they arrive.
+        """
+        model = None
+        for partial in parallel.imap(
+            self.build, parallel.shards(corpus), workers, state_size
+        ):
+            if model is None:
+                model = partial
+            else:
+                merge_models(model, partial)
+        return model or {}
+
+    def update(self, runs):
+        """
+        Add the counts from `runs` (a list of lists, as passed to `__init__`)
+        to the model, in place. Only the states that `runs` visits are
+        touched (and, for compiled models, recompiled), so updating a large
+        model with a few runs is cheap.
+        """
+        self.add_counts(self.build(runs, self.state_size))
+
+    def add_counts(self, counts, weight=1):
+        """
+        Add `counts` (an uncompiled model: a mapping of states to
+        `{next_item: count}` dicts), multiplied by `weight`, to the model, in
+        place, touching only the states in `counts`, as `update` does.
+        """
+        self.check_updatable()
+        self.remaining_lengths = None
+        self.biased_next = {}
+        if self.prefix_index is not None:
+            self.add_to_prefix_index(s for s in counts if s not in self.model)
+        if self.compiled:
+            for state, options in counts.items():
+                compiled_next = self.model.get(state)
+                merged = {} if compiled_next is None else decompile_next(compiled_next)
+                for next_word, count in options.items():
+                    merged[next_word] = merged.get(next_word, 0) + (count * weight)
+                # Assign a new entry, as compiled entries may be shared
+                self.model[state] = compile_next(merged)
+        else:
+            merge_models(self.model, counts, weight)
+            if tuple([BEGIN] * self.state_size) in counts:
+                self.precompute_begin_state()
+            if self.cache is not None:
+                for state in counts:
+                    self.cache.discard(state)
+
+    def check_updatable(self):
+        """
+        Raise ValueError if the model can't be updated in place.
+        """
+        if self.compacted:
+            raise ValueError("Not implemented for compacted markovify.Chain")
+        if self.compiled and self.sampler == "alias":
+            raise ValueError(
+                "Not implemented for markovify.Chain compiled with the alias sampler"
+            )
+
+    def add_to_prefix_index(self, states, index=None):
+        index = self.prefix_index if index is None else index
+        for state in list(states):
+            for word in state:
+                if word != BEGIN:
+                    index.setdefault(word, []).append(state)
+                    break
+
+    def states_with_prefix(self, prefix):
+        """
+        Return the states that, ignoring any leading BEGINs, start with the
+        words in `prefix`, in model order.
+
+        The first call indexes the states by their first word (other than
+        BEGIN), so that later calls take time proportional to the number of
+        states starting with `prefix[0]`, rather than to the size of the
+        model. `update` keeps the index current, and `save` persists it.
+        """
+        if self.compacted:
+            if self.model.prefix_offsets is None:
+                self.model.build_prefix_index(BEGIN)
+            candidates = self.model.states_starting_with(prefix[0])
+        else:
+            if self.prefix_index is None:
+                # Built aside, so that other threads never see it half-built
+                index = {}
+                self.add_to_prefix_index(self.model, index)
+                self.prefix_index = index
+            candidates = self.prefix_index.get(prefix[0], [])
+        word_count = len(prefix)
+        return [
+            state
+            for state in candidates
+            if tuple(word for word in state if word != BEGIN)[:word_count] == prefix
+        ]
+
     def precompute_begin_state(self):
         """
         Caches the summation calculation and available choices for BEGIN * state_size.
@@ -103,43 +551,291 @@ class Chain:
         self.begin_cumdist = cumdist
         self.begin_choices = choices
 
-    def move(self, state):
+    def move(self, state, rng=None):
         """
-        Given a state, choose the next item at random.
+        Given a state, choose the next item at random, using `rng` (a
+        `random.Random`) if given, or else the `random` module's global
+        generator. Each of the generation methods below accepts an `rng` to
+        pass along, so that runs can be reproduced from a seed, and so that
+        threads can generate from one chain with independent generators.
         """
-        if self.compiled:
-            choices, cumdist = self.model[state]
-        elif state == tuple([BEGIN] * self.state_size):
-            choices = self.begin_choices
-            cumdist = self.begin_cumdist
-        else:
-            choices, weights = zip(*self.model[state].items())
-            cumdist = list(accumulate(weights))
-        r = random.random() * cumdist[-1]
+        rand = (rng or random).random
+        if self.compacted and self.cache is None:
+            start, stop = self.model.span(state)
+            cumdist = self.model.cumweights
+            r = rand() * cumdist[stop - 1]
+            index = bisect.bisect(cumdist, r, start, stop)
+            return self.model.vocab[self.model.successors[index]]
+        if self.sampler == "alias":
+            choices, probs, aliases = self.compiled_next(state)
+            r = rand() * len(choices)
+            i = int(r)
+            return choices[i] if (r - i) < probs[i] else choices[aliases[i]]
+        choices, cumdist = self.compiled_next(state)
+        r = rand() * cumdist[-1]
         selection = choices[bisect.bisect(cumdist, r)]
         return selection
 
-    def gen(self, init_state=None):
+    def compiled_next(self, state):
+        """
+        Return the sampling table (see `compile`) for `state`: from the
+        compiled model, the lazily-compiled cache, or computed on the spot.
+        """
+        if self.compiled:
+            return self.model[state]
+        if self.cache is not None:
+            return self.cache.get(self.model, state)
+        if state == tuple([BEGIN] * self.state_size):
+            return self.begin_choices, self.begin_cumdist
+        choices, weights = zip(*self.model[state].items())
+        return choices, list(accumulate(weights))
+
+    def move_many(self, state, k, rng=None):
+        """
+        Given a state, choose `k` next items at random, independently. The
+        state's distribution is looked up (and, for uncompiled models, summed)
+        only once for the whole batch.
+        """
+        rand = (rng or random).random
+        if self.compacted and self.cache is None:
+            start, stop = self.model.span(state)
+            cumdist = self.model.cumweights
+            total = cumdist[stop - 1]
+            vocab, successors = self.model.vocab, self.model.successors
+            return [
+                vocab[successors[bisect.bisect(cumdist, rand() * total, start, stop)]]
+                for _ in range(k)
+            ]
+        if self.sampler == "alias":
+            choices, probs, aliases = self.compiled_next(state)
+            n = len(choices)
+            selections = []
+            for r in (rand() * n for _ in range(k)):
+                i = int(r)
+                selections.append(
+                    choices[i] if (r - i) < probs[i] else choices[aliases[i]]
+                )
+            return selections
+        choices, cumdist = self.compiled_next(state)
+        total = cumdist[-1]
+        return [choices[bisect.bisect(cumdist, rand() * total)] for _ in range(k)]
+
+    def next_weights(self, state):
+        """
+        Return the `{next_item: weight}` dict for `state`, whatever the form
+        of the model. (For models compiled with the alias sampler, the
+        weights are probabilities.)
+        """
+        if self.compiled:
+            return decompile_next(self.model[state])
+        return self.model[state]
+
+    def expected_lengths(self):
+        """
+        Return a dict of the expected number of items that a run yields from
+        each state onward, before reaching END. Computed on first use, by
+        iterating E(state) = sum(p(item) * (1 + E(next state))) to a fixed
+        point, visiting each state after the states it leads to (so that
+        chains without cycles converge in a single pass).
+        """
+        if self.remaining_lengths is not None:
+            return self.remaining_lengths
+        states = list(self.model)
+        ids = {state: i for i, state in enumerate(states)}
+        rows = []
+        for state in states:
+            weights = self.next_weights(state)
+            total = sum(weights.values())
+            rows.append(
+                [
+                    (weight / total, ids.get(tuple(state[1:]) + (word,)))
+                    for word, weight in weights.items()
+                    if word != END
+                ]
+            )
+
+        # Depth-first post-order, so that successors come first
+        order = []
+        seen = [False] * len(states)
+        for root in range(len(states)):
+            if seen[root]:
+                continue
+            seen[root] = True
+            stack = [(root, iter(rows[root]))]
+            while stack:
+                i, successors = stack[-1]
+                for _, j in successors:
+                    if j is not None and not seen[j]:
+                        seen[j] = True
+                        stack.append((j, iter(rows[j])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(i)
+
+        lengths = [0.0] * len(states)
+        for _ in range(EXPECTED_LENGTH_MAX_ITERATIONS):
+            change = 0.0
+            for i in order:
+                length = 0.0
+                for p, j in rows[i]:
+                    length += p * (1 if j is None else 1 + lengths[j])
+                change = max(change, abs(length - lengths[i]))
+                lengths[i] = length
+            if change < EXPECTED_LENGTH_TOLERANCE:
+                break
+        self.remaining_lengths = dict(zip(states, lengths))
+        return self.remaining_lengths
+
+    def move_toward_end(self, state, budget, rng=None):
+        """
+        Like `move`, but with each next item's weight scaled down by how far
+        the run's expected length after choosing it (see `expected_lengths`)
+        exceeds `budget`, the number of further items the run may yield.
+        The biased distributions are cached, by state and budget, in
+        `self.biased_next` (which is emptied when it reaches
+        `DEFAULT_CACHE_SIZE` entries).
+        """
+        budget = max(budget, 0)
+        biased = self.biased_next.get((state, budget))
+        if biased is None:
+            expected = self.expected_lengths()
+            choices, cumdist = [], []
+            total = 0
+            for word, weight in self.next_weights(state).items():
+                if word != END:
+                    cost = 1 + expected.get(tuple(state[1:]) + (word,), 0)
+                    if cost > budget:
+                        weight *= budget / cost
+                total += weight
+                choices.append(word)
+                cumdist.append(total)
+            if len(self.biased_next) >= DEFAULT_CACHE_SIZE:
+                self.biased_next.clear()
+            biased = self.biased_next[(state, budget)] = (choices, cumdist)
+        choices, cumdist = biased
+        if cumdist[-1] == 0:
+            return self.move(state, rng)
+        return choices[bisect.bisect(cumdist, (rng or random).random() * cumdist[-1])]
+
+    def cache_counts(self):
+        """
+        Return the hits and misses of `self.cache`, if any (or zeros).
+        """
+        if self.cache is None:
+            return 0, 0
+        return self.cache.hits, self.cache.misses
+
+    def gen(self, init_state=None, max_steps=None, bias_end=False, rng=None):
         """
         Starting either with a naive BEGIN state, or the provided `init_state`
         (as a tuple), return a generator that will yield successive items
         until the chain reaches the END state.
+
+        If `max_steps` is given, the generator stops after yielding
+        `max_steps + 1` items, i.e., as soon as the run is known to be too
+        long. If `bias_end` is also True, then whenever the run from the
+        current state is expected to be longer than the remaining steps
+        allow, the next item is chosen by `move_toward_end`, making runs
+        that fit more likely (at the expense of following the model's
+        probabilities exactly).
+
+        If `self.stats` is set (see `markovify.Text.enable_stats`), each run
+        is recorded there when it ends (or is abandoned).
         """
         state = init_state or (BEGIN,) * self.state_size
-        while True:
-            next_word = self.move(state)
-            if next_word == END:
-                break
-            yield next_word
-            state = tuple(state[1:]) + (next_word,)
+        expected = None
+        if bias_end and max_steps is not None:
+            expected = self.expected_lengths()
+        steps = 0
+        if self.stats is not None:
+            hits, misses = self.cache_counts()
+        try:
+            while True:
+                if expected is not None and expected.get(state, 0) > max_steps - steps:
+                    next_word = self.move_toward_end(state, max_steps - steps, rng)
+                else:
+                    next_word = self.move(state, rng)
+                if next_word == END:
+                    break
+                yield next_word
+                steps += 1
+                if max_steps is not None and steps > max_steps:
+                    break
+                state = tuple(state[1:]) + (next_word,)
+        finally:
+            if self.stats is not None:
+                total_hits, total_misses = self.cache_counts()
+                self.stats.record_walk(steps, total_hits - hits, total_misses - misses)
 
-    def walk(self, init_state=None):
+    def walk(self, init_state=None, max_steps=None, bias_end=False, rng=None):
         """
         Return a list representing a single run of the Markov model, either
         starting with a naive BEGIN state, or the provided `init_state`
-        (as a tuple).
+        (as a tuple). If `max_steps` is given, runs are abandoned as soon as
+        they exceed it, and None is returned instead. See `gen`.
+        """
+        run = list(self.gen(init_state, max_steps, bias_end, rng))
+        if max_steps is not None and len(run) > max_steps:
+            return None
+        return run
+
+    def walk_many(self, n, init_state=None, max_steps=None, bias_end=False, rng=None):
         """
-        return list(self.gen(init_state))
+        Return a list of `n` independent runs of the Markov model, as `walk`
+        would. The runs advance in lockstep: at each step, the runs that are
+        currently in the same state are advanced together via `move_many`,
+        which makes generating many runs at once considerably cheaper than
+        calling `walk` repeatedly. Runs that exceed `max_steps` (if given)
+        are abandoned, and returned as None. With `bias_end`, runs whose
+        expected length exceeds the steps remaining move toward the end, as
+        in `gen` (each by its own call to `move_toward_end`).
+
+        (Compiled models already look up each state in constant time, so for
+        them, the runs are simply generated one after another.)
+        """
+        if self.compiled:
+            return [self.walk(init_state, max_steps, bias_end, rng) for _ in range(n)]
+        expected = None
+        if bias_end and max_steps is not None:
+            expected = self.expected_lengths()
+        if self.stats is not None:
+            hits, misses = self.cache_counts()
+        runs = [[] for _ in range(n)]
+        active = [(i, init_state or (BEGIN,) * self.state_size) for i in range(n)]
+        steps = 0
+        while active:
+            if max_steps is not None and steps > max_steps:
+                for i, _ in active:
+                    runs[i] = None
+                break
+            steps += 1
+            groups = {}
+            for i, state in active:
+                groups.setdefault(state, []).append(i)
+            active = []
+            for state, indices in groups.items():
+                budget = None if max_steps is None else max_steps - steps + 1
+                if expected is not None and expected.get(state, 0) > budget:
+                    selections = [
+                        self.move_toward_end(state, budget, rng) for _ in indices
+                    ]
+                elif len(indices) == 1:
+                    selections = [self.move(state, rng)]
+                else:
+                    selections = self.move_many(state, len(indices), rng)
+                for i, next_word in zip(indices, selections):
+                    if next_word != END:
+                        runs[i].append(next_word)
+                        active.append((i, tuple(state[1:]) + (next_word,)))
+        if self.stats is not None:
+            # Attribute the batch's cache lookups to its first run
+            total_hits, total_misses = self.cache_counts()
+            for run in runs:
+                steps = max(max_steps + 1, 0) if run is None else len(run)
+                self.stats.record_walk(steps, total_hits - hits, total_misses - misses)
+                hits, misses = total_hits, total_misses
+        return runs
 
     def to_json(self):
         """
@@ -147,6 +843,28 @@ class Chain:
         """
         return json.dumps(list(self.model.items()))
 
+    def write_json(self, target, compression=None):
+        """
+        Write the model to `target` (a path, or a file opened in text mode)
+        as JSON, in the layout of `self.to_json`, but incrementally, without
+        building the JSON string in memory. Paths ending in `.gz`, `.bz2`,
+        or `.xz` are compressed accordingly, unless `compression` (`"gzip"`,
+        `"bz2"`, or `"lzma"`) says otherwise. See `markovify.jsonstream`.
+        """
+        with jsonstream.opened(target, "w", compression) as f:
+            jsonstream.write_chain(f, self.model)
+
+    @classmethod
+    def read_json(cls, source, compression=None):
+        """
+        Read a model from `source` (a path, or a file opened in text mode),
+        written by `self.write_json` or `self.to_json`, parsing it
+        incrementally, rather than all at once.
+        """
+        with jsonstream.opened(source, "r", compression) as f:
+            reader = jsonstream.Reader(jsonstream.read_chunks(f))
+            return cls.from_json(jsonstream.read_chain(reader))
+
     @classmethod
     def from_json(cls, json_thing):
         """
@@ -163,7 +881,27 @@ class Chain:
         else:
             raise ValueError("Object should be dict or list")
 
-        state_size = len(list(rehydrated.keys())[0])
+        state_size = len(next(iter(rehydrated)))
 
         inst = cls(None, state_size, rehydrated)
         return inst
+
+    def save(self, path):
+        """
+        Save the model to `path` in markovify's binary format (compacting a
+        copy of it first, if necessary). See `markovify.compact.write_model`.
+        """
+        model = self.model if self.compacted else self.compact().model
+        if model.prefix_offsets is None:
+            model.build_prefix_index(BEGIN)
+        write_model(path, model)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a model saved by `self.save`. By default, the file is
+        memory-mapped, so the returned (compacted) markovify.Chain can
+        generate immediately, and forked processes share its memory.
+        """
+        model, _, _ = read_model(path, use_mmap=mmap)
+        return cls(None, model.state_size, model)
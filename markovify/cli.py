@@ -0,0 +1,313 @@
+"""
+The `python -m markovify` command line, for building models from text files
+and generating sentences from them in bulk:
+
+    python -m markovify build corpus.txt -o model.markovify --format snapshot
+    python -m markovify generate model.markovify -n 100000 --workers 4 --jsonl
+
+Run `python -m markovify <command> --help` for each command's options.
+"""
+
+import argparse
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+
+from . import parallel
+from .text import DEFAULT_CHUNK_SIZE, NewlineText, Text
+
+TEXT_CLASSES = {"text": Text, "newline": NewlineText}
+JSON_SUFFIXES = (".json", ".json.gz", ".json.bz2", ".json.xz", ".json.lzma")
+DEFAULT_BATCH_SIZE = 1000
+
+# The model loaded by `init_worker`, in each process that generates sentences
+worker_text = None
+
+
+def text_class(name):
+    """
+    Parses `--class`: "text", "newline", or the "module:Class" of a subclass
+    of `markovify.Text`.
+    """
+    if name.lower() in TEXT_CLASSES:
+        return TEXT_CLASSES[name.lower()]
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise argparse.ArgumentTypeError(
+            "expected text, newline, or module:Class, not {!r}".format(name)
+        )
+    try:
+        cls = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if not (isinstance(cls, type) and issubclass(cls, Text)):
+        raise argparse.ArgumentTypeError(
+            "{} is not a subclass of markovify.Text".format(name)
+        )
+    return cls
+
+
+def is_json(path):
+    return path.lower().endswith(JSON_SUFFIXES)
+
+
+def load_model(cls, path):
+    """
+    Loads the model at `path`, saved as JSON (by `write_json`, judging by
+    its extension) or else in markovify's binary format (by `save`).
+    """
+    if is_json(path):
+        return cls.read_json(path)
+    return cls.load(path)
+
+
+def init_worker(cls, path):
+    global worker_text
+    worker_text = load_model(cls, path)
+
+
+def generate_batch(indices, seed, kwargs):
+    """
+    Makes a sentence for each of `indices` (a range) with the worker's model,
+    returning the sentences and the attempts' stats. With a `seed`, each
+    sentence depends only on the seed and its index (see
+    `markovify.Text.seeded_sentences`).
+    """
+    if seed is None:
+        return worker_text.make_sentences(len(indices), return_stats=True, **kwargs)
+    return worker_text.seeded_sentences(indices, None, seed, **dict(kwargs))
+
+
+def report(args, message):
+    if not args.quiet:
+        print(message, file=sys.stderr)
+
+
+def build(args):
+    stats = {}
+    options = dict(
+        state_size=args.state_size,
+        retain_original=not args.no_retain,
+        compact_corpus=args.compact_corpus,
+        well_formed=not args.no_well_formed,
+        reject_reg=args.reject_reg,
+        workers=args.workers,
+        input_stats=stats,
+    )
+    start = time.perf_counter()
+    if args.inputs == ["-"]:
+        chunks = iter(functools.partial(sys.stdin.read, args.chunk_size), "")
+        model = args.text_class.from_iter(chunks, **options)
+    else:
+        model = args.text_class.from_files(
+            args.inputs, chunk_size=args.chunk_size, encoding=args.encoding, **options
+        )
+    built = time.perf_counter() - start
+
+    output_format = args.format or ("json" if is_json(args.output) else "binary")
+    if output_format == "json":
+        model.write_json(args.output)
+    else:
+        model.save(args.output, snapshot=output_format == "snapshot")
+    elapsed = time.perf_counter() - start
+
+    message = "Built a model from {:,} sentences ({:,} accepted) in {:.2f}s".format(
+        stats.get("sentences", 0), stats.get("accepted", 0), built
+    )
+    if args.inputs != ["-"]:
+        size = sum(os.path.getsize(path) for path in args.inputs)
+        message += " ({:.1f} MB/s)".format(size / 1e6 / built if built else 0)
+    message += "; saved it to {} ({}, {:.1f} MB) in {:.2f}s".format(
+        args.output,
+        output_format,
+        os.path.getsize(args.output) / 1e6,
+        elapsed - built,
+    )
+    report(args, message)
+
+
+def generate(args):
+    kwargs = {
+        name: getattr(args, name)
+        for name in (
+            "tries",
+            "max_words",
+            "min_words",
+            "max_chars",
+            "min_chars",
+            "max_overlap_ratio",
+            "max_overlap_total",
+        )
+        if getattr(args, name) is not None
+    }
+    if args.no_test_output:
+        kwargs["test_output"] = False
+    if args.bias_end:
+        kwargs["bias_end"] = True
+
+    seed = args.seed
+    start = time.perf_counter()
+    batches = (
+        range(i, min(i + args.batch_size, args.n))
+        for i in range(0, args.n, args.batch_size)
+    )
+    if args.workers > 1:
+        results = parallel.imap(
+            generate_batch,
+            batches,
+            args.workers,
+            seed,
+            kwargs,
+            initializer=init_worker,
+            initargs=(args.text_class, args.model),
+        )
+    else:
+        init_worker(args.text_class, args.model)
+        results = (generate_batch(batch, seed, kwargs) for batch in batches)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    made = attempts = index = 0
+    try:
+        for sentences, stats in results:
+            attempts += stats["attempts"]
+            for sentence in sentences:
+                if args.format == "jsonl":
+                    out.write(json.dumps({"index": index, "sentence": sentence}))
+                    out.write("\n")
+                elif sentence is not None:
+                    out.write(sentence + "\n")
+                made += sentence is not None
+                index += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    report(
+        args,
+        "Generated {:,} of {:,} sentences ({:,} attempts) in {:.2f}s "
+        "({:,.0f} sentences/s, {} worker{})".format(
+            made,
+            args.n,
+            attempts,
+            elapsed,
+            made / elapsed if elapsed else 0,
+            args.workers,
+            "" if args.workers == 1 else "s",
+        ),
+    )
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m markovify",
+        description="Build markovify models, and generate sentences from them.",
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--class",
+        dest="text_class",
+        type=text_class,
+        default=Text,
+        help="text (the default), newline (for markovify.NewlineText), or the "
+        "module:Class of a subclass of markovify.Text",
+    )
+    common.add_argument(
+        "--workers", type=int, default=1, help="The number of processes to use"
+    )
+    common.add_argument(
+        "--quiet", action="store_true", help="Don't report timings to stderr"
+    )
+
+    build_parser = commands.add_parser(
+        "build",
+        parents=[common],
+        help="Build a model from text files",
+        description="Build a model from text files (or stdin, as -), reading "
+        "them in chunks, and save it.",
+    )
+    build_parser.add_argument("inputs", nargs="+", metavar="input")
+    build_parser.add_argument("-o", "--output", required=True)
+    build_parser.add_argument(
+        "--format",
+        choices=("binary", "snapshot", "json"),
+        help="How to save the model: binary (see Text.save; the default), "
+        "snapshot (Text.save with snapshot=True), or json (Text.write_json; "
+        "the default for outputs named *.json, or *.json.gz, etc.)",
+    )
+    build_parser.add_argument("--state-size", type=int, default=2)
+    build_parser.add_argument(
+        "--no-retain",
+        action="store_true",
+        help="Don't retain the original text (so generated sentences can't be "
+        "checked for overlap with it)",
+    )
+    build_parser.add_argument(
+        "--compact-corpus",
+        action="store_true",
+        help="Retain the original text as a markovify.corpus.CompactCorpus",
+    )
+    build_parser.add_argument("--no-well-formed", action="store_true")
+    build_parser.add_argument("--reject-reg", default="")
+    build_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    build_parser.add_argument("--encoding", default="utf-8")
+    build_parser.set_defaults(func=build)
+
+    generate_parser = commands.add_parser(
+        "generate",
+        parents=[common],
+        help="Generate sentences from a saved model",
+        description="Generate sentences from a model saved by build (or by "
+        "Text.save or Text.write_json), one per line, or as JSON lines.",
+    )
+    generate_parser.add_argument("model")
+    generate_parser.add_argument(
+        "-n", type=int, default=10, help="The number of sentences to generate"
+    )
+    generate_parser.add_argument("-o", "--output", default="-")
+    generate_parser.add_argument(
+        "--format",
+        choices=("text", "jsonl"),
+        default="text",
+        help="text: one sentence per line, skipping failures (the default); "
+        'jsonl: {"index": ..., "sentence": ...} per line, with null sentences '
+        "for failures",
+    )
+    generate_parser.add_argument(
+        "--jsonl", dest="format", action="store_const", const="jsonl"
+    )
+    generate_parser.add_argument(
+        "--seed",
+        help="Make the output reproducible, regardless of the number of workers",
+    )
+    generate_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="The number of sentences per batch sent to a worker",
+    )
+    for name in ("tries", "max_words", "min_words", "max_chars", "min_chars"):
+        generate_parser.add_argument("--" + name.replace("_", "-"), type=int)
+    generate_parser.add_argument("--max-overlap-ratio", type=float)
+    generate_parser.add_argument("--max-overlap-total", type=int)
+    generate_parser.add_argument("--no-test-output", action="store_true")
+    generate_parser.add_argument("--bias-end", action="store_true")
+    generate_parser.set_defaults(func=generate)
+    return parser
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.command == "build" and "-" in args.inputs and len(args.inputs) > 1:
+        parser.error("- (stdin) can't be combined with other inputs")
+    args.func(args)
+    return 0
@@ -0,0 +1,467 @@
+import array
+import bisect
+import heapq
+import itertools
+import json
+import mmap
+import operator
+import struct
+import sys
+from collections.abc import ItemsView, Mapping, Sequence
+
+MAGIC = b"MKVF"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+
+def integer_typecode(largest):
+    """
+    Return the typecode of the smallest unsigned integer array that can
+    hold `largest`.
+    """
+    for code in "BHIQ":
+        if largest < 1 << (8 * array.array(code).itemsize):
+            return code
+
+
+class Records(Sequence):
+    """
+    A read-only sequence of the fixed-width records packed into a bytes-like
+    buffer (`bytes` or `mmap.mmap`, both of which slice to `bytes`). Lets
+    `bisect` search packed state keys without unpacking them.
+    """
+
+    def __init__(self, buf, width, start=0, nbytes=None):
+        self.buf = buf
+        self.width = width
+        self.start = start
+        self.nbytes = len(buf) - start if nbytes is None else nbytes
+
+    def __len__(self):
+        return self.nbytes // self.width
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        offset = self.start + i * self.width
+        return self.buf[offset : offset + self.width]
+
+
+class Vocabulary(Sequence):
+    """
+    A read-only, sorted sequence of words stored as one UTF-8 blob plus an
+    array of offsets into it. Since UTF-8 preserves code point order, the
+    words can be searched with `bisect` just like a sorted list of strings.
+    """
+
+    def __init__(self, buf, start, nbytes, offsets):
+        self.buf = buf
+        self.start = start
+        self.nbytes = nbytes
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        lo = self.start + self.offsets[i]
+        hi = self.start + self.offsets[i + 1]
+        return self.buf[lo:hi].decode("utf-8")
+
+
+class CompactItemsView(ItemsView):
+    def __iter__(self):
+        model = self._mapping
+        for i in range(len(model)):
+            yield model.state_at(i), model.next_dict_at(i)
+
+
+class CompactModel(Mapping):
+    """
+    An array-backed, read-only alternative to the dict-of-dicts model built by
+    `markovify.Chain.build`. Every word is interned to an integer id (its
+    position in the sorted vocabulary), and the model is stored CSR-style:
+
+    - `keys`: the packed (big-endian uint32) word ids of every state, sorted.
+    - `offsets`: for state `i`, its transitions live at `offsets[i]` up to
+      (but not including) `offsets[i + 1]`.
+    - `successors`: the word id of each transition.
+    - `cumweights`: the cumulative weight of each transition, restarting at
+      each state, so that a draw is a single `bisect` within the state's span.
+
+    Because it is a `Mapping` of state tuples to `{word: count}` dicts, code
+    that only reads the model (serialization, `markovify.combine`, etc.) works
+    on it unchanged.
+    """
+
+    def __init__(self, state_size, vocab, keys, offsets, successors, cumweights):
+        self.state_size = state_size
+        self.vocab = vocab
+        self.offsets = offsets
+        self.successors = successors
+        self.cumweights = cumweights
+        self.key_struct = struct.Struct(">{}I".format(state_size))
+        if not isinstance(keys, Records):
+            keys = Records(keys, self.key_struct.size)
+        self.records = keys
+        self.prefix_offsets = None
+        self.prefix_states = None
+
+    @classmethod
+    def from_dict(cls, model):
+        """
+        Build a `CompactModel` from an (uncompiled) dict-of-dicts model.
+        """
+        state_size = len(next(iter(model)))
+        words = set()
+        for state, next_dict in model.items():
+            words.update(state)
+            words.update(next_dict)
+        vocab = sorted(words)
+        ids = {word: i for i, word in enumerate(vocab)}
+
+        def state_ids(state):
+            return tuple(ids[word] for word in state)
+
+        key_struct = struct.Struct(">{}I".format(state_size))
+        states = sorted(model, key=state_ids)
+        keys = b"".join(key_struct.pack(*state_ids(state)) for state in states)
+
+        offsets = array.array("Q", [0])
+        successors = array.array("I")
+        cumweights = array.array("d")
+        integral = True
+        for state in states:
+            total = 0
+            for word, weight in model[state].items():
+                integral = integral and isinstance(weight, int)
+                total += weight
+                successors.append(ids[word])
+                cumweights.append(total)
+            offsets.append(len(successors))
+
+        if integral:
+            cumweights = array.array(
+                integer_typecode(max(cumweights, default=0)), map(int, cumweights)
+            )
+
+        return cls(state_size, vocab, keys, offsets, successors, cumweights)
+
+    def word_id(self, word):
+        """
+        Return the integer id of `word`, or raise KeyError if it is unknown.
+        """
+        i = bisect.bisect_left(self.vocab, word)
+        if i < len(self.vocab) and self.vocab[i] == word:
+            return i
+        raise KeyError(word)
+
+    def index(self, state):
+        """
+        Return the position of `state` in the model, or raise KeyError.
+        """
+        try:
+            key = self.key_struct.pack(*map(self.word_id, state))
+        except (KeyError, struct.error):
+            raise KeyError(state)
+        i = bisect.bisect_left(self.records, key)
+        if i < len(self.records) and self.records[i] == key:
+            return i
+        raise KeyError(state)
+
+    def span(self, state):
+        """
+        Return the `(start, stop)` range of `state`'s transitions.
+        """
+        i = self.index(state)
+        return self.offsets[i], self.offsets[i + 1]
+
+    def build_prefix_index(self, skip):
+        """
+        Index the states by their first word other than `skip` (i.e., BEGIN),
+        CSR-style: the positions of the states whose first such word has id
+        `w` are `prefix_states[prefix_offsets[w] : prefix_offsets[w + 1]]`,
+        in order. (States made up entirely of `skip` are not indexed.)
+        """
+        try:
+            skip_id = self.word_id(skip)
+        except KeyError:
+            skip_id = None
+        pairs = []
+        for i, key in enumerate(self.records):
+            for word_id in self.key_struct.unpack(key):
+                if word_id != skip_id:
+                    pairs.append((word_id, i))
+                    break
+        pairs.sort()
+
+        offsets = array.array("Q", [0] * (len(self.vocab) + 1))
+        for word_id, _ in pairs:
+            offsets[word_id + 1] += 1
+        for word_id in range(len(self.vocab)):
+            offsets[word_id + 1] += offsets[word_id]
+        # `prefix_offsets` is set last, as other threads check it first
+        self.prefix_states = array.array("I", (i for _, i in pairs))
+        self.prefix_offsets = offsets
+
+    def states_starting_with(self, word):
+        """
+        Return the states indexed (see `build_prefix_index`) under `word`.
+        """
+        try:
+            word_id = self.word_id(word)
+        except KeyError:
+            return []
+        start = self.prefix_offsets[word_id]
+        stop = self.prefix_offsets[word_id + 1]
+        return [self.state_at(i) for i in self.prefix_states[start:stop]]
+
+    def state_at(self, i):
+        return tuple(
+            self.vocab[word_id] for word_id in self.key_struct.unpack(self.records[i])
+        )
+
+    def nbytes(self):
+        """
+        Approximate memory used by the model's buffers (excluding the
+        vocabulary's strings).
+        """
+        return self.records.nbytes + sum(
+            len(buf) * buf.itemsize
+            for buf in (self.offsets, self.successors, self.cumweights)
+        )
+
+    def next_dict_at(self, i):
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        next_dict = {}
+        prev = 0
+        for j in range(start, stop):
+            cum = self.cumweights[j]
+            next_dict[self.vocab[self.successors[j]]] = cum - prev
+            prev = cum
+        return next_dict
+
+    def items(self):
+        return CompactItemsView(self)
+
+    def __getitem__(self, state):
+        return self.next_dict_at(self.index(state))
+
+    def __contains__(self, state):
+        try:
+            self.index(state)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return (self.state_at(i) for i in range(len(self)))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def typecode(buf):
+    return buf.typecode if isinstance(buf, array.array) else buf.format
+
+
+def merge_compact_models(models, weights):
+    """
+    Merge `CompactModel`s (e.g., memory-mapped by `read_model`) into a new
+    one, adding each transition's count multiplied by its model's weight, as
+    `markovify.combine` does for dict models. Since each model's states are
+    sorted, and remapping word ids to the merged vocabulary preserves their
+    order, the models are streamed through a k-way merge: only the merged
+    arrays (and vocabulary) are held in memory, never a dict-of-dicts.
+    """
+    state_size = models[0].state_size
+    key_struct = struct.Struct(">{}I".format(state_size))
+    vocab = []
+    for word in heapq.merge(*(model.vocab for model in models)):
+        if not vocab or vocab[-1] != word:
+            vocab.append(word)
+    ids = {word: i for i, word in enumerate(vocab)}
+    remaps = [array.array("I", map(ids.__getitem__, model.vocab)) for model in models]
+    del ids
+
+    def remapped_states(k):
+        remap = remaps[k]
+        for i, key in enumerate(models[k].records):
+            word_ids = key_struct.unpack(key)
+            yield key_struct.pack(*(remap[word_id] for word_id in word_ids)), k, i
+
+    keys = bytearray()
+    offsets = array.array("Q", [0])
+    successors = array.array("I")
+    cumweights = array.array("d")
+    integral = all(isinstance(weight, int) for weight in weights) and all(
+        typecode(model.cumweights) != "d" for model in models
+    )
+    merged = heapq.merge(*map(remapped_states, range(len(models))))
+    for key, group in itertools.groupby(merged, key=operator.itemgetter(0)):
+        counts = {}
+        for _, k, i in group:
+            model, remap, weight = models[k], remaps[k], weights[k]
+            prev = 0
+            for j in range(model.offsets[i], model.offsets[i + 1]):
+                cum = model.cumweights[j]
+                word_id = remap[model.successors[j]]
+                counts[word_id] = counts.get(word_id, 0) + (cum - prev) * weight
+                prev = cum
+        keys += key
+        total = 0
+        for word_id, count in counts.items():
+            total += count
+            successors.append(word_id)
+            cumweights.append(total)
+        offsets.append(len(successors))
+
+    if integral:
+        cumweights = array.array(
+            integer_typecode(max(cumweights, default=0)), map(int, cumweights)
+        )
+    return CompactModel(state_size, vocab, bytes(keys), offsets, successors, cumweights)
+
+
+def write_model(path, model, meta=None, extra=b"", sections=None):
+    """
+    Write a `CompactModel` to `path` in markovify's binary format, which
+    `read_model` can memory-map. The file consists of:
+
+    - The `MAGIC` bytes, then a little-endian uint32 giving the length of
+    - a JSON header recording the format version, byte order, state size,
+      the offset/size/typecode of each section, and the caller's `meta`.
+    - The sections themselves (vocabulary offsets and UTF-8 blob, packed
+      state keys, transition offsets, successors, cumulative weights, the
+      prefix index if it has been built, an optional `extra` blob, and any
+      additional named arrays or blobs in the dict `sections`), each aligned
+      to 8 bytes.
+    """
+    named = dict(sections or {})
+    vocab = model.vocab
+    if isinstance(vocab, Vocabulary):
+        blob = bytes(vocab.buf[vocab.start : vocab.start + vocab.nbytes])
+        vocab_offsets = array.array("Q", vocab.offsets)
+    else:
+        encoded = [word.encode("utf-8") for word in vocab]
+        blob = b"".join(encoded)
+        vocab_offsets = array.array("Q", [0])
+        for word in encoded:
+            vocab_offsets.append(vocab_offsets[-1] + len(word))
+
+    keys = model.records
+    sections = [
+        ("vocab_offsets", vocab_offsets),
+        ("vocab", blob),
+        ("keys", keys.buf[keys.start : keys.start + keys.nbytes]),
+        ("offsets", model.offsets),
+        ("successors", model.successors),
+        ("cumweights", model.cumweights),
+        ("extra", extra),
+    ]
+    if model.prefix_offsets is not None:
+        sections.append(("prefix_offsets", model.prefix_offsets))
+        sections.append(("prefix_states", model.prefix_states))
+    if set(named) & set(name for name, _ in sections):
+        raise ValueError("`sections` can't replace the model's own sections")
+    sections.extend(named.items())
+
+    table = {}
+    position = 0
+    for name, buf in sections:
+        if isinstance(buf, (array.array, memoryview)):
+            code = typecode(buf)
+        else:
+            code = None
+        nbytes = len(buf) * getattr(buf, "itemsize", 1)
+        table[name] = [position, nbytes, code]
+        position += nbytes + (-nbytes % ALIGNMENT)
+
+    header = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "state_size": model.state_size,
+            "sections": table,
+            "named": list(named),
+            "meta": meta or {},
+        }
+    ).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % ALIGNMENT)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for name, buf in sections:
+            data = buf.tobytes() if isinstance(buf, array.array) else bytes(buf)
+            f.write(data + b"\0" * (-len(data) % ALIGNMENT))
+
+
+def read_model(path, use_mmap=True, sections=False):
+    """
+    Read a file written by `write_model`, returning `(model, meta, extra)`,
+    or, if `sections` is True, `(model, meta, extra, sections)`, where
+    `sections` is the dict of additional sections passed to `write_model`.
+
+    With `use_mmap=True` (the default), the file is memory-mapped read-only
+    and the model's arrays are zero-copy views onto it, so loading takes
+    constant time, and processes that load the same file share its pages.
+    """
+    with open(path, "rb") as f:
+        if use_mmap:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+
+    if buf[: len(MAGIC)] != MAGIC:
+        raise ValueError("{} is not a markovify binary model".format(path))
+    (header_size,) = struct.unpack("<I", buf[len(MAGIC) : len(MAGIC) + 4])
+    base = len(MAGIC) + 4 + header_size
+    header = json.loads(buf[len(MAGIC) + 4 : base].decode("utf-8"))
+    if header["version"] > FORMAT_VERSION:
+        raise ValueError(
+            "{} uses binary format version {}, but this version of markovify "
+            "only supports up to version {}".format(
+                path, header["version"], FORMAT_VERSION
+            )
+        )
+    table = header["sections"]
+
+    def section(name):
+        offset, nbytes, typecode = table[name]
+        start = base + offset
+        if typecode is None:
+            return start, nbytes
+        if header["byteorder"] == sys.byteorder:
+            return memoryview(buf)[start : start + nbytes].cast(typecode)
+        swapped = array.array(typecode, buf[start : start + nbytes])
+        swapped.byteswap()
+        return swapped
+
+    state_size = header["state_size"]
+    vocab = Vocabulary(buf, *section("vocab"), section("vocab_offsets"))
+    keys = Records(buf, 4 * state_size, *section("keys"))
+    model = CompactModel(
+        state_size,
+        vocab,
+        keys,
+        section("offsets"),
+        section("successors"),
+        section("cumweights"),
+    )
+    if "prefix_offsets" in table:
+        model.prefix_offsets = section("prefix_offsets")
+        model.prefix_states = section("prefix_states")
+    start, nbytes = section("extra")
+    extra = buf[start : start + nbytes]
+    if not sections:
+        return model, header["meta"], extra
+
+    named = {}
+    for name in header.get("named", []):
+        named[name] = section(name)
+        if table[name][2] is None:
+            start, nbytes = named[name]
+            named[name] = buf[start : start + nbytes]
+    return model, header["meta"], extra, named
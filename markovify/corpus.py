@@ -0,0 +1,171 @@
+import array
+from collections.abc import Sequence
+
+from .compact import Vocabulary, integer_typecode, typecode
+
+
+class CompactCorpus(Sequence):
+    """
+    A compact, append-only stand-in for a list of runs (lists of words),
+    such as `markovify.Text.parsed_sentences`. Each word is interned to an
+    integer id, and the runs are stored as one array of ids (of the smallest
+    integer type that fits the vocabulary) plus an array of offsets into it,
+    which takes a fraction of the memory of a list of lists of strings.
+
+    Indexing or iterating over it rebuilds each run as a list of words, as
+    needed, so it can be used anywhere the list could, e.g. by
+    `markovify.overlap.OverlapIndex` and `markovify.Chain`.
+
+    A corpus read back by `from_sections` (e.g., from a snapshot saved by
+    `markovify.Text.save`) is read-only; `copy` it to extend it.
+    """
+
+    def __init__(self, runs=()):
+        self.vocab = []
+        self.word_ids = {}
+        self.ids = array.array("B")
+        self.offsets = array.array("Q", [0])
+        self.extend(runs)
+
+    @property
+    def word_ids(self):
+        """
+        The id of each word in the vocabulary. (Built when first needed, for
+        a corpus read by `from_sections`.)
+        """
+        if self._word_ids is None:
+            self._word_ids = {word: i for i, word in enumerate(self.vocab)}
+        return self._word_ids
+
+    @word_ids.setter
+    def word_ids(self, value):
+        self._word_ids = value
+
+    def word_id(self, word):
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = self.word_ids[word] = len(self.vocab)
+            self.vocab.append(word)
+            code = integer_typecode(word_id)
+            if code != self.ids.typecode:
+                self.ids = array.array(code, self.ids)
+        return word_id
+
+    def append(self, run):
+        if not isinstance(self.vocab, list):
+            raise TypeError("This corpus is read-only; extend a copy() of it")
+        # Interning may replace `self.ids` with a wider array, so intern first
+        ids = [self.word_id(word) for word in run]
+        self.ids.extend(ids)
+        self.offsets.append(len(self.ids))
+
+    def extend(self, runs):
+        for run in runs:
+            self.append(run)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        # Normalizes negative indices, and raises IndexError if out of range
+        i = range(len(self))[i]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        vocab = self.vocab
+        return [vocab[word_id] for word_id in self.ids[start:end]]
+
+    def __iter__(self):
+        vocab, ids = self.vocab, self.ids
+        start = 0
+        for end in self.offsets[1:]:
+            yield [vocab[word_id] for word_id in ids[start:end]]
+            start = end
+
+    def copy(self):
+        """
+        Returns a copy of the corpus, which can be extended independently.
+        """
+        corpus = type(self)()
+        corpus.vocab = list(self.vocab)
+        corpus.word_ids = dict(self.word_ids)
+        corpus.ids = array.array(typecode(self.ids), self.ids)
+        corpus.offsets = array.array("Q", self.offsets)
+        return corpus
+
+    def lengths(self):
+        """
+        Yields the number of words in each run.
+        """
+        start = 0
+        for end in self.offsets[1:]:
+            yield end - start
+            start = end
+
+    def nbytes(self):
+        """
+        The approximate number of bytes taken by the ids, offsets, and
+        vocabulary's words (not counting the containers' overhead).
+        """
+        arrays = sum(a.itemsize * len(a) for a in (self.ids, self.offsets))
+        return arrays + sum(len(word.encode("utf-8")) for word in self.vocab)
+
+    def to_dict(self):
+        """
+        Returns the corpus as a dict of its vocabulary, the number of words
+        in each run, and the ids of every run's words, concatenated.
+        """
+        return {
+            "vocab": list(self.vocab),
+            "lengths": list(self.lengths()),
+            "ids": self.ids.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, obj):
+        corpus = cls()
+        corpus.vocab = list(obj["vocab"])
+        corpus.word_ids = {word: i for i, word in enumerate(corpus.vocab)}
+        code = integer_typecode(max(len(corpus.vocab) - 1, 0))
+        corpus.ids = array.array(code, obj["ids"])
+        for length in obj["lengths"]:
+            corpus.offsets.append(corpus.offsets[-1] + length)
+        if corpus.offsets[-1] != len(corpus.ids):
+            raise ValueError("Corpus `lengths` don't match its `ids`")
+        return corpus
+
+    def sections(self):
+        """
+        Returns the corpus as a dict of named arrays and blobs (its
+        vocabulary, as one UTF-8 blob and the offsets of each word in it, its
+        ids, and its offsets), as `markovify.compact.write_model` saves
+        additional sections, which `from_sections` reads back.
+        """
+        encoded = [word.encode("utf-8") for word in self.vocab]
+        vocab_offsets = array.array("Q", [0])
+        for word in encoded:
+            vocab_offsets.append(vocab_offsets[-1] + len(word))
+        return {
+            "corpus_vocab": b"".join(encoded),
+            "corpus_vocab_offsets": vocab_offsets,
+            "corpus_ids": self.ids,
+            "corpus_offsets": self.offsets,
+        }
+
+    @classmethod
+    def from_sections(cls, sections):
+        """
+        Returns a read-only corpus of the `sections` returned by
+        `sections()`, as read back by `markovify.compact.read_model`, without
+        parsing them. The vocabulary and offsets are used in place (e.g.,
+        memory-mapped), and the ids are copied into an array in one go.
+        """
+        corpus = cls()
+        blob = sections["corpus_vocab"]
+        corpus.vocab = Vocabulary(blob, 0, len(blob), sections["corpus_vocab_offsets"])
+        corpus.word_ids = None
+        ids = sections["corpus_ids"]
+        corpus.ids = array.array(typecode(ids))
+        corpus.ids.frombytes(memoryview(ids).cast("B"))
+        corpus.offsets = sections["corpus_offsets"]
+        return corpus
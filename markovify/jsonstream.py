@@ -0,0 +1,294 @@
+"""
+Incremental reading and writing of the JSON layouts produced by
+`markovify.Chain.to_json` and `markovify.Text.to_json`, to and from files,
+so that neither the JSON text nor an intermediate copy of the model is ever
+held in memory whole.
+"""
+
+import bz2
+import functools
+import gzip
+import json
+import lzma
+import os
+import re
+
+from .corpus import CompactCorpus
+
+CHUNK_SIZE = 1 << 16
+
+COMPRESSORS = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "lzma": lzma.open,
+}
+
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+}
+
+decoder = json.JSONDecoder()
+
+whitespace_pat = re.compile(r"\s*")
+
+# The longest run of complete characters and escape sequences in a string
+string_pat = re.compile(r'(?:[^"\\]+|\\u[0-9a-fA-F]{4}|\\[^u])*')
+# A high surrogate escape (not preceded by an escaped backslash) at the end
+high_surrogate_pat = re.compile(r"(?<!\\)(?:\\\\)*\\u[dD][89abAB][0-9a-fA-F]{2}$")
+
+
+def open_file(path, mode, compression=None):
+    """
+    Open `path` as a UTF-8 text file, in `mode` (`"r"` or `"w"`). If
+    `compression` is `"infer"` (or None), it is chosen from the path's
+    extension (see `EXTENSIONS`), else it is one of `COMPRESSORS`.
+    """
+    if compression in (None, "infer"):
+        compression = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if compression is None:
+        return open(path, mode, encoding="utf-8")
+    if compression not in COMPRESSORS:
+        raise ValueError(
+            "`compression` should be one of: " + ", ".join(sorted(COMPRESSORS))
+        )
+    return COMPRESSORS[compression](path, mode + "t", encoding="utf-8")
+
+
+class opened:
+    """
+    A context manager yielding the text file `target`, or, if `target` is a
+    path, the file opened by `open_file` (and closed on exit).
+    """
+
+    def __init__(self, target, mode, compression=None):
+        self.target = target
+        self.mode = mode
+        self.compression = compression
+        self.file = None
+
+    def __enter__(self):
+        if isinstance(self.target, (str, os.PathLike)):
+            self.file = open_file(os.fspath(self.target), self.mode, self.compression)
+            return self.file
+        return self.target
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            self.file.close()
+
+
+def read_chunks(f):
+    return iter(functools.partial(f.read, CHUNK_SIZE), "")
+
+
+class Reader:
+    """
+    Parses a JSON document arriving in chunks of text, one value (or
+    punctuation mark) at a time, holding only the unparsed text in memory.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+
+    def fill(self):
+        """
+        Append the next chunk to the buffer. Returns False at the end of the
+        document.
+        """
+        chunk = next(self.chunks, "")
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skip whitespace, and return the next character (or "" at the end).
+        """
+        while True:
+            self.pos = whitespace_pat.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos : self.pos + 1]
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                "Expected {!r} in JSON, but found {!r}".format(char, found)
+            )
+        self.pos += 1
+
+    def value(self):
+        """
+        Parse the next value. (Since a number may continue in the next chunk,
+        a value is only complete when something follows it, or at the end.)
+        """
+        self.peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end < len(self.buf) or not self.fill():
+                self.pos = end
+                return obj
+
+    def array(self):
+        """
+        Yield the items of the next value, an array, one by one.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("]")
+                return
+
+    def object(self):
+        """
+        Yield the keys of the next value, an object, one by one. After each
+        key, the caller must consume its value.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("}")
+                return
+
+    def string(self):
+        """
+        Yield the decoded contents of the next value, a string, in chunks.
+        """
+        self.expect('"')
+        while True:
+            end = string_pat.match(self.buf, self.pos).end()
+            closed = end < len(self.buf) and self.buf[end] == '"'
+            if not closed:
+                # Don't split a surrogate pair between chunks
+                surrogate = high_surrogate_pat.search(self.buf[self.pos : end])
+                if surrogate:
+                    end = self.pos + surrogate.end() - 6
+            if end > self.pos:
+                yield json.loads('"' + self.buf[self.pos : end] + '"')
+                self.pos = end
+            if closed:
+                self.pos += 1
+                return
+            if not self.fill():
+                raise ValueError("Unterminated string in JSON")
+
+
+def write_array(f, items):
+    """
+    Write `items` to `f` as a JSON array, formatted as `json.dump` would.
+    """
+    f.write("[")
+    for i, item in enumerate(items):
+        if i:
+            f.write(", ")
+        f.write(json.dumps(item))
+    f.write("]")
+
+
+class StringWriter:
+    """
+    Wraps a file, writing whatever is written to it as the contents of a
+    JSON string (i.e., escaped).
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, text):
+        self.f.write(json.dumps(text)[1:-1])
+
+
+def write_chain(f, model):
+    """
+    Write `model` to `f` in the layout of `markovify.Chain.to_json`.
+    """
+    write_array(f, ([state, next_dict] for state, next_dict in model.items()))
+
+
+def read_chain(reader):
+    """
+    Read a model, in the layout of `markovify.Chain.to_json`, as a dict.
+    """
+    return {tuple(state): next_dict for state, next_dict in reader.array()}
+
+
+def write_corpus(f, corpus):
+    """
+    Write a `markovify.corpus.CompactCorpus` to `f` in the layout of its
+    `to_dict`.
+    """
+    f.write('{"vocab": ')
+    write_array(f, corpus.vocab)
+    f.write(', "lengths": ')
+    write_array(f, corpus.lengths())
+    f.write(', "ids": ')
+    write_array(f, corpus.ids)
+    f.write("}")
+
+
+def write_text(f, state_size, model, parsed_sentences=None):
+    """
+    Write a `markovify.Text`'s parts to `f` in the layout of its `to_json`
+    (in which the chain is a JSON string, holding the chain's JSON).
+    """
+    f.write('{"state_size": ' + json.dumps(state_size) + ', "chain": "')
+    write_chain(StringWriter(f), model)
+    f.write('", "parsed_sentences": ')
+    if parsed_sentences is None:
+        f.write("null")
+    elif isinstance(parsed_sentences, CompactCorpus):
+        write_corpus(f, parsed_sentences)
+    else:
+        write_array(f, parsed_sentences)
+    f.write("}")
+
+
+def read_text(reader):
+    """
+    Read the parts of a `markovify.Text` written by `write_text` (or
+    `to_json`), returning `(state_size, model, parsed_sentences)`. (If the
+    sentences were a `CompactCorpus`, they are returned as its `to_dict`.)
+    """
+    state_size = model = parsed_sentences = None
+    for key in reader.object():
+        if key == "chain" and reader.peek() == '"':
+            chunks = reader.string()
+            model = read_chain(Reader(chunks))
+            "".join(chunks)  # Consume the rest of the string
+        elif key == "chain":
+            model = read_chain(reader)
+        elif key == "parsed_sentences" and reader.peek() == "[":
+            parsed_sentences = list(reader.array())
+        else:
+            value = reader.value()
+            if key == "state_size":
+                state_size = value
+            elif key == "parsed_sentences":
+                parsed_sentences = value
+    return state_size, model, parsed_sentences
@@ -0,0 +1,118 @@
+from collections.abc import Mapping
+
+from .chain import DEFAULT_CACHE_SIZE, Chain, CompiledCache
+
+
+class MixtureModel(Mapping):
+    """
+    A read-only view of the weighted union of several chains' models, as an
+    uncompiled model: each state's `{next_item: weight}` dict is the sum of
+    the chains' dicts for that state (see `markovify.Chain.next_weights`),
+    each multiplied by its chain's weight, computed when it is read. Chains
+    with a weight of zero are left out entirely.
+    """
+
+    def __init__(self, chains, weights):
+        self.chains = chains
+        self.weights = weights
+        self.size = None
+
+    def active(self):
+        return [
+            (chain, weight)
+            for chain, weight in zip(self.chains, self.weights)
+            if weight
+        ]
+
+    def __getitem__(self, state):
+        merged = None
+        for chain, weight in self.active():
+            if state in chain.model:
+                if merged is None:
+                    merged = {}
+                for next_word, count in chain.next_weights(state).items():
+                    merged[next_word] = merged.get(next_word, 0) + (count * weight)
+        if merged is None:
+            raise KeyError(state)
+        return merged
+
+    def __contains__(self, state):
+        return any(state in chain.model for chain, _ in self.active())
+
+    def __iter__(self):
+        # Each state is yielded by the first chain that has it
+        active = self.active()
+        for i, (chain, _) in enumerate(active):
+            for state in chain.model:
+                if not any(state in other.model for other, _ in active[:i]):
+                    yield state
+
+    def __len__(self):
+        if self.size is None:
+            self.size = sum(1 for _ in self)
+        return self.size
+
+
+class MixtureChain(Chain):
+    """
+    A `markovify.Chain` that draws each next item from the weighted union of
+    several chains (of the same state size), without building a combined
+    model: sampling from it is equivalent to sampling from
+    `markovify.combine(chains, weights)`, but its memory use is only that of
+    the chains themselves (which can be compiled or compacted), plus a cache.
+
+    Each state's merged table is computed the first time the state is
+    visited, and kept in a `markovify.chain.CompiledCache` of (at most) the
+    `cache_size` most recently used states, as with `compile(lazy=True)`.
+    `set_weights` takes effect immediately, as it only clears the cache.
+
+    A `MixtureChain` can be used wherever a `markovify.Chain` can, e.g.
+    with `markovify.Text.from_chain`, but not updated in place. To
+    materialize it, `compile` or `compact` it.
+    """
+
+    def __init__(self, chains, weights=None, cache_size=DEFAULT_CACHE_SIZE):
+        if weights is None:
+            weights = [1 for _ in range(len(chains))]
+
+        if len(chains) != len(weights):
+            raise ValueError("`chains` and `weights` lengths must be equal.")
+
+        if len(set(chain.state_size for chain in chains)) != 1:
+            raise ValueError("All `chains` must have the same state size.")
+
+        model = MixtureModel(list(chains), list(weights))
+        super().__init__(None, chains[0].state_size, model=model)
+        self.cache = CompiledCache("bisect", cache_size)
+        self.sampler = "bisect"
+
+    @property
+    def chains(self):
+        return self.model.chains
+
+    @property
+    def weights(self):
+        return list(self.model.weights)
+
+    def set_weights(self, weights):
+        """
+        Replace the chains' weights, discarding everything derived from the
+        old ones (cached states, the prefix index, etc.).
+        """
+        if len(weights) != len(self.model.chains):
+            raise ValueError("`chains` and `weights` lengths must be equal.")
+        self.model.weights = list(weights)
+        self.model.size = None
+        self.cache.clear()
+        self.prefix_index = None
+        self.remaining_lengths = None
+        self.biased_next = {}
+        self.precompute_begin_state()
+
+    def check_updatable(self):
+        raise ValueError("Not implemented for markovify.MixtureChain")
+
+    def prune(self, *args, inplace=False, **kwargs):
+        if inplace:
+            raise ValueError("Not implemented for markovify.MixtureChain")
+        return super().prune(*args, **kwargs)
@@ -0,0 +1,199 @@
+import array
+import collections
+import itertools
+
+from .compact import integer_typecode
+from .corpus import CompactCorpus
+
+
+class OverlapIndex:
+    """
+    An index of the word sequences in a corpus, which lets
+    `markovify.Text.test_sentence_output` check whether a generated sentence
+    overlaps with the original text in logarithmic time, rather than by
+    scanning the entire rejoined text.
+
+    The corpus's words are encoded as integer ids (by the corpus itself, if
+    it is a `markovify.corpus.CompactCorpus`) and concatenated, so that runs
+    that cross from one sentence into the next are found, just as a search
+    of the rejoined text would find them. The index is a suffix array over
+    them: the position of every word, sorted by the ids of the `depth` words
+    starting there, which takes one integer per word. A sequence of any
+    length is found by bisecting the array for its first `depth` words (and
+    checking the rest of each match against the corpus), within the range
+    of the array that starts with its first word, which `starts` records.
+    The array is built the first time the index is queried, as generating
+    sentences doesn't require it.
+
+    Runs added later (see `add`) are indexed by a second, smaller suffix
+    array, of the positions from which a sequence can reach them, so that
+    adding a few runs doesn't re-sort the whole corpus.
+    """
+
+    def __init__(self, sentences, depth, suffixes=None):
+        self.sentences = sentences
+        self.depth = depth
+        self.corpus = sentences if isinstance(sentences, CompactCorpus) else None
+        # The number of ids `suffixes` was sorted over
+        self.end = None if suffixes is None else len(suffixes)
+        self.suffixes = suffixes
+        self.starts = None
+        self.tail = None
+
+    def encode(self):
+        if self.corpus is None:
+            self.corpus = CompactCorpus(self.sentences)
+        return self.corpus
+
+    def build(self):
+        """
+        Sorts every position in the corpus, and drops the index of `add`ed
+        runs, which the sorted positions now include.
+        """
+        ids = self.encode().ids
+        end = len(ids)
+        depth = self.depth
+        code = integer_typecode(end)
+        # Sort by the first word by bucketing, then each bucket by the rest,
+        # so that only one bucket's sort keys are held at once
+        buckets = [array.array(code) for _ in range(len(self.corpus.vocab))]
+        for position, word_id in enumerate(ids):
+            buckets[word_id].append(position)
+        suffixes = array.array(code)
+        for bucket in buckets:
+            if len(bucket) > 1:
+                bucket = sorted(bucket, key=lambda p: ids[p + 1 : min(p + depth, end)])
+            suffixes.extend(bucket)
+        self.suffixes = suffixes
+        self.end = end
+        self.starts = None
+        self.tail = None
+
+    def build_starts(self):
+        counts = collections.Counter(self.corpus.ids[: self.end])
+        self.starts = array.array(
+            integer_typecode(self.end),
+            itertools.accumulate(
+                itertools.chain(
+                    [0], map(counts.__getitem__, range(max(counts, default=-1) + 1))
+                )
+            ),
+        )
+
+    def build_tail(self):
+        ids = self.corpus.ids
+        end = len(ids)
+        depth = self.depth
+        # Sequences starting here may run past `self.end`, into added runs
+        positions = range(max(self.end - depth + 1, 0), end)
+        if end == self.end:
+            positions = range(0)
+        self.tail = array.array(
+            integer_typecode(end),
+            sorted(positions, key=lambda p: ids[p : min(p + depth, end)]),
+        )
+
+    def prepare(self):
+        self.encode()
+        if self.suffixes is None:
+            self.build()
+        if self.starts is None:
+            self.build_starts()
+        if self.tail is None:
+            self.build_tail()
+
+    def add(self, runs):
+        """
+        Indexes `runs`, which have just been appended to the corpus.
+        """
+        if self.corpus is not None and self.corpus is not self.sentences:
+            self.corpus.extend(runs)
+        self.tail = None
+        if self.suffixes is not None and self.corpus is not None:
+            # Re-sort everything once the tail is no longer small
+            if len(self.corpus.ids) - self.end > len(self.suffixes) // 4:
+                self.suffixes = None
+
+    def copy(self, sentences):
+        """
+        Returns an index of `sentences`, a copy of this index's corpus, which
+        can be added to independently. (The sorted arrays, which are never
+        changed, are shared.)
+        """
+        index = type(self)(sentences, self.depth)
+        if index.corpus is None and self.corpus is not None:
+            index.corpus = self.corpus.copy()
+        index.suffixes, index.end = self.suffixes, self.end
+        index.starts, index.tail = self.starts, self.tail
+        return index
+
+    def matches(self, suffixes, lo, hi, end, key):
+        """
+        Yields the positions in `suffixes[lo:hi]` at which the corpus's ids,
+        not reading past `end`, start with `key` (of at most `self.depth` ids).
+        """
+        ids = self.corpus.ids
+        n = len(key)
+        last = hi
+        while lo < hi:
+            mid = (lo + hi) // 2
+            p = suffixes[mid]
+            if ids[p : p + n if p + n < end else end] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        for i in range(lo, last):
+            p = suffixes[i]
+            if ids[p : p + n if p + n < end else end] != key:
+                break
+            yield p
+
+    def contains(self, gram):
+        """
+        Returns True if the sequence of words `gram` appears in the corpus.
+        """
+        n = len(gram)
+        if n == 0:
+            return True
+        self.prepare()
+        ids, word_ids = self.corpus.ids, self.corpus.word_ids
+        try:
+            query = array.array(ids.typecode, [word_ids[word] for word in gram])
+        except KeyError:
+            return False
+        key = query[: self.depth]
+        # Words added since the suffixes were sorted have no range in them
+        first, starts = query[0], self.starts
+        lo, hi = (
+            (starts[first], starts[first + 1]) if first + 1 < len(starts) else (0, 0)
+        )
+        for suffixes, lo, hi, end in [
+            (self.suffixes, lo, hi, self.end),
+            (self.tail, 0, len(self.tail), len(ids)),
+        ]:
+            for p in self.matches(suffixes, lo, hi, end, key):
+                if n <= self.depth or ids[p : p + n] == query:
+                    return True
+        return False
+
+    def sorted_suffixes(self):
+        """
+        Returns the suffix array of the whole corpus (including any runs
+        `add`ed since it was built), which can be saved, and then passed
+        back in as `suffixes` along with the same corpus.
+        """
+        if self.suffixes is None or len(self.encode().ids) != self.end:
+            self.build()
+        return self.suffixes
+
+    def nbytes(self):
+        """
+        The approximate number of bytes taken by the suffix arrays, the
+        start of each word's range in them, and, if the corpus isn't a
+        `CompactCorpus` already, its encoding as ids (not counting the
+        containers' overhead, or the encoding's vocabulary).
+        """
+        arrays = [self.suffixes, self.starts, self.tail]
+        if self.corpus is not None and self.corpus is not self.sentences:
+            arrays.append(self.corpus.ids)
+        return sum(len(a) * a.itemsize for a in arrays if a is not None)
@@ -0,0 +1,43 @@
+import collections
+import concurrent.futures
+import itertools
+
+DEFAULT_SHARD_SIZE = 10000
+
+
+def shards(iterable, size=None):
+    """
+    Splits `iterable` into lists of (at most) `size` (default:
+    `DEFAULT_SHARD_SIZE`) items, lazily.
+    """
+    size = size or DEFAULT_SHARD_SIZE
+    it = iter(iterable)
+    while True:
+        shard = list(itertools.islice(it, size))
+        if not shard:
+            return
+        yield shard
+
+
+def imap(func, iterable, workers, *args, initializer=None, initargs=()):
+    """
+    Yields `func(item, *args)` for each item in `iterable`, in order, computed
+    in a pool of `workers` processes. Unlike `Executor.map`, only a couple of
+    items per worker are submitted at a time, so `iterable` is consumed (and
+    held in memory) only as fast as the workers can process it. Each process
+    first calls `initializer(*initargs)`, if given.
+
+    `func` and its arguments must be picklable. On platforms where processes
+    are spawned rather than forked (Windows and macOS), this means calling
+    code must be guarded by `if __name__ == "__main__":`.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending = collections.deque()
+        for item in iterable:
+            pending.append(executor.submit(func, item, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -5,45 +5,60 @@ initialism_pat = re.compile(r"^[A-Za-z0-9]{1,2}(\.[A-Za-z0-9]{1,2})+\.$", re.UNI
 
 # States w/ with thanks to https://github.com/unitedstates/python-us
 # Titles w/ thanks to https://github.com/nytimes/emphasis and @donohoe
-abbr_capped = "|".join(
-    [
-        "ala|ariz|ark|calif|colo|conn|del|fla|ga|ill|ind",  # States
-        "kan|ky|la|md|mass|mich|minn|miss|mo|mont",  # States
-        "neb|nev|okla|ore|pa|tenn|vt|va|wash|wis|wyo",  # States
-        "u.s",
-        "mr|ms|mrs|msr|dr|gov|pres|sen|sens|rep|reps",  # Titles
-        "prof|gen|messrs|col|sr|jf|sgt|mgr|fr|rev",  # Titles
-        "jr|snr|atty|supt",  # Titles
-        "ave|blvd|st|rd|hwy",  # Streets
-        "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec",  # Months
-    ]
-).split("|")
+abbr_capped = set(
+    "|".join(
+        [
+            "ala|ariz|ark|calif|colo|conn|del|fla|ga|ill|ind",  # States
+            "kan|ky|la|md|mass|mich|minn|miss|mo|mont",  # States
+            "neb|nev|okla|ore|pa|tenn|vt|va|wash|wis|wyo",  # States
+            "u.s",
+            "mr|ms|mrs|msr|dr|gov|pres|sen|sens|rep|reps",  # Titles
+            "prof|gen|messrs|col|sr|jf|sgt|mgr|fr|rev",  # Titles
+            "jr|snr|atty|supt",  # Titles
+            "ave|blvd|st|rd|hwy",  # Streets
+            "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec",  # Months
+        ]
+    ).split("|")
+)
+
+abbr_lowercase = set("etc|v|vs|viz|al|pct".split("|"))
 
-abbr_lowercase = "etc|v|vs|viz|al|pct".split("|")
+multiple_caps_pat = re.compile(r"[A-Z].*[A-Z]", re.DOTALL)
+
+# The lookbehind, which only lets a match start at the beginning of a word, is
+# redundant (any match starting mid-word has a match starting at the beginning
+# of that word, which the search finds first), but saves the regex engine from
+# retrying each word from every one of its characters.
+potential_end_pat = re.compile(
+    r"".join(
+        [
+            r"(?<![\w\.'’&\]\)])",  # At the beginning of a word
+            r"([\w\.'’&\]\)]+[\.\?!])",  # A word that ends with punctuation
+            r"([‘’“”'\"\)\]]*)",  # Followed by optional quote/parens/etc
+            r"(\s+(?![a-z\-–—]))",  # Followed by whitespace + non-(lowercase/dash)
+        ]
+    ),
+    re.U,
+)
 
 
 def is_abbreviation(dotted_word):
     clipped = dotted_word[:-1]
-    if re.match(uppercase_letter_pat, clipped[0]):
+    if "A" <= clipped[0] <= "Z":
         if len(clipped) == 1:  # Initial
             return True
-        elif clipped.lower() in abbr_capped:
-            return True
         else:
-            return False
+            return clipped.lower() in abbr_capped
     else:
-        if clipped in abbr_lowercase:
-            return True
-        else:
-            return False
+        return clipped in abbr_lowercase
 
 
 def is_sentence_ender(word):
-    if re.match(initialism_pat, word) is not None:
+    if initialism_pat.match(word) is not None:
         return False
-    if word[-1] in ["?", "!"]:
+    if word[-1] in "?!":
         return True
-    if len(re.sub(r"[^A-Z]", "", word)) > 1:
+    if multiple_caps_pat.search(word) is not None:
         return True
     if word[-1] == "." and (not is_abbreviation(word)):
         return True
@@ -51,22 +66,28 @@ def is_sentence_ender(word):
 
 
 def split_into_sentences(text):
-    potential_end_pat = re.compile(
-        r"".join(
-            [
-                r"([\w\.'’&\]\)]+[\.\?!])",  # A word that ends with punctuation
-                r"([‘’“”'\"\)\]]*)",  # Followed by optional quote/parens/etc
-                r"(\s+(?![a-z\-–—]))",  # Followed by whitespace + non-(lowercase/dash)
-            ]
-        ),
-        re.U,
-    )
-    dot_iter = re.finditer(potential_end_pat, text)
     end_indices = [
-        (x.start() + len(x.group(1)) + len(x.group(2)))
-        for x in dot_iter
-        if is_sentence_ender(x.group(1))
+        match.end(2)
+        for match in potential_end_pat.finditer(text)
+        if is_sentence_ender(match.group(1))
     ]
     spans = zip([None] + end_indices, end_indices + [None])
     sentences = [text[start:end].strip() for start, end in spans]
     return sentences
+
+
+def split_many(lines):
+    """
+    Split each of `lines` (an iterable of strings, such as a file) into
+    sentences, yielding all of their sentences in order. Equivalent to, but
+    faster than, calling `split_into_sentences` on each line.
+    """
+    finditer = potential_end_pat.finditer
+    for text in lines:
+        start = None
+        for match in finditer(text):
+            if is_sentence_ender(match.group(1)):
+                end = match.end(2)
+                yield text[start:end].strip()
+                start = end
+        yield text[start:].strip()
@@ -0,0 +1,78 @@
+OUTCOMES = ("accepted", "rejected_length", "rejected_overlap")
+
+
+class GenerationStats:
+    """
+    Counters describing sentence generation, for a `markovify.Text` (and its
+    chain) on which `enable_stats` has been called:
+
+    - `calls`: calls to `make_sentence` (including those made by
+      `make_short_sentence` and `make_sentence_with_start`), of which
+      `failures` returned None.
+    - `tries`: attempts at a sentence, with the number `accepted`, and
+      rejected for their length (`rejected_length`) or their overlap with
+      the original text (`rejected_overlap`).
+    - `walks` and `steps`: the walks through the chain, and the items they
+      yielded in total (including walks abandoned for their length).
+    - `cache_hits` and `cache_misses`: lookups of lazily-compiled states
+      (see `markovify.Chain.compile`) during those walks.
+    - `seconds`: the time spent in each phase of `make_sentence`: walking
+      the chain (`"walk"`), and checking the result (`"check"`).
+
+    Each counter is updated by one of the `record_*` methods, which
+    subclasses can extend, e.g. to forward events to a metrics system.
+    `as_dict` exports the counters.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.failures = 0
+        self.tries = 0
+        self.accepted = 0
+        self.rejected_length = 0
+        self.rejected_overlap = 0
+        self.walks = 0
+        self.steps = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.seconds = {"walk": 0.0, "check": 0.0}
+
+    def record_call(self, sentence):
+        """
+        Records a call to `make_sentence`, which returned `sentence`.
+        """
+        self.calls += 1
+        if sentence is None:
+            self.failures += 1
+
+    def record_try(self, outcome, walk_seconds, check_seconds):
+        """
+        Records an attempt at a sentence, with its `outcome` (one of
+        `OUTCOMES`) and the time spent in each phase.
+        """
+        self.tries += 1
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self.seconds["walk"] += walk_seconds
+        self.seconds["check"] += check_seconds
+
+    def record_walk(self, steps, cache_hits=0, cache_misses=0):
+        """
+        Records a walk through the chain that yielded `steps` items.
+        """
+        self.walks += 1
+        self.steps += steps
+        self.cache_hits += cache_hits
+        self.cache_misses += cache_misses
+
+    def as_dict(self):
+        """
+        Returns the counters as a flat dict of numbers, with each phase's
+        time as `"seconds_<phase>"`.
+        """
+        counters = {key: value for key, value in vars(self).items() if key != "seconds"}
+        for phase, seconds in self.seconds.items():
+            counters["seconds_" + phase] = seconds
+        return counters
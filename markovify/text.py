@@ -1,14 +1,103 @@
+import concurrent.futures
 import functools
+import itertools
 import re
 import json
 import random
-from .splitters import split_into_sentences
-from .chain import Chain, BEGIN
+import time
+from .splitters import split_into_sentences, split_many
+from . import jsonstream, parallel
+from .backoff import BackoffChain
+from .chain import Chain, BEGIN, DEFAULT_CACHE_SIZE, merge_models
+from .compact import read_model, write_model
+from .corpus import CompactCorpus
+from .overlap import OverlapIndex
+from .stats import OUTCOMES, GenerationStats
 from unidecode import unidecode
 
 DEFAULT_MAX_OVERLAP_RATIO = 0.7
 DEFAULT_MAX_OVERLAP_TOTAL = 15
 DEFAULT_TRIES = 10
+DEFAULT_CHUNK_SIZE = 1 << 20
+# The length of the sequences that `test_sentence_output` checks by default,
+# which the overlap index is sorted by
+OVERLAP_DEPTH = DEFAULT_MAX_OVERLAP_TOTAL + 1
+REJECT_CHARS = frozenset("'\"()[]")
+
+try:
+    is_ascii = str.isascii
+except AttributeError:  # pragma: no cover (Python < 3.7)
+
+    def is_ascii(text):
+        return all(ord(char) < 128 for char in text)
+
+
+def with_rng(kwargs):
+    """
+    Returns `kwargs` (the keyword arguments of a sentence-making method),
+    with any `seed` replaced by an `rng` (a `random.Random`) seeded with it,
+    so that a method making several attempts doesn't repeat the first.
+    """
+    if kwargs.get("seed") is None:
+        return kwargs
+    kwargs = dict(kwargs)
+    seed = kwargs.pop("seed")
+    if kwargs.get("rng") is None:
+        kwargs["rng"] = random.Random(seed)
+    return kwargs
+
+
+def timed(iterable, seconds, stage):
+    """
+    Yields the items of `iterable`, adding the time spent producing them to
+    `seconds[stage]`.
+    """
+    it = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        finally:
+            seconds[stage] = seconds.get(stage, 0) + time.perf_counter() - start
+        yield item
+
+
+def merge_input_stats(stats, other):
+    """
+    Adds the counts and timings in `other` (see `Text.parse_sentences`) to
+    `stats`, in place.
+    """
+    for key in ("sentences", "accepted"):
+        stats[key] = stats.get(key, 0) + other.get(key, 0)
+    for key in ("rejected", "seconds"):
+        totals = stats.setdefault(key, {})
+        for stage, value in other.get(key, {}).items():
+            totals[stage] = totals.get(stage, 0) + value
+    return stats
+
+
+class ChunkedText:
+    """
+    One or more texts, each an iterable of consecutive pieces of the text
+    (e.g., blocks read from a file), which `Text` splits into sentences as
+    they are read, so that sentences may span pieces (but not texts). See
+    `Text.from_iter` and `Text.from_files`.
+    """
+
+    def __init__(self, texts):
+        self.texts = texts
+
+
+def load_corpus(parsed_sentences):
+    """
+    Rebuilds a `CompactCorpus` saved by `to_dict` (as a dict); returns any
+    other `parsed_sentences` as they are.
+    """
+    if isinstance(parsed_sentences, dict):
+        return CompactCorpus.from_dict(parsed_sentences)
+    return parsed_sentences
 
 
 class ParamError(Exception):
@@ -27,9 +116,16 @@ class Text:
         retain_original=True,
         well_formed=True,
         reject_reg="",
+        workers=1,
+        input_filters=None,
+        input_stats=None,
+        compact_corpus=False,
+        backoff=False,
+        overlap_index=None,
     ):
         """
-        input_text: A string.
+        input_text: A string, an iterable of lines (each split into sentences
+              separately), or a `ChunkedText`.
         state_size: An integer, indicating the number of words in the model's state.
         chain: A trained markovify.Chain instance for this text, if pre-processed.
         parsed_sentences: A list of lists, where each outer list is a "run"
@@ -43,57 +139,187 @@ class Text:
               can be provided.
         reject_reg: If well_formed is True, this can be provided to override the
               standard rejection pattern.
+        workers: If greater than 1, the corpus is parsed, and the chain built,
+              by that many processes. See `build_parallel`.
+        input_filters: A list of additional sentence filters (functions that
+              take a sentence and return True to keep it), applied to the
+              sentences of `input_text` after `test_sentence_input`. If
+              `workers` is greater than 1, they must be picklable (e.g.,
+              module-level functions).
+        input_stats: A dict which, if given, is filled in with counts and
+              timings of the parsing of `input_text`. See `parse_sentences`.
+        compact_corpus: If True, the retained original corpus is stored as a
+              `markovify.corpus.CompactCorpus`, which uses much less memory
+              than a list of lists of words. (A `CompactCorpus` passed as
+              `parsed_sentences` is always kept as one.)
+        backoff: If True, the chain is a `markovify.BackoffChain`, which holds
+              the models of every state size up to `state_size`, and backs
+              off to smaller states for states the full model hasn't seen
+              (e.g., an `init_state` that isn't in the corpus). A `chain`
+              given as a plain `markovify.Chain` is converted to one.
+        overlap_index: A `markovify.overlap.OverlapIndex` of `parsed_sentences`,
+              if one has already been built (e.g., loaded from a snapshot).
+              Otherwise, one is built, of depth `OVERLAP_DEPTH`, the first
+              time a sentence is checked for overlap.
+
+        A `parsed_sentences` or `overlap_index` passed in may be shared (e.g.,
+        with the model this one was compiled from), so `update` copies them
+        before changing them.
         """
 
         self.well_formed = well_formed
+        self.stats = None
+        self.input_filters = list(input_filters or [])
         if well_formed and reject_reg != "":
             self.reject_pat = re.compile(reject_reg)
 
         can_make_sentences = parsed_sentences is not None or input_text is not None
         self.retain_original = retain_original and can_make_sentences
         self.state_size = state_size
+        backoff = backoff or isinstance(chain, BackoffChain)
+        self.chain_class = BackoffChain if backoff else Chain
+        if backoff and chain and not isinstance(chain, BackoffChain):
+            chain = BackoffChain.from_chain(chain)
 
-        if self.retain_original:
-            self.parsed_sentences = parsed_sentences or list(
-                self.generate_corpus(input_text)
+        passed_sentences = parsed_sentences
+        if workers > 1 and input_text is not None and not chain:
+            parsed_sentences, chain = self.build_parallel(
+                input_text, workers, input_stats
             )
 
-            # Rejoined text lets us assess the novelty of generated sentences
-            self.rejoined_text = self.sentence_join(
-                map(self.word_join, self.parsed_sentences)
+        if self.retain_original:
+            runs = parsed_sentences or self.generate_corpus(input_text, input_stats)
+            if compact_corpus and not isinstance(runs, CompactCorpus):
+                runs = CompactCorpus(runs)
+            elif not isinstance(runs, (list, CompactCorpus)):
+                runs = list(runs)
+            self.parsed_sentences = runs
+            self.owns_corpus = runs is not passed_sentences and overlap_index is None
+
+            # The overlap index lets us assess the novelty of generated sentences
+            self.overlap_index = overlap_index or OverlapIndex(
+                self.parsed_sentences, OVERLAP_DEPTH
+            )
+            self.chain = chain or self.chain_class(
+                self.parsed_sentences, state_size, workers=workers
             )
-            self.chain = chain or Chain(self.parsed_sentences, state_size)
         else:
             if not chain:
-                parsed = parsed_sentences or self.generate_corpus(input_text)
-            self.chain = chain or Chain(parsed, state_size)
+                parsed = parsed_sentences or self.generate_corpus(
+                    input_text, input_stats
+                )
+            self.chain = chain or self.chain_class(parsed, state_size, workers=workers)
+
+    @property
+    def rejoined_text(self):
+        """
+        The original text, rejoined from `self.parsed_sentences`. Built on
+        first use, as generating sentences doesn't require it.
+        """
+        if not self.retain_original:
+            raise AttributeError("Original text was not retained")
+        if getattr(self, "_rejoined_text", None) is None:
+            self._rejoined_text = self.sentence_join(
+                map(self.word_join, self.parsed_sentences)
+            )
+        return self._rejoined_text
+
+    @rejoined_text.setter
+    def rejoined_text(self, value):
+        self._rejoined_text = value
+
+    def update(self, text):
+        """
+        Adds `text` (a string, or an iterable of lines, as passed to
+        `__init__`) to the model, in place. See `markovify.Chain.update`. If
+        the original is retained, the new sentences are appended to it, and
+        added to the overlap index.
+        """
+        runs = list(self.generate_corpus(text))
+        self.chain.update(runs)
+        if self.retain_original:
+            self.extend_corpus(runs)
+
+    def extend_corpus(self, runs):
+        """
+        Appends `runs` to the retained corpus, and adds them to the overlap
+        index. A corpus (and index) this model doesn't own is copied first,
+        rather than changed under the caller, or the other models using it.
+        """
+        if not self.owns_corpus:
+            corpus = self.parsed_sentences
+            if isinstance(corpus, CompactCorpus):
+                corpus = corpus.copy()
+            else:
+                corpus = list(corpus)
+            self.parsed_sentences = corpus
+            self.overlap_index = self.overlap_index.copy(corpus)
+            self.owns_corpus = True
+        self.parsed_sentences.extend(runs)
+        self.overlap_index.add(runs)
+        self.rejoined_text = None
+
+    def compile(
+        self, inplace=False, sampler="bisect", lazy=False, cache_size=DEFAULT_CACHE_SIZE
+    ):
+        """
+        Compiles the underlying chain; see `markovify.Chain.compile`.
+        """
+        options = dict(sampler=sampler, lazy=lazy, cache_size=cache_size)
+        if inplace:
+            self.chain.compile(inplace=True, **options)
+            return self
+        cchain = self.chain.compile(inplace=False, **options)
+        psent = index = None
+        if hasattr(self, "parsed_sentences"):
+            psent = self.parsed_sentences
+            index = self.overlap_index
+        return Text(
+            None,
+            state_size=self.state_size,
+            chain=cchain,
+            parsed_sentences=psent,
+            overlap_index=index,
+            retain_original=self.retain_original,
+            well_formed=self.well_formed,
+            reject_reg=self.reject_pat,
+            input_filters=self.input_filters,
+        )
 
-    def compile(self, inplace=False):
+    def compact(self, inplace=False):
         if inplace:
-            self.chain.compile(inplace=True)
+            self.chain.compact(inplace=True)
             return self
-        cchain = self.chain.compile(inplace=False)
-        psent = None
+        cchain = self.chain.compact(inplace=False)
+        psent = index = None
         if hasattr(self, "parsed_sentences"):
             psent = self.parsed_sentences
+            index = self.overlap_index
         return Text(
             None,
             state_size=self.state_size,
             chain=cchain,
             parsed_sentences=psent,
+            overlap_index=index,
             retain_original=self.retain_original,
             well_formed=self.well_formed,
             reject_reg=self.reject_pat,
+            input_filters=self.input_filters,
         )
 
     def to_dict(self):
         """
         Returns the underlying data as a Python dict.
         """
+        parsed_sentences = None
+        if self.retain_original:
+            parsed_sentences = self.parsed_sentences
+            if isinstance(parsed_sentences, CompactCorpus):
+                parsed_sentences = parsed_sentences.to_dict()
         return {
             "state_size": self.state_size,
             "chain": self.chain.to_json(),
-            "parsed_sentences": self.parsed_sentences if self.retain_original else None,
+            "parsed_sentences": parsed_sentences,
         }
 
     def to_json(self):
@@ -104,16 +330,170 @@ class Text:
 
     @classmethod
     def from_dict(cls, obj, **kwargs):
+        """
+        Rebuilds a model from the output of `to_dict`. `**kwargs` (e.g.,
+        `well_formed` and `reject_reg`) are passed to `cls(...)`.
+        """
         return cls(
             None,
             state_size=obj["state_size"],
             chain=Chain.from_json(obj["chain"]),
-            parsed_sentences=obj.get("parsed_sentences"),
+            parsed_sentences=load_corpus(obj.get("parsed_sentences")),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_json(cls, json_str, **kwargs):
+        return cls.from_dict(json.loads(json_str), **kwargs)
+
+    def write_json(self, target, compression=None):
+        """
+        Writes the model to `target` (a path, or a file opened in text mode)
+        as JSON, in the layout of `to_json`, but incrementally. See
+        `markovify.Chain.write_json`.
+        """
+        parsed_sentences = self.parsed_sentences if self.retain_original else None
+        with jsonstream.opened(target, "w", compression) as f:
+            jsonstream.write_text(
+                f, self.state_size, self.chain.model, parsed_sentences
+            )
+
+    @classmethod
+    def read_json(cls, source, compression=None, **kwargs):
+        """
+        Reads a model written by `write_json` or `to_json` from `source` (a
+        path, or a file opened in text mode), parsing it incrementally. See
+        `markovify.Chain.read_json`. `**kwargs` are passed to `cls(...)`.
+        """
+        with jsonstream.opened(source, "r", compression) as f:
+            reader = jsonstream.Reader(jsonstream.read_chunks(f))
+            state_size, model, parsed_sentences = jsonstream.read_text(reader)
+        return cls(
+            None,
+            state_size=state_size,
+            chain=Chain.from_json(model),
+            parsed_sentences=load_corpus(parsed_sentences),
+            **kwargs,
         )
 
+    def save(self, path, snapshot=False):
+        """
+        Saves the model to `path` in markovify's binary format, which `load`
+        can memory-map. The original corpus, if retained, is stored as JSON
+        (as a list of lists of words, even if it is a `CompactCorpus`).
+
+        If `snapshot` is True, everything else `load` would otherwise have
+        to rebuild or parse is saved too: the model's options (`well_formed`,
+        `reject_reg`, and `backoff`), and its overlap index (built first, if
+        it hasn't been), which is saved as a suffix array that `load`
+        memory-maps and searches in place. The corpus is saved as the
+        sections of a `CompactCorpus` (see `CompactCorpus.sections`) instead
+        of JSON, so `load` reads it without parsing it, as a `CompactCorpus`
+        (whether or not the model's was one). The snapshot should be loaded
+        by the same class.
+        """
+        chain = self.chain if self.chain.compacted else self.chain.compact()
+        if chain.model.prefix_offsets is None:
+            chain.model.build_prefix_index(BEGIN)
+        meta = {"state_size": self.state_size}
+        corpus = b""
+        sections = {}
+        if snapshot:
+            meta["options"] = self.snapshot_options()
+            if self.retain_original:
+                # The suffix array refers to the ids of the index's encoding
+                index = self.overlap_index
+                sections.update(index.encode().sections())
+                meta["overlap_depth"] = index.depth
+                sections["overlap_suffixes"] = index.sorted_suffixes()
+        elif self.retain_original:
+            corpus = json.dumps(list(self.parsed_sentences)).encode("utf-8")
+        write_model(path, chain.model, meta, corpus, sections)
+
+    def snapshot_options(self):
+        reject_reg = ""
+        if self.reject_pat.pattern != type(self).reject_pat.pattern:
+            reject_reg = self.reject_pat.pattern
+        return {
+            "well_formed": self.well_formed,
+            "reject_reg": reject_reg,
+            "backoff": isinstance(self.chain, BackoffChain),
+        }
+
     @classmethod
-    def from_json(cls, json_str):
-        return cls.from_dict(json.loads(json_str))
+    def load(cls, path, mmap=True, **kwargs):
+        """
+        Loads a model saved by `save`. With `mmap=True` (the default), the
+        chain is memory-mapped rather than parsed, so the model is ready to
+        generate sentences immediately (unless the original corpus, which
+        must be parsed, was retained; a snapshot's isn't parsed).
+
+        For a snapshot (see `save`), the saved options are used, unless
+        overridden by `**kwargs`, and the overlap index is loaded as well.
+        """
+        model, meta, corpus, sections = read_model(path, use_mmap=mmap, sections=True)
+        kwargs = dict(meta.get("options", {}), **kwargs)
+        if "corpus_ids" in sections:
+            parsed_sentences = CompactCorpus.from_sections(sections)
+        else:
+            parsed_sentences = json.loads(corpus) if corpus else None
+            if kwargs.get("compact_corpus") and parsed_sentences is not None:
+                parsed_sentences = CompactCorpus(parsed_sentences)
+        overlap_index = None
+        if "overlap_suffixes" in sections:
+            overlap_index = OverlapIndex(
+                parsed_sentences, meta["overlap_depth"], sections["overlap_suffixes"]
+            )
+        return cls(
+            None,
+            state_size=meta["state_size"],
+            chain=Chain(None, model.state_size, model),
+            parsed_sentences=parsed_sentences,
+            overlap_index=overlap_index,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_iter(cls, chunks, state_size=2, **kwargs):
+        """
+        Builds a model from a single text that arrives in consecutive pieces
+        (e.g., blocks or lines read from a file, including their newlines).
+        Unlike passing an iterable of lines to `cls(...)`, sentences may span
+        pieces. The text is parsed (see `generate_corpus_stream`) and fed into
+        the chain as it is read, so the whole text is never held in memory.
+
+        By default, the original text is not retained, so sentences generated
+        by the model are not checked for overlap with it. (With
+        `retain_original=True`, the parsed sentences are kept, for which
+        `compact_corpus=True` saves memory.) With `workers` greater than 1,
+        the text is split into sentences as it is read, and batches of them
+        are parsed, and their chains built, by that many processes (see
+        `build_parallel`). Other `**kwargs` are passed to `cls(...)`.
+        """
+        kwargs.setdefault("retain_original", False)
+        return cls(ChunkedText([chunks]), state_size=state_size, **kwargs)
+
+    @classmethod
+    def from_files(
+        cls,
+        paths,
+        state_size=2,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        encoding="utf-8",
+        **kwargs,
+    ):
+        """
+        Builds a model from one or more text files, reading each in blocks of
+        `chunk_size` characters. Sentences do not span files. See `from_iter`.
+        """
+
+        def read(path):
+            with open(path, encoding=encoding) as f:
+                yield from iter(functools.partial(f.read, chunk_size), "")
+
+        kwargs.setdefault("retain_original", False)
+        texts = map(read, paths)
+        return cls(ChunkedText(texts), state_size=state_size, **kwargs)
 
     def sentence_split(self, text):
         """
@@ -121,6 +501,15 @@ class Text:
         """
         return split_into_sentences(text)
 
+    def sentence_split_many(self, lines):
+        """
+        Splits each of an iterable of strings into sentences, as
+        `sentence_split` would, lazily yielding all of their sentences.
+        """
+        if type(self).sentence_split is Text.sentence_split:
+            return split_many(lines)
+        return itertools.chain.from_iterable(map(self.sentence_split, lines))
+
     def sentence_join(self, sentences):
         """
         Re-joins a list of sentences into the full text.
@@ -149,28 +538,197 @@ class Text:
         """
         if len(sentence.strip()) == 0:
             return False
+        if not self.well_formed:
+            return True
         # Decode unicode, mainly to normalize fancy quotation marks
-        decoded = unidecode(sentence)
+        decoded = sentence if is_ascii(sentence) else unidecode(sentence)
+        # Every match of the default pattern contains one of these characters,
+        # so sentences without any of them needn't be searched
+        if self.reject_pat is Text.reject_pat and REJECT_CHARS.isdisjoint(decoded):
+            return True
         # Sentence shouldn't contain problematic characters
-        if self.well_formed and self.reject_pat.search(decoded):
+        if self.reject_pat.search(decoded):
             return False
         return True
 
-    def generate_corpus(self, text):
+    def generate_corpus(self, text, stats=None):
         """
         Given a text string, returns a list of lists; that is, a list of
         "sentences," each of which is a list of words. Before splitting into
         words, the sentences are filtered through `self.test_sentence_input`
+        and `self.input_filters`. See `parse_sentences`.
         """
         if isinstance(text, str):
+            start = time.perf_counter()
+            sentences = self.sentence_split(text)
+            if stats is not None:
+                seconds = stats.setdefault("seconds", {})
+                elapsed = time.perf_counter() - start
+                seconds["split"] = seconds.get("split", 0) + elapsed
+        else:
+            if isinstance(text, ChunkedText):
+                sentences = self.sentence_split_chunked(text)
+            else:
+                sentences = self.sentence_split_many(text)
+            if stats is not None:
+                sentences = timed(sentences, stats.setdefault("seconds", {}), "split")
+        return self.parse_sentences(sentences, stats)
+
+    def parse_sentences(self, sentences, stats=None):
+        """
+        Lazily filters `sentences` through `self.test_sentence_input`, then
+        each of `self.input_filters`, and splits those that pass into words.
+
+        If `stats` (a dict) is given, it is filled in, as the sentences are
+        parsed, with the number of `"sentences"` seen and `"accepted"`, the
+        number `"rejected"` by each filter, and the `"seconds"` spent in each
+        stage, keyed by the filters' (and `"word_split"`'s) names.
+        """
+        filters = [self.test_sentence_input] + self.input_filters
+        if stats is None:
+            for sentence_filter in filters:
+                sentences = filter(sentence_filter, sentences)
+            return map(self.word_split, sentences)
+        return self.parse_sentences_with_stats(sentences, filters, stats)
+
+    def parse_sentences_with_stats(self, sentences, filters, stats):
+        merge_input_stats(stats, {})
+        rejected, seconds = stats["rejected"], stats["seconds"]
+        stages = [(f, getattr(f, "__name__", repr(f))) for f in filters]
+        for _, name in stages:
+            rejected.setdefault(name, 0)
+            seconds.setdefault(name, 0)
+        seconds.setdefault("word_split", 0)
+        perf_counter = time.perf_counter
+        for sentence in sentences:
+            stats["sentences"] += 1
+            for sentence_filter, name in stages:
+                start = perf_counter()
+                passed = sentence_filter(sentence)
+                seconds[name] += perf_counter() - start
+                if not passed:
+                    rejected[name] += 1
+                    break
+            else:
+                start = perf_counter()
+                words = self.word_split(sentence)
+                seconds["word_split"] += perf_counter() - start
+                stats["accepted"] += 1
+                yield words
+
+    def generate_corpus_stream(self, chunks, stats=None):
+        """
+        Like `self.generate_corpus`, but for a single text that arrives in
+        consecutive pieces (e.g., blocks read from a file), yielding each
+        sentence's words as soon as the sentence is complete. See
+        `sentence_split_stream`.
+        """
+        return self.parse_sentences(self.sentence_split_stream(chunks), stats)
+
+    def sentence_split_chunked(self, text):
+        """
+        Splits each of the texts of `text` (a `ChunkedText`) into sentences,
+        as `sentence_split_stream` would, lazily yielding all of their
+        sentences.
+        """
+        return itertools.chain.from_iterable(
+            map(self.sentence_split_stream, text.texts)
+        )
+
+    def sentence_split_stream(self, chunks):
+        """
+        Splits a single text that arrives in consecutive pieces into
+        sentences, yielding each as soon as it is complete.
+
+        A sentence boundary near the end of a chunk might be an artifact of
+        where the chunk ends (e.g., "Mr." followed by a lowercase word in the
+        next chunk), so the text from the second-to-last sentence onward is
+        carried over and re-split along with the next chunk.
+        """
+        carry = ""
+        for chunk in chunks:
+            text = carry + chunk
             sentences = self.sentence_split(text)
+            if len(sentences) < 3:
+                carry = text
+                continue
+            # Find where the second-to-last sentence begins in the raw text
+            start = 0
+            for sentence in sentences[:-2]:
+                found = text.find(sentence, start)
+                if found < 0:
+                    break
+                start = found + len(sentence)
+            else:
+                found = text.find(sentences[-2], start)
+            if found < 0:
+                # `sentence_split` doesn't return substrings of its input
+                carry = self.sentence_join(sentences[-2:])
+            else:
+                carry = text[found:]
+            yield from sentences[:-2]
+        yield from self.sentence_split(carry)
+
+    def build_shard(self, shard, presplit, collect_stats=False):
+        """
+        Parses a shard of the corpus (a list of sentences if `presplit`,
+        otherwise of lines of text) and builds its chain's model. Returns
+        the parsed sentences (if the original is being retained), the
+        model, and, if `collect_stats`, the parsing statistics (see
+        `parse_sentences`). Run in worker processes by `build_parallel`.
+        """
+        stats = {} if collect_stats else None
+        if presplit:
+            runs = self.parse_sentences(shard, stats)
         else:
-            sentences = []
-            for line in text:
-                sentences += self.sentence_split(line)
-        passing = filter(self.test_sentence_input, sentences)
-        runs = map(self.word_split, passing)
-        return runs
+            runs = self.generate_corpus(shard, stats)
+        runs = list(runs)
+        model = self.chain_class(runs, self.state_size).model if runs else {}
+        return (runs if self.retain_original else None), model, stats
+
+    def build_parallel(self, text, workers, stats=None):
+        """
+        Parses `text` and builds its chain in a pool of `workers` processes,
+        merging each worker's partial chain (as `markovify.combine` would,
+        with equal weights) as it arrives. Returns the parsed sentences (or
+        None, if the original is not being retained) and the chain. If
+        `stats` (a dict) is given, the workers' parsing statistics are
+        added up in it.
+
+        If `text` is a string, it is split into sentences up front, and if
+        it is a `ChunkedText`, as it is read (as `generate_corpus` would), and
+        batches of sentences are sent to the workers. Otherwise, `text` is
+        treated as an iterable of lines, and batches of lines are sent to the
+        workers to be split.
+        """
+        presplit = isinstance(text, (str, ChunkedText))
+        if isinstance(text, str):
+            lines = self.sentence_split(text)
+        elif presplit:
+            lines = self.sentence_split_chunked(text)
+        else:
+            lines = text
+        parsed_sentences = [] if self.retain_original else None
+        model = {}
+        for runs, partial, shard_stats in parallel.imap(
+            self.build_shard,
+            parallel.shards(lines),
+            workers,
+            presplit,
+            stats is not None,
+        ):
+            if self.retain_original:
+                parsed_sentences += runs
+            if not model:
+                model = partial
+            elif partial:
+                if self.chain_class is BackoffChain:
+                    model.trie.merge(partial.trie)
+                else:
+                    merge_models(model, partial)
+            if stats is not None:
+                merge_input_stats(stats, shard_stats)
+        return parsed_sentences, self.chain_class(None, self.state_size, model=model)
 
     def test_sentence_output(self, words, max_overlap_ratio, max_overlap_total):
         """
@@ -179,6 +737,13 @@ class Text:
         contain any identical sequence of words of X length, where X is the
         smaller number of (a) `max_overlap_ratio` (default: 0.7) of the total
         number of words, and (b) `max_overlap_total` (default: 15).
+
+        Sequences are looked up in `self.overlap_index`, so the cost of this
+        check grows only with the logarithm of the size of the original
+        text. (Unless `word_join` is overridden: the index matches words
+        exactly, but an overridden `word_join` may join different words into
+        the same text, e.g. by stripping tags, so each sequence is joined and
+        searched for in `self.rejoined_text` instead.)
         """
         # Reject large chunks of similarity
         overlap_ratio = round(max_overlap_ratio * len(words))
@@ -186,9 +751,11 @@ class Text:
         overlap_over = overlap_max + 1
         gram_count = max((len(words) - overlap_max), 1)
         grams = [words[i : i + overlap_over] for i in range(gram_count)]
+        if type(self).word_join is not Text.word_join:
+            rejoined_text = self.rejoined_text
+            return not any(self.word_join(g) in rejoined_text for g in grams)
         for g in grams:
-            gram_joined = self.word_join(g)
-            if gram_joined in self.rejoined_text:
+            if self.overlap_index.contains(g):
                 return False
         return True
 
@@ -208,7 +775,30 @@ class Text:
         will be skipped.
 
         If `max_words` or `min_words` are specified, the word count for the
-        sentence will be evaluated against the provided limit(s).
+        sentence will be evaluated against the provided limit(s), and
+        likewise its length for `max_chars` and `min_chars`. Attempts are
+        abandoned as soon as they exceed `max_words` or `max_chars` (see
+        `constrained_walk`). If `bias_end` is True, attempts are also steered
+        toward ending within `max_words`; see `markovify.Chain.gen`.
+
+        Random choices are made with `rng` (a `random.Random`), if given, or
+        one seeded with `seed`, if given, or else the `random` module's
+        global generator.
+        """
+        sentence = None
+        for outcome, attempt in self.attempt_sentences(init_state, **kwargs):
+            if outcome == "accepted":
+                sentence = attempt
+                break
+        if self.stats is not None:
+            self.stats.record_call(sentence)
+        return sentence
+
+    def attempt_sentences(self, init_state=None, **kwargs):
+        """
+        Yields the outcome (one of `markovify.stats.OUTCOMES`) of each of the
+        attempts that `make_sentence` would make, along with the sentence, if
+        it was accepted (or else None).
         """
         tries = kwargs.get("tries", DEFAULT_TRIES)
         mor = kwargs.get("max_overlap_ratio", DEFAULT_MAX_OVERLAP_RATIO)
@@ -216,41 +806,262 @@ class Text:
         test_output = kwargs.get("test_output", True)
         max_words = kwargs.get("max_words", None)
         min_words = kwargs.get("min_words", None)
+        max_chars = kwargs.get("max_chars", None)
+        min_chars = kwargs.get("min_chars", None)
+        bias_end = kwargs.get("bias_end", False)
+        rng = with_rng(kwargs).get("rng")
 
-        if init_state is None:
-            prefix = []
-        else:
-            prefix = list(init_state)
-            for word in prefix:
-                if word == BEGIN:
-                    prefix = prefix[1:]
+        prefix = self.init_state_prefix(init_state)
+        stats = self.stats
+
+        for _ in range(tries):
+            if stats is not None:
+                start = time.perf_counter()
+            words = self.constrained_walk(
+                init_state, prefix, max_words, max_chars, bias_end, rng
+            )
+            if stats is not None:
+                walked = time.perf_counter()
+            outcome, sentence = "rejected_length", None
+            if words is not None and (min_words is None or len(words) >= min_words):
+                joined = self.word_join(words)
+                if (max_chars is None or len(joined) <= max_chars) and (
+                    min_chars is None or len(joined) >= min_chars
+                ):
+                    outcome, sentence = "accepted", joined
+                    if test_output and self.retain_original:
+                        if not self.test_sentence_output(words, mor, mot):
+                            outcome, sentence = "rejected_overlap", None
+            if stats is not None:
+                stats.record_try(outcome, walked - start, time.perf_counter() - walked)
+            yield outcome, sentence
+
+    def constrained_walk(
+        self,
+        init_state,
+        prefix,
+        max_words=None,
+        max_chars=None,
+        bias_end=False,
+        rng=None,
+    ):
+        """
+        Walks the chain from `init_state`, returning the words of `prefix`
+        followed by those of the run, or None as soon as they are known to
+        exceed `max_words` words or (unless `word_join` is overridden, which
+        would make the length unknown until the words are joined)
+        `max_chars` characters.
+        """
+        max_steps = None if max_words is None else max_words - len(prefix)
+        if max_chars is None or type(self).word_join is not Text.word_join:
+            run = self.chain.walk(init_state, max_steps, bias_end, rng)
+            return None if run is None else prefix + run
+        words = list(prefix)
+        length = len(self.word_join(words))
+        for word in self.chain.gen(init_state, max_steps, bias_end, rng):
+            length += len(word) + (1 if words else 0)
+            if length > max_chars:
+                return None
+            words.append(word)
+        if max_words is not None and len(words) > max_words:
+            return None
+        return words
+
+    def enable_stats(self, stats=None):
+        """
+        Starts recording statistics about sentence generation, in `stats` (a
+        `markovify.stats.GenerationStats`, or a new one by default), which is
+        shared with the chain, and returned. While no stats are enabled (the
+        default), generation does not pay for recording them.
+        """
+        self.stats = self.chain.stats = stats or GenerationStats()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = self.chain.stats = None
+
+    def make_sentences(
+        self, n, init_state=None, return_stats=False, workers=1, seed=None, **kwargs
+    ):
+        """
+        Generates `n` sentences at once, returning a list in which each item
+        is what `self.make_sentence(init_state, **kwargs)` would return: a
+        sentence, or None if no valid sentence was found in `tries` attempts.
+
+        Rather than generating the sentences one after another, each attempt
+        walks the chain for all of the sentences still needed in lockstep,
+        via `self.chain.walk_many`, which is much faster for large `n`.
+
+        If `return_stats` is True, returns a `(sentences, stats)` tuple, where
+        `stats` is a dict counting the `attempts`, the sentences `accepted`,
+        and the attempts rejected for their length (`rejected_length`) or
+        their overlap with the original text (`rejected_overlap`).
+
+        If `enable_stats` has been called, each sentence is also recorded as
+        a call to `make_sentence` (with each batch's walking time shared
+        equally among its walks).
+
+        If `seed` is given, or `workers` is greater than 1, each sentence is
+        instead made by `make_sentence`, with its own `random.Random`, seeded
+        with `f"{seed}:{i}"` for the `i`th sentence (see `seeded_sentences`).
+        The sentences are divided among `workers` threads, which share the
+        model, but since each sentence's random choices are independent of
+        the others', the results for a given `seed` are the same regardless
+        of the number of workers, or the order in which they run.
+        """
+        if seed is not None or workers > 1:
+            return self.make_sentences_from_seeds(
+                n, init_state, return_stats, workers, seed, kwargs
+            )
+        tries = kwargs.get("tries", DEFAULT_TRIES)
+        mor = kwargs.get("max_overlap_ratio", DEFAULT_MAX_OVERLAP_RATIO)
+        mot = kwargs.get("max_overlap_total", DEFAULT_MAX_OVERLAP_TOTAL)
+        test_output = kwargs.get("test_output", True) and self.retain_original
+        max_words = kwargs.get("max_words", None)
+        min_words = kwargs.get("min_words", None)
+        max_chars = kwargs.get("max_chars", None)
+        min_chars = kwargs.get("min_chars", None)
+        bias_end = kwargs.get("bias_end", False)
+
+        rng = with_rng(kwargs).get("rng")
+
+        prefix = self.init_state_prefix(init_state)
+        max_steps = None if max_words is None else max_words - len(prefix)
+        stats = {
+            "attempts": 0,
+            "accepted": 0,
+            "rejected_length": 0,
+            "rejected_overlap": 0,
+        }
+        sentences = [None] * n
+        pending = list(range(n))
+
+        for _ in range(tries):
+            if not pending:
+                break
+            start = time.perf_counter()
+            runs = self.chain.walk_many(
+                len(pending), init_state, max_steps, bias_end, rng
+            )
+            walk_seconds = (time.perf_counter() - start) / len(pending)
+            stats["attempts"] += len(pending)
+            still_pending = []
+            for i, run in zip(pending, runs):
+                start = time.perf_counter()
+                joined = None
+                length = None if run is None else len(prefix) + len(run)
+                if (
+                    length is not None
+                    and (min_words is None or length >= min_words)
+                    and (max_words is None or length <= max_words)
+                ):
+                    joined = self.word_join(prefix + run)
+                    if (max_chars is not None and len(joined) > max_chars) or (
+                        min_chars is not None and len(joined) < min_chars
+                    ):
+                        joined = None
+                if joined is None:
+                    outcome = "rejected_length"
+                    still_pending.append(i)
+                elif test_output and not self.test_sentence_output(
+                    prefix + run, mor, mot
+                ):
+                    outcome = "rejected_overlap"
+                    still_pending.append(i)
                 else:
+                    outcome = "accepted"
+                    sentences[i] = joined
+                stats[outcome] += 1
+                if self.stats is not None:
+                    self.stats.record_try(
+                        outcome, walk_seconds, time.perf_counter() - start
+                    )
+            pending = still_pending
+
+        if self.stats is not None:
+            for sentence in sentences:
+                self.stats.record_call(sentence)
+        if return_stats:
+            return sentences, stats
+        return sentences
+
+    def make_sentences_from_seeds(
+        self, n, init_state, return_stats, workers, seed, kwargs
+    ):
+        if seed is None:
+            seed = (with_rng(kwargs).get("rng") or random).getrandbits(64)
+        # Worker `w` makes sentences w, w + workers, w + 2 * workers, ...
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self.seeded_sentences,
+                    range(w, n, workers),
+                    init_state,
+                    seed,
+                    **kwargs,
+                )
+                for w in range(workers)
+            ]
+            sentences = [None] * n
+            stats = dict.fromkeys(("attempts",) + OUTCOMES, 0)
+            for w, future in enumerate(futures):
+                worker_sentences, worker_stats = future.result()
+                sentences[w::workers] = worker_sentences
+                for key, count in worker_stats.items():
+                    stats[key] += count
+        if return_stats:
+            return sentences, stats
+        return sentences
+
+    def seeded_sentences(self, indices, init_state, seed, **kwargs):
+        """
+        Makes a sentence for each of `indices`, as `make_sentence` would, but
+        with a separate `random.Random` for each, seeded with
+        `f"{seed}:{index}"`. Returns a list of the sentences, and a dict
+        counting the attempts made, and their outcomes.
+        """
+        stats = dict.fromkeys(("attempts",) + OUTCOMES, 0)
+        sentences = []
+        for index in indices:
+            kwargs["rng"] = random.Random(f"{seed}:{index}")
+            sentence = None
+            for outcome, attempt in self.attempt_sentences(init_state, **kwargs):
+                stats["attempts"] += 1
+                stats[outcome] += 1
+                if outcome == "accepted":
+                    sentence = attempt
                     break
+            if self.stats is not None:
+                self.stats.record_call(sentence)
+            sentences.append(sentence)
+        return sentences, stats
 
-        for _ in range(tries):
-            words = prefix + self.chain.walk(init_state)
-            if (max_words is not None and len(words) > max_words) or (
-                min_words is not None and len(words) < min_words
-            ):
-                continue  # pragma: no cover # see coveragepy/issues/198
-            if test_output and hasattr(self, "rejoined_text"):
-                if self.test_sentence_output(words, mor, mot):
-                    return self.word_join(words)
+    def init_state_prefix(self, init_state):
+        """
+        Returns the words of `init_state` that a generated sentence should
+        begin with, i.e., all but its leading BEGIN markers.
+        """
+        if init_state is None:
+            return []
+        prefix = list(init_state)
+        for word in prefix:
+            if word == BEGIN:
+                prefix = prefix[1:]
             else:
-                return self.word_join(words)
-        return None
+                break
+        return prefix
 
     def make_short_sentence(self, max_chars, min_chars=0, **kwargs):
         """
         Tries making a sentence of no more than `max_chars` characters and optionally
         no less than `min_chars` characters, passing **kwargs to `self.make_sentence`.
-        """
-        tries = kwargs.get("tries", DEFAULT_TRIES)
 
-        for _ in range(tries):
-            sentence = self.make_sentence(**kwargs)
-            if sentence and min_chars <= len(sentence) <= max_chars:
-                return sentence
+        Since many attempts are the wrong length, `tries` defaults to
+        `DEFAULT_TRIES ** 2` (100) here, rather than `DEFAULT_TRIES`. (Walks
+        are abandoned as soon as they're too long, so attempts are cheap.)
+        """
+        kwargs.setdefault("tries", DEFAULT_TRIES**2)
+        return self.make_sentence(max_chars=max_chars, min_chars=min_chars, **kwargs)
 
     def make_sentence_with_start(self, beginning, strict=True, **kwargs):
         """
@@ -264,10 +1075,15 @@ class Text:
         If strict == False, then markovify will draw its initial inspiration
         from any sentence containing the specified word/phrase.
 
+        If the chain is a `markovify.BackoffChain` (see `backoff`), the
+        beginning need not be one the model has seen in full: it backs off
+        to the longest part of it that it has.
+
         **kwargs are passed to `self.make_sentence`
         """
         split = tuple(self.word_split(beginning))
         word_count = len(split)
+        kwargs = with_rng(kwargs)
 
         if word_count == self.state_size:
             init_states = [split]
@@ -279,7 +1095,10 @@ class Text:
             else:
                 init_states = self.find_init_states_from_chain(split)
 
-                random.shuffle(init_states)
+                (kwargs.get("rng") or random).shuffle(init_states)
+                if not init_states and isinstance(self.chain, BackoffChain):
+                    # Back off from the words, as the start of a sentence
+                    init_states = [(BEGIN,) * (self.state_size - word_count) + split]
         else:
             err_msg = (
                 f"`make_sentence_with_start` for this model requires a string "
@@ -297,31 +1116,23 @@ class Text:
         )
         raise ParamError(err_msg)
 
-    @functools.lru_cache(maxsize=1)
     def find_init_states_from_chain(self, split):
         """
         Find all chains that begin with the split when `self.make_sentence_with_start`
-        is called with strict == False.
-
-        This is a very expensive operation, so lru_cache caches the results of
-        the latest query in case `self.make_sentence_with_start` is called
-        repeatedly with the same beginning string.
+        is called with strict == False. See `markovify.Chain.states_with_prefix`.
         """
-        word_count = len(split)
-        return [
-            key
-            for key in self.chain.model.keys()
-            # check for starting with begin as well ordered lists
-            if tuple(filter(lambda x: x != BEGIN, key))[:word_count] == split
-        ]
+        return self.chain.states_with_prefix(split)
 
     @classmethod
     def from_chain(cls, chain_json, corpus=None, parsed_sentences=None):
         """
         Init a Text class based on an existing chain JSON string or object
-        If corpus is None, overlap checking won't work.
+        (or markovify.Chain). If corpus is None, overlap checking won't work.
         """
-        chain = Chain.from_json(chain_json)
+        if isinstance(chain_json, Chain):
+            chain = chain_json
+        else:
+            chain = Chain.from_json(chain_json)
         return cls(
             corpus or None,
             parsed_sentences=parsed_sentences,
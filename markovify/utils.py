@@ -1,16 +1,38 @@
-from .chain import Chain
+from collections.abc import Mapping
+
+from .chain import BEGIN, Chain, compile_next, merge_models
+from .compact import merge_compact_models, read_model, write_model
+from .corpus import CompactCorpus
 from .text import Text
 
 
+class NextWeights(Mapping):
+    """
+    A read-only view of a compiled `markovify.Chain`'s model as an
+    uncompiled one, decompiling each state's entry as it is read. (For
+    chains compiled with the alias sampler, the weights are probabilities.)
+    """
+
+    def __init__(self, chain):
+        self.chain = chain
+
+    def __getitem__(self, state):
+        return self.chain.next_weights(state)
+
+    def __iter__(self):
+        return iter(self.chain.model)
+
+    def __len__(self):
+        return len(self.chain.model)
+
+
 def get_model_dict(thing):
+    if isinstance(thing, Text):
+        thing = thing.chain
     if isinstance(thing, Chain):
         if thing.compiled:
-            raise ValueError("Not implemented for compiled markovify.Chain")
+            return NextWeights(thing)
         return thing.model
-    if isinstance(thing, Text):
-        if thing.chain.compiled:
-            raise ValueError("Not implemented for compiled markovify.Chain")
-        return thing.chain.model
     if isinstance(thing, list):
         return dict(thing)
     if isinstance(thing, dict):
@@ -21,7 +43,51 @@ def get_model_dict(thing):
     )
 
 
-def combine(models, weights=None):
+def scale_model(thing, weight):
+    """
+    Multiply the counts of `thing` (a dict model, `markovify.Chain`, or
+    `markovify.Text`) by `weight`, in place. Since every count in each state
+    is scaled alike, the chain's probabilities (and the caches derived from
+    them) are unchanged.
+    """
+    if isinstance(thing, Text):
+        thing = thing.chain
+    if isinstance(thing, Chain) and thing.compiled:
+        for state in list(thing.model):
+            counts = thing.next_weights(state)
+            thing.model[state] = compile_next(
+                {word: count * weight for word, count in counts.items()}
+            )
+        return
+    model = thing.model if isinstance(thing, Chain) else thing
+    for options in model.values():
+        for next_word in options:
+            options[next_word] *= weight
+
+
+def combine(models, weights=None, inplace=False):
+    """
+    Combine `models` (all `markovify.Chain`s, `markovify.Text`s, dict models,
+    or lists of a dict model's items), adding their counts, each multiplied
+    by its model's weight in `weights` (default: 1 each).
+
+    Compiled chains are decompiled as they are read. (For chains compiled
+    with the alias sampler, only the probabilities survive compilation, so
+    those are added instead of counts.)
+
+    If `inplace` is True, the other models are added to the first one (which
+    must be an uncompiled or bisect-compiled `markovify.Chain` or
+    `markovify.Text`, or a dict), and it is returned, rather than copying
+    every model into a new one. (See `markovify.Chain.add_counts`.) If the
+    first `markovify.Text` retains its original text, the others' retained
+    sentences are appended to it.
+
+    Combined `markovify.Text`s retain the models' original sentences, in a
+    `markovify.corpus.CompactCorpus` if the first model's are in one.
+
+    To combine models saved with `save`, without loading them into dicts,
+    see `combine_files`.
+    """
     if weights is None:
         weights = [1 for _ in range(len(models))]
 
@@ -29,7 +95,7 @@ def combine(models, weights=None):
         raise ValueError("`models` and `weights` lengths must be equal.")
 
     model_dicts = list(map(get_model_dict, models))
-    state_sizes = [len(list(md.keys())[0]) for md in model_dicts]
+    state_sizes = [len(next(iter(md))) for md in model_dicts]
 
     if len(set(state_sizes)) != 1:
         raise ValueError("All `models` must have the same state size.")
@@ -37,31 +103,137 @@ def combine(models, weights=None):
     if len(set(map(type, models))) != 1:
         raise ValueError("All `models` must be of the same type.")
 
+    if inplace:
+        return combine_inplace(models, model_dicts, weights)
+
     c = {}
 
     for m, w in zip(model_dicts, weights):
-        for state, options in m.items():
-            current = c.get(state, {})
-            for subseq_k, subseq_v in options.items():
-                subseq_prev = current.get(subseq_k, 0)
-                current[subseq_k] = subseq_prev + (subseq_v * w)
-            c[state] = current
+        merge_models(c, m, w)
 
     ret_inst = models[0]
 
     if isinstance(ret_inst, Chain):
-        return Chain.from_json(c)
+        return Chain(None, state_sizes[0], c)
     if isinstance(ret_inst, Text):
-        ret_inst.find_init_states_from_chain.cache_clear()
+        chain = Chain(None, state_sizes[0], c)
         if any(m.retain_original for m in models):
             combined_sentences = []
+            if isinstance(getattr(ret_inst, "parsed_sentences", None), CompactCorpus):
+                combined_sentences = CompactCorpus()
             for m in models:
                 if m.retain_original:
-                    combined_sentences += m.parsed_sentences
-            return ret_inst.from_chain(c, parsed_sentences=combined_sentences)
+                    combined_sentences.extend(m.parsed_sentences)
+            return ret_inst.from_chain(chain, parsed_sentences=combined_sentences)
         else:
-            return ret_inst.from_chain(c)
+            return ret_inst.from_chain(chain)
     if isinstance(ret_inst, list):
         return list(c.items())
     if isinstance(ret_inst, dict):
         return c
+
+
+def combine_inplace(models, model_dicts, weights):
+    target = models[0]
+    if isinstance(target, list):
+        raise ValueError("Lists of items can't be combined in place")
+    chain = target.chain if isinstance(target, Text) else target
+    if isinstance(chain, Chain):
+        chain.check_updatable()
+    if weights[0] != 1:
+        scale_model(target, weights[0])
+    if isinstance(target, dict):
+        for m, w in zip(model_dicts[1:], weights[1:]):
+            merge_models(target, m, w)
+        return target
+
+    for m, w in zip(model_dicts[1:], weights[1:]):
+        chain.add_counts(m, w)
+    if isinstance(target, Text) and target.retain_original:
+        for m in models[1:]:
+            if m.retain_original:
+                target.extend_corpus(list(m.parsed_sentences))
+    return target
+
+
+def combine_files(paths, path, weights=None):
+    """
+    Combine the models saved (by `markovify.Chain.save` or
+    `markovify.Text.save`) at `paths`, as `combine` would, and save the
+    result to `path`, in the same format. The models are memory-mapped and
+    merged in one streaming pass (see `markovify.compact.merge_compact_models`),
+    so they are never loaded as dicts. Retained original texts are
+    concatenated.
+    """
+    if weights is None:
+        weights = [1 for _ in range(len(paths))]
+
+    if len(paths) != len(weights):
+        raise ValueError("`paths` and `weights` lengths must be equal.")
+
+    loaded = [read_model(p) for p in paths]
+    models = [model for model, _, _ in loaded]
+
+    if len(set(model.state_size for model in models)) != 1:
+        raise ValueError("All `models` must have the same state size.")
+
+    combined = merge_compact_models(models, weights)
+    combined.build_prefix_index(BEGIN)
+    # Retained texts are JSON lists, so they can be joined without parsing
+    corpora = [bytes(corpus).strip() for _, _, corpus in loaded]
+    extra = b""
+    if any(corpora):
+        items = (corpus[1:-1].strip() for corpus in corpora)
+        extra = b"[" + b",".join(item for item in items if item) + b"]"
+    write_model(path, combined, loaded[0][1], extra)
+
+
+def prune_report(original, pruned):
+    """
+    Compare `original` with `pruned` (`markovify.Chain`s or
+    `markovify.Text`s, e.g. a chain and the result of its `prune`), returning
+    a dict of:
+
+    - `states` and `transitions`: the number of each, as `(before, after)`.
+    - `nbytes`: the size of each model when compacted, as `(before, after)`.
+    - `dropped_mass`: the share of the original's counts that belonged to
+      transitions that the pruned model lacks.
+    - `divergence`: the total variation distance between the two models'
+      distributions of next items, averaged over the original's states,
+      weighted by their counts (and counting 1 for each dropped state).
+    """
+    if isinstance(original, Text):
+        original = original.chain
+    if isinstance(pruned, Text):
+        pruned = pruned.chain
+    transitions = [0, 0]
+    total = dropped = divergence = 0
+    for state in original.model:
+        p = original.next_weights(state)
+        p_total = sum(p.values())
+        total += p_total
+        transitions[0] += len(p)
+        if state not in pruned.model:
+            dropped += p_total
+            divergence += p_total
+            continue
+        q = pruned.next_weights(state)
+        q_total = sum(q.values())
+        transitions[1] += len(q)
+        dropped += sum(count for word, count in p.items() if word not in q)
+        distance = sum(
+            abs(p.get(word, 0) / p_total - q.get(word, 0) / q_total)
+            for word in set(p) | set(q)
+        )
+        divergence += p_total * distance / 2
+
+    def nbytes(chain):
+        return (chain if chain.compacted else chain.compact()).model.nbytes()
+
+    return {
+        "states": (len(original.model), len(pruned.model)),
+        "transitions": tuple(transitions),
+        "nbytes": (nbytes(original), nbytes(pruned)),
+        "dropped_mass": dropped / total,
+        "divergence": divergence / total,
+    }
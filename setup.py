@@ -54,6 +54,7 @@ setup(
     include_package_data=False,
     zip_safe=False,
     install_requires=base_reqs,
+    entry_points={"console_scripts": ["markovify = markovify.cli:main"]},
     tests_require=base_reqs + dev_reqs,
     test_suite="test",
 )
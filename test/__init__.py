@@ -1,7 +1,29 @@
 __all__ = [
+    "test_aio",
+    "test_backoff",
     "test_basic",
+    "test_cli",
     "test_combine",
+    "test_compact",
+    "test_jsonstream",
+    "test_mixture",
+    "test_parallel",
+    "test_prune",
+    "test_splitters",
+    "test_stats",
+    "test_update",
 ]
 
+from . import test_aio
+from . import test_backoff
 from . import test_basic
+from . import test_cli
 from . import test_combine
+from . import test_compact
+from . import test_jsonstream
+from . import test_mixture
+from . import test_parallel
+from . import test_prune
+from . import test_splitters
+from . import test_stats
+from . import test_update
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import markovify
+from markovify import aio
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock_model = markovify.Text(f.read())
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_worker(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.markovify")
+            sherlock_model.save(path)
+            aio.init_worker(markovify.Text, path)
+            assert aio.generate(1, {"seed": 1}) == [
+                sherlock_model.make_sentence(seed=1)
+            ]
+            sents = aio.generate(3, {"seed": 1, "test_output": False})
+            assert sents == sherlock_model.make_sentences(3, seed=1, test_output=False)
+            aio.worker_text = None
+
+    def test_make_sentence(self):
+        async def main():
+            async with aio.AsyncText(sherlock_model, workers=2, max_batch=3) as service:
+                temp_path = service.temp_path
+                assert os.path.exists(temp_path)
+                sents = await asyncio.gather(
+                    *(
+                        service.make_sentence(test_output=False, min_words=i % 2)
+                        for i in range(20)
+                    )
+                )
+                assert all(isinstance(sent, str) for sent in sents)
+                sents = await asyncio.gather(
+                    *(
+                        service.make_sentence(max_chars=60, min_chars=20, tries=50)
+                        for i in range(6)
+                    )
+                )
+                assert all(sent is None or 20 <= len(sent) <= 60 for sent in sents)
+                assert any(sent is not None for sent in sents)
+                sent = await service.make_sentence(seed=3)
+                assert sent == sherlock_model.make_sentence(seed=3)
+                sents = await service.make_sentences(5, seed=1)
+                assert sents == sherlock_model.make_sentences(5, seed=1)
+                sents = [sent async for sent in service.sentences(7, test_output=False)]
+                assert len(sents) == 7
+                gen = service.sentences(test_output=False)
+                for _ in range(5):
+                    assert isinstance(await gen.__anext__(), str)
+                await gen.aclose()
+                with self.assertRaises(ValueError):
+                    await service.make_sentence(rng=object())
+                with self.assertRaises(ValueError):
+                    await service.make_sentences(2, rng=object())
+                with self.assertRaises(KeyError):
+                    await service.make_sentence(init_state=("no", "such state"))
+            assert not os.path.exists(temp_path)
+
+        run(main())
+
+    def test_snapshot(self):
+        model = markovify.Text(
+            None, parsed_sentences=sherlock_model.parsed_sentences, well_formed=False
+        )
+        service = aio.AsyncText(model)
+        try:
+            loaded = markovify.Text.load(service.temp_path)
+            assert not loaded.well_formed
+            assert len(loaded.overlap_index.suffixes) == sum(
+                map(len, model.parsed_sentences)
+            )
+        finally:
+            run(service.close())
+
+    def test_path(self):
+        async def main():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(tmpdir, "model.markovify")
+                sherlock_model.save(path)
+                async with aio.AsyncText(path) as service:
+                    assert service.temp_path is None
+                    sent = await service.make_sentence(seed=3)
+                    assert sent == sherlock_model.make_sentence(seed=3)
+
+        run(main())
+
+    def test_close(self):
+        async def main():
+            service = aio.AsyncText(sherlock_model)
+            service.start()
+            future = asyncio.get_event_loop().create_future()
+            service.queue.put_nowait(({}, future))
+            await service.close()
+            with self.assertRaises(RuntimeError):
+                future.result()
+
+        run(main())
+
+    def test_group(self):
+        requests = [
+            ({"max_words": 5}, 1),
+            ({}, 2),
+            ({"max_words": 5}, 3),
+            ({"seed": 1}, 4),
+            ({"seed": 1}, 5),
+        ]
+        assert aio.AsyncText.group(requests) == [
+            ({"max_words": 5}, [1, 3]),
+            ({}, [2]),
+            ({"seed": 1}, [4]),
+            ({"seed": 1}, [5]),
+        ]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+import markovify
+from markovify.chain import BEGIN
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock = f.read()
+    sherlock_model = markovify.Text(sherlock, state_size=3)
+
+runs = sherlock_model.parsed_sentences
+backoff_chain = markovify.BackoffChain(runs, 3)
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_sizes(self):
+        assert backoff_chain.model == sherlock_model.chain.model
+        assert len(backoff_chain.model) == len(sherlock_model.chain.model)
+        assert backoff_chain.begin_choices == sherlock_model.chain.begin_choices
+        for state_size in (1, 2, 3):
+            chain = backoff_chain.at_size(state_size)
+            expected = markovify.Chain(runs, state_size).model
+            assert len(chain.model) == len(expected)
+            assert dict(chain.model.items()) == expected
+        with self.assertRaises(ValueError):
+            backoff_chain.at_size(4)
+
+    def test_backoff(self):
+        state = ("Not", "in", "Sherlock")
+        with self.assertRaises(KeyError):
+            sherlock_model.chain.walk(state)
+        assert backoff_chain.backoff(state) == ("Sherlock",)
+        assert backoff_chain.backoff(("Not", "Sherlock", "Holmes")) == (
+            "Sherlock",
+            "Holmes",
+        )
+        assert len(backoff_chain.walk(state)) > 0
+        assert len(backoff_chain.walk_many(3, state)) == 3
+        assert (
+            backoff_chain.next_weights(state)
+            == markovify.Chain(runs, 1).model[("Sherlock",)]
+        )
+        for bad_state in [("Sherlock", "Holmes", "zzz"), ()]:
+            with self.assertRaises(KeyError):
+                backoff_chain.backoff(bad_state)
+        for bad_state in [(), ("a", "b", "c", "d"), ("zzz",)]:
+            with self.assertRaises(KeyError):
+                backoff_chain.trie.lookup(bad_state)
+
+        alias = backoff_chain.compile(lazy=True, sampler="alias", cache_size=10)
+        assert isinstance(alias, markovify.BackoffChain)
+        assert alias.cache is not None and backoff_chain.cache is None
+        assert alias.trie is not backoff_chain.trie
+        alias.update([["Zzyzx", "qwerty", "plugh"]])
+        assert ("Zzyzx", "qwerty", "plugh") in alias.model
+        assert ("Zzyzx", "qwerty", "plugh") not in backoff_chain.model
+        assert ("plugh",) not in backoff_chain.at_size(1).model
+        rng = random.Random(0)
+        assert alias.move(state, rng) in backoff_chain.next_weights(state)
+
+        with mock.patch("markovify.backoff.DEFAULT_CACHE_SIZE", 1):
+            trie = markovify.BackoffChain(runs, 3).trie
+            trie.lookup(("Sherlock",))
+            trie.lookup(("Holmes",))
+            assert list(trie.sums) == [("Holmes",)]
+
+    def test_update(self):
+        chain = markovify.BackoffChain(runs[:100], 3)
+        chain.compile(inplace=True, lazy=True)
+        chain.walk()
+        chain.update(runs[100:])
+        assert chain.cache.info()["size"] == 0
+        assert chain.model == backoff_chain.model
+        assert dict(chain.at_size(1).model.items()) == dict(
+            backoff_chain.at_size(1).model.items()
+        )
+        with self.assertRaises(ValueError):
+            markovify.combine([chain, chain], inplace=True)
+
+    def test_materialize(self):
+        expected = sherlock_model.chain.model
+        compiled = backoff_chain.compile()
+        assert type(compiled) is markovify.Chain
+        assert compiled.model == sherlock_model.chain.compile().model
+        assert dict(backoff_chain.compact().model.items()) == expected
+        assert backoff_chain.prune(min_state_count=2).model == (
+            sherlock_model.chain.prune(min_state_count=2).model
+        )
+        for method in ("compile", "compact", "prune"):
+            with self.assertRaises(ValueError):
+                getattr(backoff_chain, method)(inplace=True)
+
+    def test_serialization(self):
+        for chain in [
+            markovify.BackoffChain.from_chain(sherlock_model.chain.compile()),
+            markovify.BackoffChain.from_json(backoff_chain.to_json()),
+        ]:
+            assert isinstance(chain, markovify.BackoffChain)
+            assert chain.model == backoff_chain.model
+            assert len(chain.at_size(2).model) == len(backoff_chain.at_size(2).model)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "chain.markovify")
+            backoff_chain.save(path)
+            chain = markovify.BackoffChain.load(path)
+            assert chain.model == backoff_chain.model
+
+    @mock.patch.object(markovify.parallel, "DEFAULT_SHARD_SIZE", 2000)
+    def test_parallel(self):
+        chain = markovify.BackoffChain(runs, 3, workers=2)
+        assert chain.model == backoff_chain.model
+        assert dict(chain.at_size(2).model.items()) == dict(
+            backoff_chain.at_size(2).model.items()
+        )
+        empty = backoff_chain.build_parallel([], 3, workers=2)
+        assert len(empty) == 0
+
+    @mock.patch.object(markovify.parallel, "DEFAULT_SHARD_SIZE", 2)
+    def test_parallel_text(self):
+        lines = [
+            "The first good line.",
+            "Another good line.",
+            "(Rejected",
+            "(Rejected",
+            "The last good line.",
+        ]
+        model = markovify.NewlineText(lines, backoff=True, workers=2)
+        expected = markovify.NewlineText(lines, backoff=True)
+        assert model.parsed_sentences == expected.parsed_sentences
+        assert model.chain.model == expected.chain.model
+        assert model.chain.next_weights(("good", "line.")) == {markovify.chain.END: 3}
+
+    def test_text(self):
+        model = markovify.Text(sherlock, state_size=3, backoff=True)
+        assert isinstance(model.chain, markovify.BackoffChain)
+        assert model.chain.model == backoff_chain.model
+        assert model.make_sentence(("Not", "in", "Sherlock"), test_output=False)
+        assert model.make_sentence(tries=100) is not None
+        with self.assertRaises(KeyError):
+            sherlock_model.make_sentence_with_start("Not in Sherlock")
+        sentence = model.make_sentence_with_start("Not in Sherlock", test_output=False)
+        assert sentence.startswith("Not in Sherlock")
+        sentence = model.make_sentence_with_start(
+            "Sherlock snow", strict=False, test_output=False
+        )
+        assert sentence.startswith("Sherlock snow")
+        with self.assertRaises(markovify.text.ParamError):
+            sherlock_model.make_sentence_with_start("Sherlock snow", strict=False)
+
+        lazy = model.compile(lazy=True)
+        assert isinstance(lazy.chain, markovify.BackoffChain)
+        assert not isinstance(model.compile().chain, markovify.BackoffChain)
+        model.update("Sherlock Holmes sneezed loudly.")
+        assert model.chain.next_weights(("Holmes", "sneezed"))
+
+        converted = markovify.Text.from_json(sherlock_model.to_json(), backoff=True)
+        assert isinstance(converted.chain, markovify.BackoffChain)
+        assert converted.chain.model == backoff_chain.model
+
+        parallel = markovify.Text(
+            sherlock, state_size=3, backoff=True, workers=2, retain_original=False
+        )
+        assert parallel.chain.model == backoff_chain.model
+
+    def test_snapshot(self):
+        model = markovify.Text(sherlock, state_size=3, backoff=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.markovify")
+            model.save(path, snapshot=True)
+            loaded = markovify.Text.load(path)
+            assert isinstance(loaded.chain, markovify.BackoffChain)
+            assert loaded.chain.model == backoff_chain.model
+            assert loaded.make_sentence((BEGIN, "Not", "Sherlock"), test_output=False)
+            model.save(path)
+            assert not isinstance(
+                markovify.Text.load(path).chain, markovify.BackoffChain
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 import markovify
 import os
 import operator
+import random
+from unittest import mock
 
 
 def get_sorted(chain_json):
@@ -28,6 +30,13 @@ class MarkovifyTestBase(unittest.TestCase):
         sent = new_text_model.make_sentence()
         assert len(sent) != 0
 
+    def test_json_kwargs(self):
+        json_model = self.sherlock_model.to_json()
+        text_model = markovify.Text.from_json(json_model, reject_reg=r"werewolf")
+        assert text_model.reject_pat.pattern == "werewolf"
+        text_model = markovify.Text.from_json(json_model, well_formed=False)
+        assert not text_model.well_formed
+
     def test_chain(self):
         text_model = self.sherlock_model
         chain_json = text_model.chain.to_json()
@@ -90,6 +99,17 @@ class MarkovifyTestBase(unittest.TestCase):
         assert sent is not None
         assert start_str == sent[: len(start_str)]
 
+    def test_find_init_states_from_chain(self):
+        text_model = self.sherlock_model_ss3
+        for split in [("was",), ("was", "I"), ("Sherlock",), ("werewolf",)]:
+            expected = [
+                key
+                for key in text_model.chain.model
+                if tuple(w for w in key if w != markovify.chain.BEGIN)[: len(split)]
+                == split
+            ]
+            assert text_model.find_init_states_from_chain(split) == expected
+
     def test_make_sentence_with_words_to_many(self):
         text_model = self.sherlock_model
         start_str = "dog is good"
@@ -118,6 +138,16 @@ class MarkovifyTestBase(unittest.TestCase):
             sent = text_model.make_short_sentence(45)
         assert len(sent) <= 45
 
+    def test_short_sentence_tries(self):
+        text_model = self.sherlock_model
+        with mock.patch.object(text_model, "make_sentence") as make_sentence:
+            make_sentence.return_value = None
+            assert text_model.make_short_sentence(45, tries=3) is None
+        make_sentence.assert_called_once_with(max_chars=45, min_chars=0, tries=3)
+        with mock.patch.object(text_model, "make_sentence") as make_sentence:
+            text_model.make_short_sentence(45)
+        make_sentence.assert_called_once_with(max_chars=45, min_chars=0, tries=100)
+
     def test_short_sentence_min_chars(self):
         sent = None
         while sent is None:
@@ -140,6 +170,147 @@ class MarkovifyTestBase(unittest.TestCase):
         sent = text_model.make_sentence(min_words=5)
         assert len(sent.split(" ")) >= 5
 
+    def test_max_chars(self):
+        text_model = self.sherlock_model
+        sent = text_model.make_sentence(max_chars=60, min_chars=20, tries=50)
+        assert sent is not None
+        assert 20 <= len(sent) <= 60
+
+    def test_bias_end(self):
+        text_model = self.sherlock_model
+        sent = text_model.make_sentence(max_words=6, bias_end=True, tries=50)
+        assert sent is not None
+        assert len(sent.split(" ")) <= 6
+
+    def test_walk_max_steps(self):
+        chain = self.sherlock_model.chain
+        assert chain.walk(max_steps=0) is None
+        assert len(list(chain.gen(max_steps=0))) == 1
+        for run in chain.walk_many(10, max_steps=5):
+            assert run is None or len(run) <= 5
+        assert chain.walk_many(3, max_steps=0) == [None] * 3
+        assert chain.walk(max_steps=-2) is None
+        assert chain.walk_many(3, max_steps=-2) == [None] * 3
+
+    def test_make_sentences(self):
+        text_model = self.sherlock_model
+        sents, stats = text_model.make_sentences(20, min_words=5, return_stats=True)
+        assert len(sents) == 20
+        assert stats["accepted"] == sum(sent is not None for sent in sents)
+        assert stats["attempts"] == (
+            stats["accepted"] + stats["rejected_length"] + stats["rejected_overlap"]
+        )
+        for sent in sents:
+            assert sent is None or len(sent.split(" ")) >= 5
+
+    def test_make_sentences_max_words(self):
+        text_model = self.sherlock_model
+        sents, stats = text_model.make_sentences(5, max_words=0, return_stats=True)
+        assert sents == [None] * 5
+        assert stats["rejected_length"] == stats["attempts"] == 50
+        # An `init_state` longer than `max_words` leaves no room for any run
+        for words in (0, 1):
+            sents = text_model.make_sentences(
+                3, init_state=("Sherlock", "Holmes"), max_words=words
+            )
+            assert sents == [None] * 3
+        sents = text_model.make_sentences(
+            3, init_state=("Sherlock", "Holmes"), max_words=8, tries=50
+        )
+        assert all(len(sent.split()) <= 8 for sent in sents if sent)
+
+    def test_make_sentences_chars(self):
+        text_model = self.sherlock_model
+        sents, stats = text_model.make_sentences(
+            20, max_chars=60, min_chars=20, tries=50, return_stats=True
+        )
+        assert stats["accepted"] > 0
+        assert stats["rejected_length"] > 0
+        for sent in sents:
+            assert sent is None or 20 <= len(sent) <= 60
+
+    def test_make_sentences_bias_end(self):
+        for text_model in (self.sherlock_model, self.sherlock_model.compile()):
+            rejected = []
+            for bias_end in (False, True):
+                sents, stats = text_model.make_sentences(
+                    50,
+                    max_words=6,
+                    bias_end=bias_end,
+                    return_stats=True,
+                    rng=random.Random(0),
+                )
+                for sent in sents:
+                    assert sent is None or len(sent.split(" ")) <= 6
+                rejected.append(stats["rejected_length"])
+            assert rejected[1] < rejected[0]
+
+    def test_make_sentences_with_init_state(self):
+        init_state = ("Sherlock", "Holmes")
+        sents = self.sherlock_model.make_sentences(10, init_state, test_output=False)
+        for sent in sents:
+            assert sent.startswith("Sherlock Holmes")
+
+    def test_rng(self):
+        chain = self.sherlock_model.chain
+        runs = [chain.walk(rng=random.Random(0)) for _ in range(2)]
+        assert runs[0] == runs[1]
+        runs = [chain.walk_many(5, rng=random.Random(0)) for _ in range(2)]
+        assert runs[0] == runs[1]
+        runs = [chain.walk(max_steps=8, bias_end=True, rng=random.Random(0))]
+        runs.append(chain.walk(max_steps=8, bias_end=True, rng=random.Random(0)))
+        assert runs[0] == runs[1]
+
+    def test_seed(self):
+        text_model = self.sherlock_model
+        for method in (
+            text_model.make_sentence,
+            text_model.make_short_sentence,
+            lambda *args, **kwargs: text_model.make_sentence_with_start(
+                "Sherlock", False, *args, **kwargs
+            ),
+        ):
+            args = (100,) if method == text_model.make_short_sentence else ()
+            sents = [method(*args, seed=seed) for seed in (1, 1)]
+            assert sents[0] == sents[1]
+            assert sents[0] is not None
+
+    def test_make_sentences_seed(self):
+        text_model = self.sherlock_model
+        sents, stats = text_model.make_sentences(
+            12, seed=42, min_words=5, return_stats=True
+        )
+        assert len(sents) == 12
+        assert len(set(sents)) > 1
+        assert (
+            stats["attempts"] >= stats["accepted"] == sum(s is not None for s in sents)
+        )
+        for workers in (2, 5):
+            assert (
+                text_model.make_sentences(12, seed=42, min_words=5, workers=workers)
+                == sents
+            )
+        text_model.enable_stats()
+        try:
+            sents = text_model.make_sentences(4, workers=2, rng=random.Random(0))
+            assert text_model.make_sentences(4, rng=random.Random(0)) != sents
+            assert (
+                text_model.make_sentences(4, workers=3, rng=random.Random(0)) == sents
+            )
+            assert text_model.stats.calls == 12
+        finally:
+            text_model.disable_stats()
+
+    def test_walk_many(self):
+        chain = self.sherlock_model.chain
+        runs = chain.walk_many(10)
+        assert len(runs) == 10
+        assert all(len(run) for run in runs)
+        begin = (markovify.chain.BEGIN,) * chain.state_size
+        selections = chain.move_many(begin, 10)
+        assert len(selections) == 10
+        assert all((markovify.chain.BEGIN, word) in chain.model for word in selections)
+
     def test_newline_text(self):
         with open(
             os.path.join(os.path.dirname(__file__), "texts/senate-bills.txt"),
@@ -177,6 +348,152 @@ class MarkovifyTest(MarkovifyTestBase):
         sherlock_model_ss2 = markovify.Text(sherlock_text, state_size=2)
         sherlock_model_ss3 = markovify.Text(sherlock_text, state_size=3)
 
+    def test_chain_from_dict(self):
+        chain = markovify.Chain.from_json(self.sherlock_model.chain.model)
+        assert chain.model is self.sherlock_model.chain.model
+        assert chain.state_size == 2
+
+    def test_overlap_index(self):
+        text_model = markovify.Text(
+            "I saw a red dog. The dog sat down. It was a nice day for a walk."
+        )
+        index = text_model.overlap_index
+        # The index is built the first time it's queried
+        assert index.suffixes is None
+        assert index.contains(["red", "dog."])
+        assert index.contains(["dog.", "The", "dog"])
+        assert not index.contains(["red", "do"])
+        assert not index.contains(["dog", "sat", "up."])
+        assert index.contains([])
+        words = text_model.rejoined_text.split()
+        assert len(index.suffixes) == len(words)
+        assert index.nbytes() == sum(
+            len(a) * a.itemsize
+            for a in (index.suffixes, index.starts, index.corpus.ids)
+        )
+        # Sequences longer than the index's depth are checked against the corpus
+        assert index.contains(words)
+        assert not index.contains(["walk.", "I", "saw", "a", "blue"])
+        assert not index.contains(["werewolf"])
+
+        index = markovify.overlap.OverlapIndex([["a"] * 20 + ["b"]], 16)
+        assert index.contains(["a"] * 19 + ["b"])
+        assert index.contains(["a"] * 20 + ["b"])
+        assert not index.contains(["a"] * 21)
+        assert not index.contains(["b", "a"])
+
+    def test_overlap_index_add(self):
+        runs = list(self.sherlock_model.parsed_sentences[:100])
+        index = markovify.overlap.OverlapIndex(runs, 16)
+        gram = runs[-1][-2:] + ["A", "werewolf"]
+        assert not index.contains(gram)
+        suffixes = index.suffixes
+        runs.append(["A", "werewolf", "howled."])
+        index.add(runs[-1:])
+        # A few runs are indexed, along with the words before them, separately
+        assert index.contains(gram)
+        assert index.contains(["werewolf", "howled."])
+        assert index.suffixes is suffixes
+        assert len(index.tail) == 15 + 3
+        # Many are sorted in with the rest
+        runs.extend(self.sherlock_model.parsed_sentences[100:200])
+        index.add(self.sherlock_model.parsed_sentences[100:200])
+        assert index.suffixes is None
+        assert index.contains(gram)
+        assert index.contains(runs[-1])
+        assert len(index.suffixes) == sum(map(len, runs))
+        assert len(index.tail) == 0
+
+    def test_input_filters(self):
+        stats = {}
+        text_model = markovify.Text(
+            "I saw a red dog. The cat sat down. I saw “a dog.” Not (this one).",
+            input_filters=[lambda sentence: "cat" not in sentence],
+            input_stats=stats,
+        )
+        assert text_model.parsed_sentences == [["I", "saw", "a", "red", "dog."]]
+        assert stats["sentences"] == 4
+        assert stats["accepted"] == 1
+        assert stats["rejected"] == {"test_sentence_input": 2, "<lambda>": 1}
+        assert set(stats["seconds"]) == {
+            "split",
+            "test_sentence_input",
+            "<lambda>",
+            "word_split",
+        }
+        assert text_model.compile().input_filters == text_model.input_filters
+
+    def test_input_stats_from_lines(self):
+        stats = {}
+        text_model = markovify.NewlineText(
+            ["First line", "Second (line)"], well_formed=False, input_stats=stats
+        )
+        assert len(text_model.parsed_sentences) == 2
+        assert stats["accepted"] == stats["sentences"] == 2
+        assert stats["seconds"]["split"] >= 0
+
+    def test_test_sentence_input(self):
+        text_model = self.sherlock_model
+        assert text_model.test_sentence_input("He said hello.")
+        assert not text_model.test_sentence_input("He said ‘hello’.")
+        assert not text_model.test_sentence_input("'Twas (so).")
+        assert text_model.test_sentence_input("It's fine.")
+        assert not text_model.test_sentence_input("  ")
+        custom = markovify.Text(None, chain=text_model.chain, reject_reg=r"dog")
+        assert not custom.test_sentence_input("A dog.")
+
+    def test_expected_lengths(self):
+        chain = markovify.Chain([["a", "b"], ["a"]], 1)
+        begin, end = markovify.chain.BEGIN, markovify.chain.END
+        lengths = chain.expected_lengths()
+        assert lengths == {(begin,): 1.5, ("a",): 0.5, ("b",): 0}
+        assert chain.expected_lengths() is lengths
+        assert chain.move_toward_end(("a",), 0) == end
+        assert chain.move_toward_end((begin,), 0) == "a"
+        assert chain.biased_next[(("a",), 0)] == (["b", end], [0, 1])
+        with mock.patch.object(markovify.chain, "DEFAULT_CACHE_SIZE", 2):
+            chain.move_toward_end(("b",), 0)
+        assert list(chain.biased_next) == [(("b",), 0)]
+        chain.update([["a", "a", "a"]])
+        assert chain.biased_next == {}
+        assert chain.expected_lengths()[("a",)] > 0.5
+
+    def test_max_chars_with_custom_word_join(self):
+        class DashedText(markovify.Text):
+            def word_join(self, words):
+                return "-".join(words)
+
+        text_model = DashedText(self.sherlock_text)
+        assert self.sherlock_model.constrained_walk(None, [], 0, 1000) is None
+        sent = text_model.make_short_sentence(50, tries=50)
+        assert sent is not None
+        assert len(sent) <= 50
+
+    def test_test_sentence_output(self):
+        text_model = self.sherlock_model
+        original = text_model.parsed_sentences[100]
+        assert not text_model.test_sentence_output(original, 0.7, 15)
+        novel = original[:5] + ["werewolf"] + original[5:]
+        assert text_model.test_sentence_output(novel, 1.0, 1000)
+
+    def test_test_sentence_output_custom_word_join(self):
+        class TaggedText(markovify.Text):
+            def word_split(self, sentence):
+                return [word + "::" + str(len(word)) for word in sentence.split()]
+
+            def word_join(self, words):
+                return " ".join(word.split("::")[0] for word in words)
+
+        text_model = TaggedText(self.sherlock_text)
+        original = text_model.parsed_sentences[100]
+        assert not text_model.test_sentence_output(original, 0.7, 15)
+        # The same words with other tags join into the same text, so overlap
+        retagged = [word.split("::")[0] + "::X" for word in original]
+        assert not text_model.overlap_index.contains(retagged[:3])
+        assert not text_model.test_sentence_output(retagged, 0.7, 15)
+        novel = retagged[:5] + ["werewolf::X"] + retagged[5:]
+        assert text_model.test_sentence_output(novel, 1.0, 1000)
+
 
 class MarkovifyTestCompiled(MarkovifyTestBase):
     __test__ = True
@@ -197,6 +514,81 @@ class MarkovifyTestCompiled(MarkovifyTestBase):
         assert len(sent) != 0
 
 
+class MarkovifyTestCompiledAlias(MarkovifyTestBase):
+    __test__ = True
+
+    with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+        sherlock_text = f.read()
+        sherlock_model = (markovify.Text(sherlock_text)).compile(sampler="alias")
+        sherlock_model_ss2 = (markovify.Text(sherlock_text, state_size=2)).compile(
+            sampler="alias"
+        )
+        sherlock_model_ss3 = (markovify.Text(sherlock_text, state_size=3)).compile(
+            sampler="alias"
+        )
+
+    def test_sampler(self):
+        chain = self.sherlock_model.chain
+        assert chain.sampler == "alias"
+        assert markovify.Chain.from_json(chain.to_json()).sampler == "alias"
+        assert chain.compile(sampler="alias").sampler == "alias"
+        assert chain.compile(inplace=False).sampler == "bisect"
+
+    def test_distribution(self):
+        chain = markovify.Chain([["a"], ["b"], ["b"], ["c"], ["c"], ["c"]], 1)
+        chain.compile(inplace=True, sampler="alias")
+        probs = markovify.chain.decompile_next(chain.model[(markovify.chain.BEGIN,)])
+        assert probs == {"a": 1 / 6, "b": 2 / 6, "c": 3 / 6}
+        counts = {"a": 0, "b": 0, "c": 0}
+        for _ in range(6000):
+            counts[chain.move((markovify.chain.BEGIN,))] += 1
+        assert 800 < counts["a"] < 1200
+        assert 2700 < counts["c"] < 3300
+
+    def test_bad_sampler(self):
+        with self.assertRaises(ValueError):
+            self.sherlock_model.compile(sampler="linear")
+
+
+class MarkovifyTestCompiledLazy(MarkovifyTestBase):
+    __test__ = True
+
+    with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+        sherlock_text = f.read()
+        sherlock_model = (markovify.Text(sherlock_text)).compile(lazy=True)
+        sherlock_model_ss2 = (markovify.Text(sherlock_text, state_size=2)).compile(
+            lazy=True, cache_size=100
+        )
+        sherlock_model_ss3 = (markovify.Text(sherlock_text, state_size=3)).compile(
+            lazy=True, sampler="alias"
+        )
+
+    def test_cache(self):
+        chain = markovify.Chain([["a", "b"], ["a", "c"], ["d"]], 1)
+        lazy = chain.compile(lazy=True, cache_size=2)
+        assert not lazy.compiled
+        assert lazy.model == chain.model
+        assert lazy.model is not chain.model
+        assert lazy.move(("a",)) in ("b", "c")
+        assert lazy.move(("a",)) in ("b", "c")
+        assert lazy.move(("b",)) == markovify.chain.END
+        lazy.move((markovify.chain.BEGIN,))
+        info = lazy.cache.info()
+        assert (info["hits"], info["misses"], info["size"]) == (1, 3, 2)
+        assert list(lazy.cache.entries) == [("b",), (markovify.chain.BEGIN,)]
+        lazy.cache.clear()
+        assert lazy.cache.info()["size"] == 0
+
+    def test_already_compiled(self):
+        with self.assertRaises(ValueError):
+            self.sherlock_model.chain.compile().compile(lazy=True)
+
+    def test_eager_compile(self):
+        chain = self.sherlock_model.chain.compile()
+        assert chain.compiled
+        assert chain.cache is None
+
+
 class MarkovifyTestCompiledInPlace(MarkovifyTestBase):
     __test__ = True
 
@@ -210,5 +602,83 @@ class MarkovifyTestCompiledInPlace(MarkovifyTestBase):
         sherlock_model_ss3.compile(inplace=True)
 
 
+class MarkovifyTestCompactCorpus(MarkovifyTestBase):
+    __test__ = True
+
+    with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+        sherlock_text = f.read()
+        sherlock_model = markovify.Text(sherlock_text, compact_corpus=True)
+        sherlock_model_ss2 = markovify.Text(
+            sherlock_text, state_size=2, compact_corpus=True
+        )
+        sherlock_model_ss3 = markovify.Text(
+            sherlock_text, state_size=3, compact_corpus=True
+        )
+
+    def test_compact_corpus(self):
+        corpus = self.sherlock_model.parsed_sentences
+        assert isinstance(corpus, markovify.corpus.CompactCorpus)
+        original = markovify.Text(self.sherlock_text).parsed_sentences
+        assert list(corpus) == original
+        assert corpus[-1] == original[-1]
+        assert corpus[10:12] == original[10:12]
+        with self.assertRaises(IndexError):
+            corpus[len(corpus)]
+        assert corpus.ids.typecode == "H"
+        assert corpus.nbytes() < len(self.sherlock_text)
+        assert self.sherlock_model.rejoined_text == " ".join(
+            " ".join(run) for run in original
+        )
+
+    def test_compact_corpus_json(self):
+        obj = self.sherlock_model.to_dict()
+        assert set(obj["parsed_sentences"]) == {"vocab", "lengths", "ids"}
+        model = markovify.Text.from_json(self.sherlock_model.to_json())
+        assert isinstance(model.parsed_sentences, markovify.corpus.CompactCorpus)
+        assert list(model.parsed_sentences) == list(
+            self.sherlock_model.parsed_sentences
+        )
+        obj["parsed_sentences"]["lengths"].append(1)
+        with self.assertRaises(ValueError):
+            markovify.Text.from_dict(obj)
+
+    def test_compact_corpus_sections(self):
+        corpus = self.sherlock_model.parsed_sentences
+        sections = corpus.sections()
+        # Read back as `read_model` would, as memoryviews of the arrays
+        sections = {
+            name: buf if isinstance(buf, bytes) else memoryview(buf)
+            for name, buf in sections.items()
+        }
+        loaded = markovify.corpus.CompactCorpus.from_sections(sections)
+        assert loaded._word_ids is None
+        assert list(loaded) == list(corpus)
+        assert loaded.word_ids == corpus.word_ids
+        assert loaded.ids == corpus.ids
+        with self.assertRaises(TypeError):
+            loaded.append(["A", "werewolf"])
+        copy = loaded.copy()
+        copy.append(["A", "werewolf"])
+        assert copy[-1] == ["A", "werewolf"]
+        assert len(loaded) == len(corpus)
+
+    def test_compact_corpus_update(self):
+        model = markovify.Text(
+            "A tiny dog barked. It barked twice.", compact_corpus=True
+        )
+        corpus = model.parsed_sentences
+        assert corpus.ids.typecode == "B"
+        model.update(
+            " ".join("Word{} is new. The cat sat.".format(i) for i in range(300))
+        )
+        assert corpus.ids.typecode == "H"
+        assert len(corpus) == 602
+        assert corpus[2] == ["Word0", "is", "new."]
+        assert not model.test_sentence_output(["Word299", "is", "new."], 0.7, 15)
+        copy = markovify.Text(None, parsed_sentences=corpus, chain=model.chain)
+        assert copy.parsed_sentences is corpus
+        assert model.compile().parsed_sentences is corpus
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,191 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import markovify
+from markovify import cli
+
+sherlock_path = os.path.join(os.path.dirname(__file__), "texts", "sherlock.txt")
+senate_path = os.path.join(os.path.dirname(__file__), "texts", "senate-bills.txt")
+
+
+def run(*argv):
+    """
+    Runs the command line with `argv`, returning its stdout and stderr.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        assert cli.main(list(argv)) == 0
+    return stdout.getvalue(), stderr.getvalue()
+
+
+class MarkovifyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "model.markovify")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        cli.worker_text = None
+
+    def test_build(self):
+        _, stderr = run("build", sherlock_path, "-o", self.path)
+        assert "Built a model from 6,685 sentences (3,026 accepted)" in stderr
+        assert "MB/s" in stderr
+        model = markovify.Text.load(self.path)
+        with open(sherlock_path) as f:
+            expected = markovify.Text(f.read())
+        assert dict(model.chain.model.items()) == expected.chain.model
+        assert model.parsed_sentences == expected.parsed_sentences
+
+        imap = markovify.parallel.imap
+        with mock.patch.object(markovify.parallel, "imap", wraps=imap) as parallel:
+            _, stderr = run("build", sherlock_path, "-o", self.path, "--workers", "2")
+        assert parallel.call_args[0][0].__func__ is markovify.Text.build_shard
+        assert "Built a model from 6,685 sentences (3,026 accepted)" in stderr
+        model = markovify.Text.load(self.path)
+        assert dict(model.chain.model.items()) == expected.chain.model
+
+    def test_build_options(self):
+        json_path = os.path.join(self.tmpdir.name, "model.json.gz")
+        with open(senate_path, encoding="utf-8") as f:
+            text = f.read()
+        with mock.patch.object(sys, "stdin", io.StringIO(text)):
+            _, stderr = run(
+                "build",
+                "-",
+                "-o",
+                json_path,
+                "--class",
+                "newline",
+                "--state-size",
+                "1",
+                "--no-retain",
+                "--workers",
+                "2",
+                "--quiet",
+            )
+        assert stderr == ""
+        model = markovify.NewlineText.read_json(json_path)
+        expected = markovify.NewlineText(text, state_size=1, retain_original=False)
+        assert model.chain.model == expected.chain.model
+        assert not model.retain_original
+
+        run(
+            "build",
+            sherlock_path,
+            "-o",
+            self.path,
+            "--format",
+            "snapshot",
+            "--compact-corpus",
+            "--no-well-formed",
+            "--chunk-size",
+            "4096",
+        )
+        model = markovify.Text.load(self.path)
+        assert isinstance(model.parsed_sentences, markovify.corpus.CompactCorpus)
+        assert not model.well_formed
+        assert model.overlap_index.suffixes is not None
+
+    def test_generate(self):
+        with open(sherlock_path) as f:
+            model = markovify.Text(f.read())
+        model.save(self.path)
+        expected = model.make_sentences(7, seed=5)
+        stdout, stderr = run("generate", self.path, "-n", "7", "--seed", "5")
+        assert stdout.splitlines() == [s for s in expected if s is not None]
+        assert "Generated" in stderr and "1 worker)" in stderr
+
+        output = os.path.join(self.tmpdir.name, "sentences.jsonl")
+        stdout, stderr = run(
+            "generate",
+            self.path,
+            "-n",
+            "7",
+            "--seed",
+            "5",
+            "--workers",
+            "2",
+            "--batch-size",
+            "2",
+            "--jsonl",
+            "-o",
+            output,
+        )
+        assert stdout == ""
+        assert "2 workers)" in stderr
+        with open(output, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["index"] for line in lines] == list(range(7))
+        assert [line["sentence"] for line in lines] == expected
+
+    def test_generate_constraints(self):
+        json_path = os.path.join(self.tmpdir.name, "model.json")
+        with open(sherlock_path) as f:
+            markovify.Text(f.read()).write_json(json_path)
+        stdout, _ = run(
+            "generate",
+            json_path,
+            "-n",
+            "20",
+            "--max-chars",
+            "80",
+            "--min-words",
+            "5",
+            "--tries",
+            "50",
+            "--bias-end",
+        )
+        sentences = stdout.splitlines()
+        assert sentences
+        assert all(len(s) <= 80 and len(s.split()) >= 5 for s in sentences)
+
+        stdout, stderr = run(
+            "generate",
+            json_path,
+            "-n",
+            "20",
+            "--max-words",
+            "10",
+            "--no-test-output",
+            "--max-overlap-ratio",
+            "0.5",
+            "--max-overlap-total",
+            "10",
+        )
+        assert all(len(s.split()) <= 10 for s in stdout.splitlines())
+        assert "(20 attempts)" in stderr or "of 20 sentences" in stderr
+
+    def test_text_class(self):
+        assert cli.text_class("Newline") is markovify.NewlineText
+        assert cli.text_class("markovify.text:NewlineText") is markovify.NewlineText
+        for name in ("nope", "markovify.text:ParamError", "markovify.nope:Text"):
+            with self.assertRaises(Exception):
+                cli.text_class(name)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            for argv in (
+                ["generate", self.path, "--class", "nope"],
+                ["generate", self.path, "--workers", "0"],
+                ["build", "-", sherlock_path, "-o", self.path],
+            ):
+                with self.assertRaises(SystemExit):
+                    cli.main(argv)
+
+    def test_module(self):
+        stdout = io.StringIO()
+        with mock.patch.object(sys, "argv", ["markovify", "--help"]):
+            with contextlib.redirect_stdout(stdout):
+                with self.assertRaises(SystemExit) as cm:
+                    import markovify.__main__  # noqa: F401
+        assert cm.exception.code == 0
+        assert "build" in stdout.getvalue()
+
+
+if __name__ == "__main__":
+    unittest.main()
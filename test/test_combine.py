@@ -2,6 +2,7 @@ import unittest
 import markovify
 import os
 import operator
+import tempfile
 
 
 def get_sorted(chain_json):
@@ -14,6 +15,12 @@ with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
     sherlock_model_no_retain = markovify.Text(sherlock, retain_original=False)
     sherlock_model_compiled = sherlock_model.compile()
 
+with open(
+    os.path.join(os.path.dirname(__file__), "texts/senate-bills.txt"),
+    encoding="utf-8",
+) as f:
+    senate_model = markovify.Text(f.read())
+
 
 class MarkovifyTest(unittest.TestCase):
     def test_simple(self):
@@ -59,17 +66,110 @@ class MarkovifyTest(unittest.TestCase):
             text_model_b = markovify.NewlineText(sherlock)
             markovify.combine([text_model_a, text_model_b])
 
-    def test_compiled_model_fail(self):
-        with self.assertRaises(Exception):
-            model_a = sherlock_model
-            model_b = sherlock_model_compiled
-            markovify.combine([model_a, model_b])
-
-    def test_compiled_chain_fail(self):
-        with self.assertRaises(Exception):
-            model_a = sherlock_model.chain
-            model_b = sherlock_model_compiled.chain
-            markovify.combine([model_a, model_b])
+    def test_compiled_model(self):
+        model_a = sherlock_model
+        model_b = sherlock_model_compiled
+        combo = markovify.combine([model_a, model_b])
+        expected = markovify.combine([model_a, model_a])
+        assert combo.chain.model == expected.chain.model
+        model_dict = markovify.utils.get_model_dict(model_b)
+        assert len(model_dict) == len(model_a.chain.model)
+
+    def test_compiled_chain(self):
+        model_a = sherlock_model.chain
+        model_b = sherlock_model_compiled.chain
+        combo = markovify.combine([model_a, model_b], [1, 2])
+        assert combo.model == markovify.combine([model_a, model_a], [1, 2]).model
+
+    def test_inplace(self):
+        expected = markovify.combine([sherlock_model, sherlock_model], [2, 1])
+        text_model = markovify.Text(sherlock)
+        text_model.compile(inplace=True)
+        text_model.chain.walk()
+        combo = markovify.combine([text_model, sherlock_model], [2, 1], inplace=True)
+        assert combo is text_model
+        assert combo.chain.compiled
+        for state in expected.chain.model:
+            assert combo.chain.next_weights(state) == expected.chain.model[state]
+        assert combo.parsed_sentences == expected.parsed_sentences
+        assert combo.rejoined_text == expected.rejoined_text
+        assert combo.make_sentence() is not None
+
+        text_model = markovify.Text(sherlock)
+        combo = markovify.combine([text_model, sherlock_model], [2, 1], inplace=True)
+        assert combo.chain.model == expected.chain.model
+        assert combo.chain.begin_cumdist == expected.chain.begin_cumdist
+
+        _dict = {
+            state: dict(options)
+            for state, options in sherlock_model.chain.model.items()
+        }
+        combo = markovify.combine(
+            [_dict, sherlock_model.chain.model], [2, 1], inplace=True
+        )
+        assert combo is _dict
+        assert combo == expected.chain.model
+
+    def test_inplace_shared_corpus(self):
+        runs = sherlock_model.parsed_sentences[:100]
+        source = markovify.Text(None, parsed_sentences=runs)
+        target = source.compile()
+        combo = markovify.combine([target, target], inplace=True)
+        assert combo.parsed_sentences == runs + runs
+        assert len(runs) == 100
+        assert source.parsed_sentences == runs
+        assert source.rejoined_text != combo.rejoined_text
+
+    def test_inplace_fail(self):
+        _list = list(sherlock_model.chain.model.items())
+        with self.assertRaises(ValueError):
+            markovify.combine([_list, _list], inplace=True)
+        compacted = sherlock_model.chain.compact()
+        with self.assertRaises(ValueError):
+            markovify.combine([compacted, sherlock_model.chain], inplace=True)
+
+    def test_combine_files(self):
+        expected = markovify.combine([sherlock_model, senate_model], [2, 1])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = [os.path.join(tmpdir, name) for name in ("a", "b", "c", "d")]
+            sherlock_model.save(paths[0])
+            senate_model.save(paths[1])
+            markovify.utils.combine_files(paths[:2], paths[2], [2, 1])
+            combo = markovify.Text.load(paths[2])
+            assert dict(combo.chain.model.items()) == expected.chain.model
+            assert combo.parsed_sentences == expected.parsed_sentences
+            assert combo.chain.model.prefix_offsets is not None
+
+            sherlock_model_no_retain.chain.save(paths[3])
+            markovify.utils.combine_files(paths[3:] * 2, paths[2], [0.5, 0.5])
+            combo = markovify.Chain.load(paths[2])
+            assert dict(combo.model.items()) == sherlock_model.chain.model
+            assert combo.model.cumweights.format == "d"
+
+            with self.assertRaises(ValueError):
+                markovify.utils.combine_files(paths[:2], paths[2], [1])
+            markovify.Text(sherlock, state_size=3).save(paths[3])
+            with self.assertRaises(ValueError):
+                markovify.utils.combine_files(paths[::3], paths[2])
+
+    def test_compact_corpus(self):
+        expected = markovify.combine([sherlock_model, senate_model])
+        compact_model = markovify.Text(sherlock, compact_corpus=True)
+        combo = markovify.combine([compact_model, senate_model])
+        assert isinstance(combo.parsed_sentences, markovify.corpus.CompactCorpus)
+        assert list(combo.parsed_sentences) == expected.parsed_sentences
+        combo = markovify.combine([senate_model, compact_model])
+        assert isinstance(combo.parsed_sentences, list)
+
+        combo = markovify.combine([compact_model, senate_model], inplace=True)
+        assert list(combo.parsed_sentences) == expected.parsed_sentences
+        assert combo.rejoined_text == expected.rejoined_text
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model")
+            combo.save(path)
+            loaded = markovify.Text.load(path, compact_corpus=True)
+            assert isinstance(loaded.parsed_sentences, markovify.corpus.CompactCorpus)
+            assert list(loaded.parsed_sentences) == expected.parsed_sentences
 
     def test_combine_no_retain(self):
         text_model = sherlock_model_no_retain
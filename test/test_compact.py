@@ -0,0 +1,259 @@
+import unittest
+import markovify
+import array
+import os
+import operator
+import sys
+import tempfile
+from unittest import mock
+from markovify.compact import read_model, write_model
+
+
+def get_sorted(chain_json):
+    return sorted(chain_json, key=operator.itemgetter(0))
+
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock = f.read()
+    sherlock_model = markovify.Text(sherlock)
+    sherlock_model_compact = sherlock_model.compact()
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_same_model(self):
+        chain = sherlock_model_compact.chain
+        assert chain.compacted
+        assert len(chain.model) == len(sherlock_model.chain.model)
+        assert dict(chain.model.items()) == sherlock_model.chain.model
+        assert ("Sherlock", "Holmes") in chain.model
+        assert 0 < chain.model.nbytes() < len(sherlock) * 4
+        assert list(chain.model.keys())[0] == next(iter(chain.model))
+        assert len(list(chain.model.records)) == len(chain.model)
+
+    def test_make_sentence(self):
+        sent = sherlock_model_compact.make_sentence(tries=100)
+        assert sent is not None
+        assert len(sent) != 0
+
+    def test_make_sentences(self):
+        sents = sherlock_model_compact.make_sentences(10, test_output=False)
+        assert all(sents)
+        begin = (markovify.chain.BEGIN,) * 2
+        selections = sherlock_model_compact.chain.move_many(begin, 10)
+        assert all(
+            (markovify.chain.BEGIN, word) in sherlock_model.chain.model
+            for word in selections
+        )
+
+    def test_make_sentence_with_start(self):
+        start_str = "Sherlock Holmes"
+        sent = sherlock_model_compact.make_sentence_with_start(start_str)
+        assert sent is not None
+        assert start_str == sent[: len(start_str)]
+
+    def test_unknown_state(self):
+        chain = sherlock_model_compact.chain
+        with self.assertRaises(KeyError):
+            chain.move(("werewolf", "Holmes"))
+        with self.assertRaises(KeyError):
+            chain.move(("Holmes",))
+        assert ("werewolf", "Holmes") not in chain.model
+        assert ("Holmes", "Holmes") not in chain.model
+
+    def test_json(self):
+        chain_json = sherlock_model_compact.chain.to_json()
+        expected = sherlock_model.chain.to_json()
+        stored_chain = markovify.Chain.from_json(chain_json)
+        assert get_sorted(stored_chain.to_json()) == get_sorted(expected)
+
+    def test_compact_compiled(self):
+        chain = sherlock_model.chain.compile().compact()
+        assert chain.compacted
+        assert not chain.compiled
+        assert dict(chain.model.items()) == sherlock_model.chain.model
+        assert chain.compile().compile(inplace=True).walk()
+
+    def test_compact_inplace(self):
+        model = markovify.Text(sherlock, retain_original=False)
+        assert model.compact(inplace=True) is model
+        assert model.chain.compacted
+        assert model.chain.compact(inplace=True) is model.chain
+        assert model.chain.compact().model is model.chain.model
+        assert model.make_sentence() is not None
+
+    def test_prefix_index_without_begin(self):
+        model = markovify.compact.CompactModel.from_dict({("a", "b"): {"c": 1}})
+        model.build_prefix_index(markovify.chain.BEGIN)
+        assert model.states_starting_with("a") == [("a", "b")]
+        assert model.states_starting_with("b") == []
+
+    def test_float_weights(self):
+        combo = markovify.combine([sherlock_model.chain], [0.5])
+        chain = combo.compact()
+        assert chain.model.cumweights.typecode == "d"
+        assert dict(chain.model.items()) == combo.model
+        assert len(chain.walk()) != 0
+
+    def test_combine(self):
+        combo = markovify.combine([sherlock_model_compact, sherlock_model])
+        expected = markovify.combine([sherlock_model, sherlock_model])
+        assert combo.chain.model == expected.chain.model
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class BinaryFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "model.mkv")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chain_roundtrip(self):
+        chain = sherlock_model.chain
+        chain.save(self.path)
+        for use_mmap in (True, False):
+            loaded = markovify.Chain.load(self.path, mmap=use_mmap)
+            assert loaded.compacted
+            assert dict(loaded.model.items()) == chain.model
+            assert list(loaded.model.vocab) == sherlock_model_compact.chain.model.vocab
+            assert len(loaded.walk()) != 0
+
+    def test_resave(self):
+        sherlock_model_compact.chain.save(self.path)
+        loaded = markovify.Chain.load(self.path)
+        other_path = os.path.join(self.tmpdir.name, "other.mkv")
+        loaded.save(other_path)
+        with open(self.path, "rb") as a, open(other_path, "rb") as b:
+            assert a.read() == b.read()
+
+    def test_text_roundtrip(self):
+        sherlock_model.save(self.path)
+        loaded = markovify.Text.load(self.path)
+        assert loaded.parsed_sentences == sherlock_model.parsed_sentences
+        assert loaded.make_sentence(tries=100) is not None
+
+    def test_text_no_retain(self):
+        model = markovify.NewlineText(sherlock, retain_original=False)
+        model.save(self.path)
+        loaded = markovify.NewlineText.load(self.path, well_formed=False)
+        assert not loaded.retain_original
+        assert not loaded.well_formed
+        assert loaded.make_sentence() is not None
+
+    def test_snapshot(self):
+        runs = sherlock_model.parsed_sentences[:300]
+        model = markovify.Text(
+            None, parsed_sentences=runs, reject_reg=r"werewolf", compact_corpus=True
+        )
+        model.overlap_index.contains(["a"] * 20)
+        model.save(self.path, snapshot=True)
+        for use_mmap in (True, False):
+            loaded = markovify.Text.load(self.path, mmap=use_mmap)
+            assert loaded.reject_pat.pattern == "werewolf"
+            assert isinstance(loaded.parsed_sentences, markovify.corpus.CompactCorpus)
+            assert list(loaded.parsed_sentences) == list(runs)
+            index = loaded.overlap_index
+            assert index.corpus is loaded.parsed_sentences
+            assert index.depth == 16
+            assert list(index.suffixes) == list(model.overlap_index.suffixes)
+            for run in runs[:20]:
+                novel = run[:3] + ["werewolf"] + run[3:]
+                for words in (run, novel):
+                    assert loaded.test_sentence_output(
+                        words, 0.7, 15
+                    ) == model.test_sentence_output(words, 0.7, 15)
+            assert loaded.make_sentence(tries=100) is not None
+
+        loaded = markovify.Text.load(self.path, well_formed=False)
+        assert not loaded.well_formed
+        run = "The werewolf howled at the moon all night long.".split()
+        # The corpus is read in place, so it is copied before it's extended
+        with self.assertRaises(TypeError):
+            loaded.parsed_sentences.append(run)
+        loaded.extend_corpus([run])
+        assert loaded.overlap_index.contains(["the", "moon", "all"])
+        assert len(loaded.overlap_index.tail) == 15 + len(run)
+        path = self.path + ".updated"
+        loaded.save(path, snapshot=True)
+        reloaded = markovify.Text.load(path)
+        assert reloaded.overlap_index.contains(["the", "moon", "all"])
+        assert len(reloaded.overlap_index.suffixes) == len(loaded.parsed_sentences.ids)
+
+        # A list is saved as the index's encoding of it, rather than as JSON
+        model = markovify.Text(None, parsed_sentences=list(runs))
+        path = self.path + ".list"
+        model.save(path, snapshot=True)
+        _, _, corpus, sections = read_model(path, sections=True)
+        assert corpus == b""
+        assert "corpus_ids" in sections
+        with mock.patch("markovify.text.json") as json:
+            reloaded = markovify.Text.load(path)
+        json.loads.assert_not_called()
+        assert list(reloaded.parsed_sentences) == list(runs)
+        assert reloaded.overlap_index.contains(runs[10][2:5])
+        assert not reloaded.overlap_index.contains(["the", "moon", "all"])
+
+    def test_snapshot_no_retain(self):
+        model = markovify.NewlineText(
+            sherlock, retain_original=False, well_formed=False
+        )
+        model.save(self.path, snapshot=True)
+        loaded = markovify.NewlineText.load(self.path)
+        assert not loaded.retain_original
+        assert not loaded.well_formed
+        _, meta, _, sections = read_model(self.path, sections=True)
+        assert sections == {}
+        assert meta["options"]["reject_reg"] == ""
+
+    def test_named_sections(self):
+        model = sherlock_model_compact.chain.model
+        write_model(
+            self.path,
+            model,
+            sections={"numbers": array.array("H", [3, 1, 2]), "blob": b"abc"},
+        )
+        _, _, _, sections = read_model(self.path, sections=True)
+        assert list(sections["numbers"]) == [3, 1, 2]
+        assert bytes(sections["blob"]) == b"abc"
+        with self.assertRaises(ValueError):
+            write_model(self.path, model, sections={"keys": b""})
+
+    def test_byteorder(self):
+        sherlock_model.chain.save(self.path)
+        native, _, _ = read_model(self.path)
+        other = "big" if sys.byteorder == "little" else "little"
+        with mock.patch.object(markovify.compact, "sys", mock.Mock(byteorder=other)):
+            swapped, _, _ = read_model(self.path)
+        expected = array.array("I", native.successors)
+        expected.byteswap()
+        assert swapped.successors == expected
+
+    def test_prefix_index(self):
+        sherlock_model.chain.save(self.path)
+        loaded = markovify.Chain.load(self.path)
+        assert loaded.model.prefix_offsets is not None
+        expected = sherlock_model_compact.chain.states_with_prefix(("was",))
+        assert loaded.states_with_prefix(("was",)) == expected
+        assert len(expected) == len(sherlock_model.chain.states_with_prefix(("was",)))
+        # Files without the index build it on first use
+        write_model(self.path, sherlock_model.chain.compact().model)
+        loaded = markovify.Chain.load(self.path)
+        assert loaded.model.prefix_offsets is None
+        assert loaded.states_with_prefix(("was",)) == expected
+        assert loaded.states_with_prefix(("werewolf",)) == []
+
+    def test_bad_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a model")
+        with self.assertRaises(ValueError):
+            markovify.Chain.load(self.path)
+
+    def test_newer_version(self):
+        sherlock_model.chain.save(self.path)
+        with mock.patch.object(markovify.compact, "FORMAT_VERSION", 0):
+            with self.assertRaises(ValueError):
+                markovify.Chain.load(self.path)
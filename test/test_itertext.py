@@ -1,6 +1,14 @@
 import unittest
 import markovify
 import os
+import tracemalloc
+from unittest import mock
+
+
+def chunked(text, size, copies=1):
+    for _ in range(copies):
+        for i in range(0, len(text), size):
+            yield text[i : i + size]
 
 
 class MarkovifyTest(unittest.TestCase):
@@ -49,6 +57,101 @@ class MarkovifyTest(unittest.TestCase):
         assert sent is not None
         assert len(sent) != 0
 
+    def test_generate_corpus_stream(self):
+        with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+            sherlock = f.read()
+        model = markovify.Text(None, chain=markovify.Chain([["a"]], 2))
+        expected = list(model.generate_corpus(sherlock))
+        for size in (50, 1000, 100000):
+            runs = list(model.generate_corpus_stream(chunked(sherlock, size)))
+            assert runs == expected
+
+    def test_generate_corpus_stream_rejoined(self):
+        class UpperText(markovify.Text):
+            def sentence_split(self, text):
+                return [s.upper() for s in super().sentence_split(text)]
+
+        text = "One sentence here. Another one! And a third? Then, a fourth."
+        model = UpperText(text)
+        runs = list(model.generate_corpus_stream(chunked(text, 10)))
+        assert runs[0] == ["ONE", "SENTENCE", "HERE."]
+        assert runs[-1] == ["THEN,", "A", "FOURTH."]
+
+    def test_from_files(self):
+        paths = [
+            os.path.join(os.path.dirname(__file__), "texts", filename)
+            for filename in ("sherlock.txt", "senate-bills.txt")
+        ]
+        model = markovify.NewlineText.from_files(paths, chunk_size=4096)
+        expected = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                expected.append(markovify.NewlineText(f.read(), retain_original=False))
+        assert model.chain.model == markovify.combine(expected).chain.model
+        assert not model.retain_original
+        assert model.make_sentence() is not None
+
+    def test_from_files_retain(self):
+        path = os.path.join(os.path.dirname(__file__), "texts", "sherlock.txt")
+        stats = {}
+        model = markovify.Text.from_files(
+            [path], retain_original=True, compact_corpus=True, input_stats=stats
+        )
+        with open(path, encoding="utf-8") as f:
+            expected = markovify.Text(f.read())
+        assert model.retain_original
+        assert list(model.parsed_sentences) == expected.parsed_sentences
+        assert stats["accepted"] == len(expected.parsed_sentences)
+
+    @mock.patch.object(markovify.parallel, "DEFAULT_SHARD_SIZE", 500)
+    def test_from_files_parallel(self):
+        paths = [
+            os.path.join(os.path.dirname(__file__), "texts", filename)
+            for filename in ("sherlock.txt", "senate-bills.txt")
+        ]
+        expected_stats, stats = {}, {}
+        expected = markovify.Text.from_files(
+            paths, chunk_size=4096, retain_original=True, input_stats=expected_stats
+        )
+        imap = markovify.parallel.imap
+        with mock.patch.object(markovify.parallel, "imap", wraps=imap) as parallel:
+            model = markovify.Text.from_files(
+                paths,
+                chunk_size=4096,
+                retain_original=True,
+                compact_corpus=True,
+                input_stats=stats,
+                workers=2,
+            )
+        # The sentences were parsed by the workers
+        assert parallel.call_args[0][0].__func__ is markovify.Text.build_shard
+        assert model.chain.model == expected.chain.model
+        assert list(model.parsed_sentences) == expected.parsed_sentences
+        assert stats["accepted"] == expected_stats["accepted"]
+        assert stats["rejected"] == expected_stats["rejected"]
+
+        with open(paths[0]) as f:
+            text = f.read()
+        model = markovify.Text.from_iter(chunked(text, 1000), workers=2)
+        assert not model.retain_original
+        expected = markovify.Text(text, retain_original=False)
+        assert model.chain.model == expected.chain.model
+
+    def test_from_iter_memory(self):
+        with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+            text = f.read(150000)
+
+        peaks = []
+        for copies in (1, 6):
+            tracemalloc.start()
+            model = markovify.Text.from_iter(chunked(text, 4096, copies))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            assert model.make_sentence(test_output=False) is not None
+
+        # Six times the input shouldn't take (much) more memory
+        assert peaks[1] < peaks[0] * 1.25
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import markovify
+from markovify import jsonstream
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock_model = markovify.Text(f.read())
+
+# Quotes, backslashes, and characters outside the BMP, which JSON escapes
+odd_model = markovify.Text(
+    'He said "hello" to me. The path was C:\\temp today. '
+    "She sent a 😀 back to me. He said it again to me.",
+    well_formed=False,
+)
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_write_chain(self):
+        f = io.StringIO()
+        sherlock_model.chain.write_json(f)
+        assert f.getvalue() == sherlock_model.chain.to_json()
+
+    def test_write_text(self):
+        for model in (sherlock_model, odd_model):
+            f = io.StringIO()
+            model.write_json(f)
+            assert f.getvalue() == model.to_json()
+        model = markovify.Text.from_chain(sherlock_model.chain.to_json())
+        f = io.StringIO()
+        model.write_json(f)
+        assert json.loads(f.getvalue())["parsed_sentences"] is None
+
+    def test_compact_corpus(self):
+        model = markovify.Text.from_chain(
+            odd_model.chain,
+            parsed_sentences=markovify.corpus.CompactCorpus(odd_model.parsed_sentences),
+        )
+        f = io.StringIO()
+        model.write_json(f)
+        assert f.getvalue() == model.to_json()
+        f.seek(0)
+        with mock.patch.object(jsonstream, "CHUNK_SIZE", 7):
+            loaded = markovify.Text.read_json(f)
+        assert isinstance(loaded.parsed_sentences, markovify.corpus.CompactCorpus)
+        assert list(loaded.parsed_sentences) == odd_model.parsed_sentences
+
+    @mock.patch.object(jsonstream, "CHUNK_SIZE", 7)
+    def test_read_small_chunks(self):
+        for model in (odd_model, sherlock_model.compile()):
+            chain = markovify.Chain.read_json(io.StringIO(model.chain.to_json()))
+            assert chain.model == model.chain.model
+            text_model = markovify.Text.read_json(io.StringIO(model.to_json()))
+            assert text_model.chain.model == model.chain.model
+            assert text_model.parsed_sentences == model.parsed_sentences
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, compression in [
+                ("model.json", None),
+                ("model.json.gz", None),
+                ("model.json.bz2", None),
+                ("model.json.xz", None),
+                ("model.json", "gzip"),
+            ]:
+                path = os.path.join(tmpdir, name)
+                sherlock_model.write_json(path, compression)
+                model = markovify.Text.read_json(
+                    path, compression, retain_original=False
+                )
+                assert model.chain.model == sherlock_model.chain.model
+                assert not model.retain_original
+                sherlock_model.chain.write_json(path, compression)
+                chain = markovify.Chain.read_json(path, compression)
+                assert chain.model == sherlock_model.chain.model
+            with open(os.path.join(tmpdir, "model.json.gz"), "rb") as f:
+                assert f.read(2) == b"\x1f\x8b"
+            with self.assertRaises(ValueError):
+                sherlock_model.write_json(path, "zip")
+
+    def test_read_text_layouts(self):
+        obj = {
+            "extra": {"ignored": [1, 2]},
+            "parsed_sentences": None,
+            "chain": json.loads(odd_model.chain.to_json()),
+            "state_size": 2,
+        }
+        reader = jsonstream.Reader([json.dumps(obj, indent=2)])
+        state_size, model, parsed_sentences = jsonstream.read_text(reader)
+        assert state_size == 2
+        assert model == odd_model.chain.model
+        assert parsed_sentences is None
+        assert list(jsonstream.Reader(["{ }"]).object()) == []
+        assert list(jsonstream.Reader([" [", "]"]).array()) == []
+        assert jsonstream.Reader(["[12", "34]"]).value() == [1234]
+        assert jsonstream.Reader(["12", "34"]).value() == 1234
+
+    def test_read_string(self):
+        chunks = ['"a\\ud83d', "\\ude00b\\", "\\\\ud83d", '"']
+        reader = jsonstream.Reader(chunks)
+        assert "".join(reader.string()) == json.loads("".join(chunks))
+
+    def test_read_errors(self):
+        with self.assertRaises(ValueError):
+            list(jsonstream.Reader(["[1", "2}"]).array())
+        with self.assertRaises(ValueError):
+            list(jsonstream.Reader(['"abc']).string())
+        with self.assertRaises(ValueError):
+            jsonstream.Reader(["[1, ", "2"]).value()
+
+
+if __name__ == "__main__":
+    unittest.main()
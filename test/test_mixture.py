@@ -0,0 +1,85 @@
+import unittest
+import markovify
+import os
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock_model = markovify.Text(f.read())
+
+with open(
+    os.path.join(os.path.dirname(__file__), "texts/senate-bills.txt"),
+    encoding="utf-8",
+) as f:
+    senate_model = markovify.NewlineText(f.read())
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_mixture(self):
+        chains = [sherlock_model.chain, senate_model.chain]
+        mixture = markovify.MixtureChain(chains, [2, 1])
+        expected = markovify.combine(chains, [2, 1])
+        assert len(mixture.model) == len(expected.model)
+        assert set(mixture.model) == set(expected.model)
+        for state in list(expected.model)[:1000]:
+            assert mixture.model[state] == expected.model[state]
+        assert mixture.begin_cumdist == expected.begin_cumdist
+        assert dict(mixture.compact().model.items()) == expected.model
+        assert len(mixture.walk()) > 0
+        assert len(mixture.walk_many(5)) == 5
+        assert mixture.cache.info()["misses"] > 0
+        assert mixture.states_with_prefix(("Sherlock",)) == [
+            state
+            for state in mixture.model
+            if [word for word in state if word != markovify.chain.BEGIN][:1]
+            == ["Sherlock"]
+        ]
+        with self.assertRaises(KeyError):
+            mixture.model[("no", "such state")]
+
+    def test_set_weights(self):
+        chains = [sherlock_model.chain, senate_model.chain]
+        mixture = markovify.MixtureChain(chains)
+        assert mixture.chains == chains
+        assert mixture.weights == [1, 1]
+        mixture.walk()
+        mixture.set_weights([0, 1])
+        assert mixture.weights == [0, 1]
+        assert mixture.cache.info()["size"] == 0
+        assert len(mixture.model) == len(senate_model.chain.model)
+        assert ("Sherlock", "Holmes") not in mixture.model
+        assert mixture.begin_choices == senate_model.chain.begin_choices
+        with self.assertRaises(ValueError):
+            mixture.set_weights([1])
+
+    def test_compiled_sources(self):
+        chains = [
+            sherlock_model.chain.compile(),
+            sherlock_model.chain.compact(),
+            sherlock_model.chain,
+        ]
+        mixture = markovify.MixtureChain(chains, [0.5, 0.25, 0.25])
+        state = ("Sherlock", "Holmes")
+        assert mixture.model[state] == sherlock_model.chain.model[state]
+
+    def test_text(self):
+        mixture = markovify.MixtureChain([sherlock_model.chain, senate_model.chain])
+        text_model = markovify.Text.from_chain(
+            mixture,
+            parsed_sentences=sherlock_model.parsed_sentences
+            + senate_model.parsed_sentences,
+        )
+        assert text_model.make_sentence(tries=100) is not None
+        assert text_model.make_sentence_with_start("Sherlock", tries=100) is not None
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            markovify.MixtureChain([sherlock_model.chain], [1, 2])
+        ss3 = markovify.Chain(sherlock_model.parsed_sentences, 3)
+        with self.assertRaises(ValueError):
+            markovify.MixtureChain([sherlock_model.chain, ss3])
+        mixture = markovify.MixtureChain([sherlock_model.chain])
+        with self.assertRaises(ValueError):
+            mixture.update([["A", "sentence"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
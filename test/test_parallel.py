@@ -0,0 +1,84 @@
+import unittest
+import markovify
+import os
+from unittest import mock
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock = f.read()
+    sherlock_model = markovify.Text(sherlock)
+
+with open(
+    os.path.join(os.path.dirname(__file__), "texts/senate-bills.txt"),
+    encoding="utf-8",
+) as f:
+    senate = f.read()
+
+
+def no_digits(sentence):
+    return not any(char.isdigit() for char in sentence)
+
+
+@mock.patch.object(markovify.parallel, "DEFAULT_SHARD_SIZE", 500)
+class MarkovifyTest(unittest.TestCase):
+    def test_shards(self):
+        shards = list(markovify.parallel.shards(range(1200)))
+        assert list(map(len, shards)) == [500, 500, 200]
+        assert sum(shards, []) == list(range(1200))
+
+    def test_chain(self):
+        corpus = sherlock_model.parsed_sentences
+        chain = markovify.Chain(corpus, 2, workers=2)
+        assert chain.model == sherlock_model.chain.model
+        assert len(chain.walk()) != 0
+
+    def test_empty_chain(self):
+        assert sherlock_model.chain.build_parallel([], 2, workers=2) == {}
+
+    def test_build_shard(self):
+        sentences = sherlock_model.sentence_split(sherlock)
+        runs, model, _ = sherlock_model.build_shard(sentences, True)
+        assert runs == sherlock_model.parsed_sentences
+        assert model == sherlock_model.chain.model
+        model = markovify.Text(None, retain_original=False, chain=sherlock_model.chain)
+        runs, model, stats = model.build_shard(
+            ["", "Not a sentence (really)."], False, True
+        )
+        assert runs is None
+        assert model == {}
+        assert stats["rejected"]["test_sentence_input"] == 2
+
+    def test_text(self):
+        model = markovify.Text(sherlock, workers=2)
+        assert model.parsed_sentences == sherlock_model.parsed_sentences
+        assert model.chain.model == sherlock_model.chain.model
+        assert model.make_sentence() is not None
+
+    def test_input_stats(self):
+        expected_stats, stats = {}, {}
+        expected = markovify.Text(
+            sherlock, input_filters=[no_digits], input_stats=expected_stats
+        )
+        model = markovify.Text(
+            sherlock, input_filters=[no_digits], input_stats=stats, workers=2
+        )
+        assert model.chain.model == expected.chain.model
+        for key in ("sentences", "accepted", "rejected"):
+            assert stats[key] == expected_stats[key]
+        assert stats["rejected"]["no_digits"] > 0
+        assert set(stats["seconds"]) == {
+            "test_sentence_input",
+            "no_digits",
+            "word_split",
+        }
+
+    def test_text_lines_without_retaining(self):
+        lines = senate.splitlines()
+        expected = markovify.NewlineText(lines, retain_original=False)
+        model = markovify.NewlineText(lines, retain_original=False, workers=2)
+        assert not model.retain_original
+        assert model.chain.model == expected.chain.model
+        assert model.make_sentence() is not None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import markovify
+import os
+import tempfile
+from markovify.chain import BEGIN, END
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock_model = markovify.Text(f.read())
+
+
+def assert_walkable(chain):
+    begin_state = (BEGIN,) * chain.state_size
+    assert begin_state in chain.model
+    for state in chain.model:
+        next_dict = chain.next_weights(state)
+        assert next_dict
+        for word in next_dict:
+            assert word == END or state[1:] + (word,) in chain.model
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_no_pruning(self):
+        chain = sherlock_model.chain
+        pruned = chain.prune()
+        assert pruned is not chain
+        assert pruned.model == chain.model
+        report = markovify.utils.prune_report(sherlock_model, pruned)
+        assert report["states"][0] == report["states"][1] == len(chain.model)
+        assert report["dropped_mass"] == report["divergence"] == 0
+
+    def test_min_state_count(self):
+        chain = sherlock_model.chain
+        pruned = chain.prune(min_state_count=3)
+        assert_walkable(pruned)
+        for state in pruned.model:
+            if state != (BEGIN, BEGIN):
+                assert sum(chain.model[state].values()) >= 3
+        report = markovify.utils.prune_report(chain, pruned)
+        assert report["states"][1] == len(pruned.model) < len(chain.model)
+        assert report["nbytes"][1] < report["nbytes"][0]
+        assert 0 < report["dropped_mass"] <= report["divergence"] < 1
+        text_model = markovify.Text.from_chain(
+            pruned, parsed_sentences=sherlock_model.parsed_sentences
+        )
+        assert text_model.make_sentence(test_output=False) is not None
+        assert markovify.utils.prune_report(sherlock_model, text_model) == report
+
+    def test_transitions(self):
+        chain = sherlock_model.chain
+        pruned = chain.prune(top_k=2, min_transition_count=2)
+        assert_walkable(pruned)
+        for state in pruned.model:
+            next_dict = pruned.model[state]
+            assert len(next_dict) <= 2
+            if len(next_dict) > 1:
+                assert min(next_dict.values()) >= 2
+        assert pruned.begin_choices == list(pruned.model[(BEGIN, BEGIN)])
+
+    def test_quantize(self):
+        chain = sherlock_model.chain
+        pruned = chain.prune(quantize="uint8")
+        assert set(pruned.model) == set(chain.model)
+        for next_dict in pruned.model.values():
+            assert max(next_dict.values()) == 255
+            assert min(next_dict.values()) >= 1
+        report = markovify.utils.prune_report(chain, pruned)
+        assert report["dropped_mass"] == 0
+        assert 0 < report["divergence"] < 0.01
+        with self.assertRaises(ValueError):
+            chain.prune(quantize="uint4")
+
+    def test_compact_typecode(self):
+        assert markovify.compact.integer_typecode(255) == "B"
+        assert markovify.compact.integer_typecode(256) == "H"
+        assert markovify.compact.integer_typecode(1 << 40) == "Q"
+        chain = sherlock_model.chain.prune(top_k=1, quantize="uint8").compact()
+        assert chain.model.cumweights.typecode == "B"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "pruned.markovify")
+            chain.save(path)
+            loaded = markovify.Chain.load(path)
+            assert loaded.model.cumweights.format == "B"
+            assert loaded.walk(("I", "am")) == chain.walk(("I", "am"))
+
+    def test_forms(self):
+        chain = sherlock_model.chain
+        expected = chain.prune(min_state_count=2).model
+        for source in (
+            chain.compile(),
+            chain.compile(lazy=True),
+            chain.compact(),
+        ):
+            pruned = source.prune(min_state_count=2)
+            assert pruned.compiled == source.compiled
+            assert pruned.compacted == source.compacted
+            assert pruned.sampler == source.sampler
+            assert (pruned.cache is None) == (source.cache is None)
+            assert len(pruned.model) == len(expected)
+            assert len(pruned.walk()) > 0
+
+    def test_inplace(self):
+        for source in (
+            sherlock_model.chain.compile(),
+            sherlock_model.chain.compile(lazy=True),
+            markovify.Chain(sherlock_model.parsed_sentences, 2),
+        ):
+            source.walk()
+            source.expected_lengths()
+            source.states_with_prefix(("Sherlock",))
+            assert source.prune(min_state_count=2, inplace=True) is source
+            assert source.remaining_lengths is None
+            assert source.prefix_index is None
+            assert_walkable(source)
+            assert len(source.walk()) > 0
+            if not source.compiled:
+                begin = source.model[(BEGIN, BEGIN)]
+                assert source.begin_choices == list(begin)
+
+    def test_errors(self):
+        chain = sherlock_model.chain
+        with self.assertRaises(ValueError):
+            chain.prune(min_state_count=10**9)
+        mixture = markovify.MixtureChain([chain, chain])
+        assert set(mixture.prune(top_k=1).model) == set(chain.prune(top_k=1).model)
+        with self.assertRaises(ValueError):
+            mixture.prune(top_k=1, inplace=True)
+        with self.assertRaises(ValueError):
+            chain.compile(sampler="alias").prune(top_k=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
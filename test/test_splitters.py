@@ -0,0 +1,57 @@
+import unittest
+import markovify
+import os
+from markovify.splitters import is_abbreviation, is_sentence_ender
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock = f.read()
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_split_into_sentences(self):
+        text = (
+            "Mr. Holmes met Dr. Watson in the U.S. on Jan. 5, etc. and then "
+            "left. “Who is it?” he asked. J. R. R. Tolkien wrote. "
+            "She said NASA. Then e.g. nothing."
+        )
+        assert markovify.split_into_sentences(text) == [
+            "Mr. Holmes met Dr. Watson in the U.S. on Jan. 5, etc. and then left.",
+            "“Who is it?” he asked.",
+            "J. R. R. Tolkien wrote.",
+            "She said NASA.",
+            "Then e.g. nothing.",
+        ]
+
+    def test_sentence_ender(self):
+        assert is_abbreviation("Mr.")
+        assert is_abbreviation("J.")
+        assert is_abbreviation("etc.")
+        assert not is_abbreviation("Holmes.")
+        assert not is_sentence_ender("U.S.")
+        assert is_sentence_ender("NASA.")
+        assert is_sentence_ender("what?")
+        assert not is_sentence_ender("Sen.")
+
+    def test_split_many(self):
+        lines = sherlock.splitlines()
+        expected = [
+            sentence
+            for line in lines
+            for sentence in markovify.split_into_sentences(line)
+        ]
+        assert list(markovify.split_many(lines)) == expected
+
+    def test_custom_sentence_split(self):
+        text_model = markovify.NewlineText(["One. Two.\nThree.", "Four."])
+        assert text_model.parsed_sentences == [["One.", "Two."], ["Three."], ["Four."]]
+        text_model = markovify.Text(["One. Two.\nThree.", "Four."])
+        assert text_model.parsed_sentences == [
+            ["One."],
+            ["Two."],
+            ["Three."],
+            ["Four."],
+        ]
+
+
+if __name__ == "__main__":
+    unittest.main()
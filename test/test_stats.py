@@ -0,0 +1,89 @@
+import unittest
+import markovify
+import os
+from markovify.stats import GenerationStats
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock = f.read()
+    sherlock_model = markovify.Text(sherlock)
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_make_sentence(self):
+        model = markovify.Text(None, chain=sherlock_model.chain.compile(lazy=True))
+        stats = model.enable_stats()
+        assert model.chain.stats is stats
+        for _ in range(20):
+            model.make_sentence(max_words=10)
+        assert stats.calls == 20
+        assert stats.tries == stats.walks
+        assert stats.tries == (
+            stats.accepted + stats.rejected_length + stats.rejected_overlap
+        )
+        assert stats.accepted == stats.calls - stats.failures
+        assert stats.rejected_length > 0
+        assert stats.steps > 0
+        assert stats.cache_misses > 0
+        assert stats.seconds["walk"] > 0
+        model.disable_stats()
+        model.make_sentence()
+        assert stats.calls == 20
+        assert model.chain.stats is None
+
+    def test_rejected_overlap(self):
+        model = markovify.Text(
+            None,
+            chain=sherlock_model.chain.compile(),
+            parsed_sentences=sherlock_model.parsed_sentences,
+        )
+        stats = model.enable_stats(GenerationStats())
+        model.overlap_index.contains = lambda gram: True
+        assert model.make_sentence(tries=5) is None
+        assert (stats.calls, stats.failures) == (1, 1)
+        assert stats.rejected_overlap == 5
+
+    def test_make_sentences(self):
+        model = markovify.Text(None, chain=sherlock_model.chain.compile(lazy=True))
+        stats = model.enable_stats()
+        sentences, counts = model.make_sentences(
+            30, max_words=12, test_output=False, return_stats=True
+        )
+        assert stats.calls == 30
+        assert stats.failures == sentences.count(None)
+        assert stats.tries == stats.walks == counts["attempts"]
+        assert stats.rejected_length == counts["rejected_length"]
+        assert stats.cache_misses > 0
+
+    def test_compiled(self):
+        model = sherlock_model.compile()
+        stats = model.enable_stats()
+        model.make_sentences(5)
+        assert stats.walks >= 5
+        assert stats.cache_hits == stats.cache_misses == 0
+
+    def test_as_dict(self):
+        stats = GenerationStats()
+        stats.record_call(None)
+        stats.record_try("rejected_length", 0.5, 0.25)
+        stats.record_walk(3, 1, 2)
+        counters = stats.as_dict()
+        assert counters == {
+            "calls": 1,
+            "failures": 1,
+            "tries": 1,
+            "accepted": 0,
+            "rejected_length": 1,
+            "rejected_overlap": 0,
+            "walks": 1,
+            "steps": 3,
+            "cache_hits": 1,
+            "cache_misses": 2,
+            "seconds_walk": 0.5,
+            "seconds_check": 0.25,
+        }
+        stats.reset()
+        assert stats.as_dict()["calls"] == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import markovify
+import os
+from markovify.chain import BEGIN, decompile_next
+
+with open(os.path.join(os.path.dirname(__file__), "texts/sherlock.txt")) as f:
+    sherlock = f.read()
+    sherlock_model = markovify.Text(sherlock)
+    sentences = sherlock_model.parsed_sentences
+
+
+class MarkovifyTest(unittest.TestCase):
+    def test_chain(self):
+        chain = markovify.Chain(sentences[:1000], 2)
+        chain.update(sentences[1000:])
+        assert chain.model == sherlock_model.chain.model
+        expected = sherlock_model.chain
+        assert dict(zip(chain.begin_choices, chain.begin_cumdist)) == dict(
+            zip(expected.begin_choices, expected.begin_cumdist)
+        )
+
+    def test_chain_without_begin(self):
+        chain = markovify.Chain(sentences[:10], 2)
+        begin_choices = chain.begin_choices
+        chain.update([])
+        assert chain.begin_choices is begin_choices
+
+    def test_compiled_chain(self):
+        chain = markovify.Chain(sentences[:1000], 2).compile()
+        copy = chain.compile()
+        chain.update(sentences[1000:])
+        decompiled = {s: decompile_next(v) for s, v in chain.model.items()}
+        assert decompiled == sherlock_model.chain.model
+        # The copy made before the update is unaffected
+        assert copy.model[(BEGIN, BEGIN)] != chain.model[(BEGIN, BEGIN)]
+
+    def test_prefix_index(self):
+        chain = markovify.Chain(sentences[:1000], 2)
+        assert chain.states_with_prefix(("moon.",)) == []
+        chain.update([["The", "werewolf", "howled", "at", "the", "moon."]])
+        assert chain.states_with_prefix(("moon.",)) == []
+        assert chain.states_with_prefix(("werewolf",)) == [("werewolf", "howled")]
+        assert chain.states_with_prefix(("The", "werewolf")) == [("The", "werewolf")]
+
+    def test_lazily_compiled_chain(self):
+        chain = markovify.Chain(sentences[:1000], 2).compile(lazy=True)
+        chain.walk()
+        chain.update(sentences[1000:])
+        assert chain.model == sherlock_model.chain.model
+        for state in chain.cache.entries:
+            assert chain.cache.entries[state][0] == list(chain.model[state])
+
+    def test_lazy_copy(self):
+        chain = markovify.Chain(sentences[:1000], 2)
+        chain.states_with_prefix(("Holmes",))
+        lazy = chain.compile(lazy=True)
+        expected = markovify.Chain(sentences[:1000], 2).model
+        lazy_states = lazy.states_with_prefix(("werewolf",))
+        lazy.walk()
+        chain.update([["The", "werewolf", "howled", "at", "the", "moon."]])
+        # The copy's model, prefix index, and cache are unaffected
+        assert lazy.model == expected
+        assert lazy.states_with_prefix(("werewolf",)) == lazy_states == []
+        for state in lazy.cache.entries:
+            assert lazy.cache.entries[state][0] == list(lazy.model[state])
+        assert chain.states_with_prefix(("werewolf",)) == [("werewolf", "howled")]
+        lazy.update([["The", "cat", "sat."]])
+        assert ("cat", "sat.") not in chain.model
+
+    def test_unsupported_chains(self):
+        with self.assertRaises(ValueError):
+            sherlock_model.chain.compile(sampler="alias").update(sentences[:1])
+        with self.assertRaises(ValueError):
+            sherlock_model.chain.compact().update(sentences[:1])
+
+    def test_text(self):
+        model = markovify.Text(None, parsed_sentences=sentences[:1000])
+        old_rejoined = model.rejoined_text
+        grams = ["Sherlock", "Holmes", "was", "a", "man", "who", "seldom"]
+        assert model.overlap_index.contains(grams) is False
+        new_text = "Sherlock Holmes was a man who seldom took exercise."
+        model.update(new_text)
+        assert model.parsed_sentences[-1] == new_text.split(" ")
+        assert model.overlap_index.contains(grams)
+        assert model.rejoined_text == old_rejoined + " " + new_text
+        assert model.chain.model[("man", "who")]["seldom"] >= 1
+
+    def test_text_shared_corpus(self):
+        runs = sentences[:100]
+        model = markovify.Text(None, parsed_sentences=runs)
+        model.update("The werewolf howled at the moon.")
+        # The caller's list is copied, not extended
+        assert len(runs) == 100
+        assert len(model.parsed_sentences) == 101
+
+        for compact_corpus in (False, True):
+            source = markovify.Text(
+                None, parsed_sentences=runs, compact_corpus=compact_corpus
+            )
+            copy = source.compile()
+            assert copy.parsed_sentences is source.parsed_sentences
+            copy.update("The werewolf howled at the moon.")
+            assert len(source.parsed_sentences) == 100
+            assert len(copy.parsed_sentences) == 101
+            assert type(copy.parsed_sentences) is type(source.parsed_sentences)
+            assert not source.overlap_index.contains(["werewolf", "howled"])
+            assert copy.overlap_index.contains(["werewolf", "howled"])
+            assert "werewolf" not in source.rejoined_text
+            # Once copied, the corpus is updated in place
+            corpus = copy.parsed_sentences
+            copy.update("The werewolf howled again.")
+            assert copy.parsed_sentences is corpus
+            assert copy.overlap_index.contains(["howled", "again."])
+
+    def test_text_without_retaining(self):
+        model = markovify.Text(sherlock, retain_original=False)
+        model.update("The werewolf howled at the moon.")
+        assert not model.retain_original
+        assert model.chain.model[("The", "werewolf")] == {"howled": 1}
+        with self.assertRaises(AttributeError):
+            model.rejoined_text
+
+
+if __name__ == "__main__":
+    unittest.main()